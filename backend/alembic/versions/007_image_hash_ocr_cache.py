@@ -0,0 +1,48 @@
+"""Add receipt image hash and OCR result cache.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "007"
+down_revision: str | None = "006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # SHA-256 of the stored image, used to detect re-uploads
+    op.add_column("receipts", sa.Column("image_sha256", sa.Text(), nullable=True))
+    op.create_index("idx_receipts_image_sha256", "receipts", ["image_sha256"])
+
+    # Cached extract_text results per image and OCR engine version
+    op.create_table(
+        "ocr_cache",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("image_sha256", sa.Text(), nullable=False),
+        sa.Column("engine", sa.Text(), nullable=False),
+        sa.Column("engine_version", sa.Text(), nullable=False),
+        sa.Column("result", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "idx_ocr_cache_key",
+        "ocr_cache",
+        ["image_sha256", "engine", "engine_version"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_ocr_cache_key", "ocr_cache")
+    op.drop_table("ocr_cache")
+    op.drop_index("idx_receipts_image_sha256", "receipts")
+    op.drop_column("receipts", "image_sha256")
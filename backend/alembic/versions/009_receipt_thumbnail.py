@@ -0,0 +1,26 @@
+"""Add receipt thumbnail path.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "009"
+down_revision: str | None = "008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Written by the image preprocessing stage; NULL for images stored as uploaded
+    op.add_column("receipts", sa.Column("thumbnail_path", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("receipts", "thumbnail_path")
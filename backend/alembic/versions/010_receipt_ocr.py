@@ -0,0 +1,109 @@
+"""Move raw OCR output out of receipts into compressed receipt_ocr rows.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+"""
+
+import json
+import zlib
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "010"
+down_revision: str | None = "009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 500
+
+receipt_ocr = sa.table(
+    "receipt_ocr",
+    sa.column("receipt_id", postgresql.UUID(as_uuid=True)),
+    sa.column("encoding", sa.Text()),
+    sa.column("data", sa.LargeBinary()),
+    sa.column("raw_size", sa.Integer()),
+)
+
+
+def _batches(query: str) -> Iterator[Sequence[sa.Row[Any]]]:
+    # Keyset pagination over receipts.id keeps each batch query cheap
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        rows = conn.execute(
+            sa.text(query),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.create_table(
+        "receipt_ocr",
+        sa.Column(
+            "receipt_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("receipts.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("encoding", sa.Text(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    # Data is compressed by the application; stop TOAST from trying again
+    op.execute("ALTER TABLE receipt_ocr ALTER COLUMN data SET STORAGE EXTERNAL")
+
+    conn = op.get_bind()
+    for rows in _batches(
+        "SELECT id, raw_ocr::text AS raw FROM receipts "
+        "WHERE raw_ocr IS NOT NULL AND (CAST(:last_id AS uuid) IS NULL OR id > :last_id) "
+        "ORDER BY id LIMIT :limit"
+    ):
+        values = []
+        for row in rows:
+            raw = row.raw.encode()
+            values.append(
+                {
+                    "receipt_id": row.id,
+                    "encoding": "zlib+json",
+                    "data": zlib.compress(raw, 6),
+                    "raw_size": len(raw),
+                }
+            )
+        conn.execute(receipt_ocr.insert(), values)
+
+    op.drop_column("receipts", "raw_ocr")
+
+
+def downgrade() -> None:
+    op.add_column("receipts", sa.Column("raw_ocr", postgresql.JSONB(), nullable=True))
+
+    conn = op.get_bind()
+    receipts = sa.table(
+        "receipts",
+        sa.column("id", postgresql.UUID(as_uuid=True)),
+        sa.column("raw_ocr", postgresql.JSONB()),
+    )
+    for rows in _batches(
+        "SELECT receipt_id AS id, data FROM receipt_ocr "
+        "WHERE CAST(:last_id AS uuid) IS NULL OR receipt_id > :last_id "
+        "ORDER BY receipt_id LIMIT :limit"
+    ):
+        for row in rows:
+            conn.execute(
+                receipts.update()
+                .where(receipts.c.id == row.id)
+                .values(raw_ocr=json.loads(zlib.decompress(row.data)))
+            )
+
+    op.drop_table("receipt_ocr")
@@ -0,0 +1,45 @@
+"""Add trigram search over ingredient names, canonical names and aliases.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "011"
+down_revision: str | None = "010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # IMMUTABLE so it can back an expression index; queries must call it the same way
+    op.execute(
+        """
+        CREATE FUNCTION ingredient_search_text(name text, canonical_name text, aliases jsonb)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT lower(
+                name || ' ' || canonical_name || ' '
+                || coalesce(
+                    (SELECT string_agg(value, ' ') FROM jsonb_array_elements_text(aliases)),
+                    ''
+                )
+            )
+        $$
+        """
+    )
+    op.execute(
+        "CREATE INDEX idx_ingredients_search_trgm ON ingredients "
+        "USING gin (ingredient_search_text(name, canonical_name, aliases) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_ingredients_search_trgm", table_name="ingredients")
+    op.execute("DROP FUNCTION ingredient_search_text(text, text, jsonb)")
@@ -0,0 +1,65 @@
+"""Add learned raw item name to ingredient matches.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "012"
+down_revision: str | None = "011"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingredient_match_memory",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("raw_key", sa.Text(), nullable=False),
+        sa.Column(
+            "household_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("households.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column(
+            "ingredient_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("ingredients.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("confidence", sa.Numeric(3, 2), nullable=False),
+        sa.Column("method", sa.Text(), nullable=False),
+        sa.Column("catalog_version", sa.BigInteger(), nullable=True),
+        sa.Column("hit_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    # One global row per name, plus at most one override per household and name
+    op.create_index(
+        "idx_match_memory_global",
+        "ingredient_match_memory",
+        ["raw_key"],
+        unique=True,
+        postgresql_where=sa.text("household_id IS NULL"),
+    )
+    op.create_index(
+        "idx_match_memory_household",
+        "ingredient_match_memory",
+        ["household_id", "raw_key"],
+        unique=True,
+        postgresql_where=sa.text("household_id IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_match_memory_household", "ingredient_match_memory")
+    op.drop_index("idx_match_memory_global", "ingredient_match_memory")
+    op.drop_table("ingredient_match_memory")
@@ -0,0 +1,35 @@
+"""Add checkpoints for resumable backfill jobs.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "013"
+down_revision: str | None = "012"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "backfill_checkpoints",
+        sa.Column("job", sa.Text(), primary_key=True),
+        sa.Column("last_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("processed", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("matched", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("started_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("backfill_checkpoints")
@@ -0,0 +1,91 @@
+"""Add the daily spend rollup and fill it from existing receipts.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "014"
+down_revision: str | None = "013"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_spend",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "household_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("households.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("merchant", sa.Text(), nullable=False),
+        sa.Column(
+            "category_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("categories.id"),
+            nullable=True,
+        ),
+        sa.Column("receipt_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("receipt_total", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("item_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("item_total", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("first_purchase_at", sa.DateTime(), nullable=True),
+        sa.Column("last_purchase_at", sa.DateTime(), nullable=True),
+    )
+    # NULL household and category are keys like any other (PostgreSQL 15+)
+    op.create_index(
+        "idx_daily_spend_key",
+        "daily_spend",
+        ["household_id", "day", "merchant", "category_id"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.create_index("idx_daily_spend_day", "daily_spend", ["day"])
+
+    op.execute(
+        """
+        INSERT INTO daily_spend (
+            id, household_id, day, merchant, category_id,
+            receipt_count, receipt_total, item_count, item_total,
+            first_purchase_at, last_purchase_at
+        )
+        SELECT
+            gen_random_uuid(), household_id, day, merchant, category_id,
+            sum(receipt_count), sum(receipt_total), sum(item_count), sum(item_total),
+            min(first_purchase_at), max(last_purchase_at)
+        FROM (
+            SELECT
+                household_id, purchase_date::date AS day,
+                upper(trim(merchant_name)) AS merchant, NULL::uuid AS category_id,
+                1 AS receipt_count, total_amount AS receipt_total,
+                0 AS item_count, 0 AS item_total,
+                purchase_date AS first_purchase_at, purchase_date AS last_purchase_at
+            FROM receipts
+            UNION ALL
+            SELECT
+                r.household_id, r.purchase_date::date,
+                upper(trim(r.merchant_name)), i.category_id,
+                0, 0, 1, i.total_price, NULL, NULL
+            FROM items i
+            JOIN receipts r ON r.id = i.receipt_id
+        ) facts
+        GROUP BY household_id, day, merchant, category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_daily_spend_day", "daily_spend")
+    op.drop_index("idx_daily_spend_key", "daily_spend")
+    op.drop_table("daily_spend")
@@ -0,0 +1,59 @@
+"""Copy household and purchase date onto items and index both tables by them.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "016"
+down_revision: str | None = "015"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "items",
+        sa.Column(
+            "household_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("households.id"),
+            nullable=True,
+        ),
+    )
+    op.add_column("items", sa.Column("purchase_date", sa.DateTime(), nullable=True))
+    op.execute(
+        """
+        UPDATE items
+        SET household_id = receipts.household_id, purchase_date = receipts.purchase_date
+        FROM receipts
+        WHERE receipts.id = items.receipt_id
+        """
+    )
+    op.alter_column("items", "purchase_date", nullable=False)
+
+    op.create_index(
+        "idx_receipts_household_date",
+        "receipts",
+        ["household_id", sa.text("purchase_date DESC")],
+        postgresql_include=["total_amount"],
+    )
+    op.create_index(
+        "idx_items_household_date",
+        "items",
+        ["household_id", sa.text("purchase_date DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_items_household_date", table_name="items")
+    op.drop_index("idx_receipts_household_date", table_name="receipts")
+    op.drop_column("items", "purchase_date")
+    op.drop_column("items", "household_id")
@@ -0,0 +1,37 @@
+"""Index discards for keyset-paginated waste analytics.
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "017"
+down_revision: str | None = "016"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_inventory_events_discards",
+        "inventory_events",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("event_type = 'discard'"),
+    )
+    op.create_index(
+        "idx_leftovers_household_discarded",
+        "leftovers",
+        ["household_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("status = 'discarded'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_leftovers_household_discarded", table_name="leftovers")
+    op.drop_index("idx_inventory_events_discards", table_name="inventory_events")
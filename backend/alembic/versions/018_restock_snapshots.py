@@ -0,0 +1,36 @@
+"""Add precomputed restock prediction snapshots.
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "018"
+down_revision: str | None = "017"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "restock_snapshots",
+        sa.Column(
+            "household_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("households.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("predictions", postgresql.JSONB(), nullable=False),
+        sa.Column("generated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("restock_snapshots")
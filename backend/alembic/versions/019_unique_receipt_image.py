@@ -0,0 +1,49 @@
+"""Make the receipt image hash unique, so concurrent re-uploads cannot both insert.
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "019"
+down_revision: str | None = "018"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Earlier races left duplicates; the earliest receipt keeps the hash, as in lookups
+    op.execute(
+        """
+        UPDATE receipts SET image_sha256 = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY image_sha256 ORDER BY created_at, id
+                ) AS copy
+                FROM receipts
+                WHERE image_sha256 IS NOT NULL
+            ) copies
+            WHERE copy > 1
+        )
+        """
+    )
+    op.drop_index("idx_receipts_image_sha256", "receipts")
+    op.create_index(
+        "idx_receipts_image_sha256",
+        "receipts",
+        ["image_sha256"],
+        unique=True,
+        postgresql_where=sa.text("image_sha256 IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_receipts_image_sha256", "receipts")
+    op.create_index("idx_receipts_image_sha256", "receipts", ["image_sha256"])
@@ -0,0 +1,53 @@
+"""Store inventory lot unit costs with sub-cent precision.
+
+Unit costs are per gram, millilitre or piece, so two decimals rounded most of
+them to 0.00 - 0.05. Receipt lots are recomputed from their total cost and the
+quantity they were added with.
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "020"
+down_revision: str | None = "019"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "inventory_lots",
+        "unit_cost",
+        type_=sa.Numeric(12, 6),
+        existing_type=sa.Numeric(10, 2),
+        existing_nullable=False,
+    )
+    op.execute(
+        """
+        UPDATE inventory_lots l SET unit_cost = round(l.total_cost / added.quantity, 6)
+        FROM (
+            SELECT DISTINCT ON (lot_id) lot_id, quantity_delta AS quantity
+            FROM inventory_events
+            WHERE event_type = 'add' AND quantity_delta > 0
+            ORDER BY lot_id, created_at
+        ) added
+        WHERE added.lot_id = l.id AND l.source_type = 'receipt'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "inventory_lots",
+        "unit_cost",
+        type_=sa.Numeric(10, 2),
+        existing_type=sa.Numeric(12, 6),
+        existing_nullable=False,
+    )
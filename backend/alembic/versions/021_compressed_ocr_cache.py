@@ -0,0 +1,130 @@
+"""Compress OCR cache entries and keep them as the only raw OCR copy.
+
+Every upload wrote its OCR output twice: as JSONB in ocr_cache and compressed in
+receipt_ocr. Cache entries are now compressed the same way, and receipt_ocr rows
+whose image has a cache entry are dropped; the receipt finds its OCR output
+through the image hash instead.
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-17
+"""
+
+import json
+import zlib
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "021"
+down_revision: str | None = "020"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 500
+
+ocr_cache = sa.table(
+    "ocr_cache",
+    sa.column("id", postgresql.UUID(as_uuid=True)),
+    sa.column("result", postgresql.JSONB()),
+    sa.column("encoding", sa.Text()),
+    sa.column("data", sa.LargeBinary()),
+    sa.column("raw_size", sa.Integer()),
+)
+
+
+def _batches(query: str) -> Iterator[Sequence[sa.Row[Any]]]:
+    # Keyset pagination over ocr_cache.id keeps each batch query cheap
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        rows = conn.execute(
+            sa.text(query),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.add_column("ocr_cache", sa.Column("encoding", sa.Text(), nullable=True))
+    op.add_column("ocr_cache", sa.Column("data", sa.LargeBinary(), nullable=True))
+    op.add_column("ocr_cache", sa.Column("raw_size", sa.Integer(), nullable=True))
+    # Data is compressed by the application; stop TOAST from trying again
+    op.execute("ALTER TABLE ocr_cache ALTER COLUMN data SET STORAGE EXTERNAL")
+
+    conn = op.get_bind()
+    update = (
+        ocr_cache.update()
+        .where(ocr_cache.c.id == sa.bindparam("entry_id"))
+        .values(
+            encoding=sa.bindparam("new_encoding"),
+            data=sa.bindparam("new_data"),
+            raw_size=sa.bindparam("new_raw_size"),
+        )
+    )
+    for rows in _batches(
+        "SELECT id, result::text AS raw FROM ocr_cache "
+        "WHERE CAST(:last_id AS uuid) IS NULL OR id > :last_id "
+        "ORDER BY id LIMIT :limit"
+    ):
+        values = []
+        for row in rows:
+            raw = row.raw.encode()
+            values.append(
+                {
+                    "entry_id": row.id,
+                    "new_encoding": "zlib+json",
+                    "new_data": zlib.compress(raw, 6),
+                    "new_raw_size": len(raw),
+                }
+            )
+        conn.execute(update, values)
+
+    for column in ("encoding", "data", "raw_size"):
+        op.alter_column("ocr_cache", column, nullable=False)
+    op.drop_column("ocr_cache", "result")
+
+    op.execute(
+        "DELETE FROM receipt_ocr USING receipts "
+        "WHERE receipts.id = receipt_ocr.receipt_id "
+        "AND EXISTS (SELECT 1 FROM ocr_cache WHERE ocr_cache.image_sha256 = receipts.image_sha256)"
+    )
+
+
+def downgrade() -> None:
+    # Give every receipt its own copy again, from the newest entry for its image
+    op.execute(
+        "INSERT INTO receipt_ocr (receipt_id, encoding, data, raw_size) "
+        "SELECT DISTINCT ON (receipts.id) receipts.id, ocr_cache.encoding, ocr_cache.data, "
+        "ocr_cache.raw_size "
+        "FROM receipts JOIN ocr_cache ON ocr_cache.image_sha256 = receipts.image_sha256 "
+        "WHERE NOT EXISTS (SELECT 1 FROM receipt_ocr WHERE receipt_ocr.receipt_id = receipts.id) "
+        "ORDER BY receipts.id, ocr_cache.created_at DESC"
+    )
+
+    op.add_column("ocr_cache", sa.Column("result", postgresql.JSONB(), nullable=True))
+
+    conn = op.get_bind()
+    for rows in _batches(
+        "SELECT id, data FROM ocr_cache "
+        "WHERE CAST(:last_id AS uuid) IS NULL OR id > :last_id "
+        "ORDER BY id LIMIT :limit"
+    ):
+        for row in rows:
+            conn.execute(
+                ocr_cache.update()
+                .where(ocr_cache.c.id == row.id)
+                .values(result=json.loads(zlib.decompress(row.data)))
+            )
+
+    op.alter_column("ocr_cache", "result", nullable=False)
+    op.drop_column("ocr_cache", "raw_size")
+    op.drop_column("ocr_cache", "data")
+    op.drop_column("ocr_cache", "encoding")
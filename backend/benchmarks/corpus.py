@@ -0,0 +1,184 @@
+"""Synthetic Norwegian receipt corpus for benchmarks.
+
+Receipts are generated from the same vocabulary the pipeline understands:
+mock OCR fixtures, known merchants, parser abbreviations and categorizer
+keywords. Generation is seeded, so a given (size, seed) always yields the
+same corpus.
+"""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.db.seed_ingredients import INGREDIENTS
+from src.services.categorizer import CATEGORY_KEYWORDS
+from src.services.mock_ocr import MockOCRService
+from src.services.parser import ABBREVIATIONS, MERCHANTS
+
+BRANDS = ["TINE", "Q-", "GILDE", "PRIOR", "NORDFJORD", "FIRST PRICE", "ELDORADO", "COOP", "XTRA"]
+SIZES = ["", "1L", "0.5L", "1.5L", "500G", "400G", "1KG", "250G", "6STK", "4X0.5L", "3%"]
+PAYMENTS = ["VISA", "MASTERCARD", "VIPPS", "KONTANT"]
+STREETS = ["Storgata", "Grønland", "Bogstadveien", "Markveien", "Torggata", "Kirkegata"]
+CITIES = ["Oslo", "Bergen", "Trondheim", "Stavanger", "Tromsø", "Drammen"]
+
+# Share of generated item names taken from each source, and of follow-up lines
+FIXTURE_NAME_SHARE = 0.3
+ABBREVIATION_NAME_SHARE = 0.15
+BRAND_SHARE = 0.5
+PANT_SHARE = 0.1
+DISCOUNT_SHARE = 0.05
+
+
+@dataclass
+class SyntheticIngredient:
+    """Ingredient-like object accepted by IngredientMatcher."""
+
+    name: str
+    canonical_name: str
+    aliases: list[str]
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+
+
+@dataclass
+class Corpus:
+    """Everything the benchmarks consume."""
+
+    line_results: list[dict[str, Any]]  # OCR results parsed line by line
+    fixture_results: list[dict[str, Any]]  # Mock OCR results with structured fixtures
+    item_names: list[str]
+    ingredients: list[SyntheticIngredient]
+
+    @property
+    def receipt_lines(self) -> list[list[str]]:
+        """OCR lines of each line-based receipt."""
+        return [result["lines"] for result in self.line_results]
+
+
+def _format_price(price: float) -> str:
+    return f"{price:.2f}".replace(".", ",")
+
+
+def _item_name(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < FIXTURE_NAME_SHARE:
+        fixture = rng.choice(MockOCRService.FIXTURES)
+        return str(rng.choice(fixture["items"])[0])
+    if roll < FIXTURE_NAME_SHARE + ABBREVIATION_NAME_SHARE:
+        abbr = rng.choice(list(ABBREVIATIONS))
+        return f"{abbr} {rng.choice(['LETT', 'FILET', 'GROV', 'NATURELL', 'MIX'])}"
+    keywords = rng.choice(list(CATEGORY_KEYWORDS.values()))
+    parts = [rng.choice(BRANDS)] if rng.random() < BRAND_SHARE else []
+    parts.append(rng.choice(keywords).upper())
+    if size := rng.choice(SIZES):
+        parts.append(size)
+    return " ".join(parts)
+
+
+def _item_lines(rng: random.Random, count: int) -> tuple[list[str], list[tuple[str, float]]]:
+    lines = []
+    items = []
+    for _ in range(count):
+        name = _item_name(rng)
+        price = round(rng.uniform(5, 250), 2)
+        lines.append(f"{name:<30} {_format_price(price):>8}")
+        items.append((name, price))
+        roll = rng.random()
+        if roll < PANT_SHARE:
+            quantity = rng.randint(1, 6)
+            deposit = rng.choice([2.0, 3.0])
+            name = f"PANT {quantity} X {_format_price(deposit)}"
+            lines.append(f"{name:<30} {_format_price(quantity * deposit):>8}")
+            items.append((name, quantity * deposit))
+        elif roll < PANT_SHARE + DISCOUNT_SHARE:
+            name = f"RABATT {name}"
+            lines.append(f"{name:<30} {_format_price(-10):>8}")
+            items.append((name, -10.0))
+    return lines, items
+
+
+def generate_receipt(rng: random.Random, min_items: int = 5, max_items: int = 120) -> list[str]:
+    """Generate the OCR lines of one receipt."""
+    merchant = rng.choice(MERCHANTS)
+    item_lines, items = _item_lines(rng, rng.randint(min_items, max_items))
+    total = sum(price for _, price in items)
+    return [
+        merchant,
+        f"{rng.choice(STREETS)} {rng.randint(1, 120)}, {rng.choice(CITIES)}",
+        "",
+        f"Dato: {rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2025  Kl: 14:32",
+        "-" * 40,
+        *item_lines,
+        "-" * 40,
+        f"{'TOTAL':<30} {_format_price(total):>8} NOK",
+        "",
+        f"Betalt med: {rng.choice(PAYMENTS)}",
+        "Takk for handelen!",
+    ]
+
+
+def _fixture_result(rng: random.Random) -> dict[str, Any]:
+    fixture = rng.choice(MockOCRService.FIXTURES)
+    _, items = _item_lines(rng, rng.randint(5, 60))
+    return {
+        "lines": [],
+        "blocks": [],
+        "raw": {
+            "fixture_used": True,
+            "merchant": fixture["merchant"],
+            "items": items,
+            "date": fixture["date"],
+            "time": fixture["time"],
+            "payment": fixture["payment"],
+        },
+    }
+
+
+def build_ingredients(scale: int = 1) -> list[SyntheticIngredient]:
+    """
+    Ingredient catalog: the seed ingredients plus one per categorizer keyword.
+
+    ``scale`` repeats the keyword-derived ingredients with suffixes to simulate
+    a larger catalog.
+    """
+    catalog = [
+        SyntheticIngredient(
+            name=i["name"], canonical_name=i["canonical_name"], aliases=i["aliases"]
+        )
+        for i in INGREDIENTS
+    ]
+    for copy in range(scale):
+        suffix = "" if copy == 0 else f" {copy}"
+        for keywords in CATEGORY_KEYWORDS.values():
+            catalog.extend(
+                SyntheticIngredient(
+                    name=keyword.title() + suffix,
+                    canonical_name=keyword + suffix,
+                    aliases=[keyword + "er" + suffix],
+                )
+                for keyword in keywords
+            )
+    return catalog
+
+
+def build_corpus(receipts: int = 200, seed: int = 42, ingredient_scale: int = 1) -> Corpus:
+    """Generate a deterministic corpus of roughly ``receipts`` receipts of each kind."""
+    rng = random.Random(seed)  # noqa: S311 - reproducible test data, not security
+    line_results = []
+    for _ in range(receipts):
+        lines = generate_receipt(rng)
+        line_results.append(
+            {
+                "lines": lines,
+                "blocks": [{"text": line, "confidence": 0.99} for line in lines if line],
+                "raw": {},
+            }
+        )
+    fixture_results = [_fixture_result(rng) for _ in range(receipts)]
+    item_names = [str(name) for result in fixture_results for name, _ in result["raw"]["items"]]
+    return Corpus(
+        line_results=line_results,
+        fixture_results=fixture_results,
+        item_names=item_names,
+        ingredients=build_ingredients(ingredient_scale),
+    )
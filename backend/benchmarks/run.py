@@ -0,0 +1,227 @@
+"""Benchmark the receipt pipeline and compare against a stored baseline.
+
+Usage (from backend/):
+    python -m benchmarks.run                     # compare with baseline.json
+    python -m benchmarks.run --update-baseline   # record a new baseline
+
+Throughput is reported raw and normalized by a fixed calibration workload
+timed alongside each run, and the normalized figure is what gets compared, so
+a baseline recorded on one machine stays meaningful on a faster or slower one. Peak traced memory
+per benchmark is compared as well, ignoring growth under MEMORY_FLOOR_KIB. Exits
+with status 1 on any regression beyond the tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from benchmarks.corpus import Corpus, build_corpus
+from src.services.categorizer import categorize_item
+from src.services.ingredient_matcher import IngredientMatcher
+from src.services.parser import parse_lines, parse_ocr_result
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+MEMORY_FLOOR_KIB = 4.0  # Peak memory growth always allowed; small peaks vary by a few hundred bytes
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    ops: int  # Units processed per run (receipts or item names)
+    ops_per_sec: float
+    normalized: float  # ops per calibration-workload duration; compared across machines
+    peak_kib: float  # Peak traced memory during one run
+
+
+Benchmark = Callable[[Corpus], int]
+
+
+def bench_parse_ocr_lines(corpus: Corpus) -> int:
+    """Parse line-based OCR results; one op per receipt."""
+    for result in corpus.line_results:
+        parse_ocr_result(result)
+    return len(corpus.line_results)
+
+
+def bench_parse_ocr_fixtures(corpus: Corpus) -> int:
+    """Parse structured mock OCR results; one op per receipt."""
+    for result in corpus.fixture_results:
+        parse_ocr_result(result)
+    return len(corpus.fixture_results)
+
+
+def bench_parse_lines(corpus: Corpus) -> int:
+    """Parse raw OCR lines; one op per receipt."""
+    for lines in corpus.receipt_lines:
+        parse_lines(lines)
+    return len(corpus.receipt_lines)
+
+
+def bench_categorize_item(corpus: Corpus) -> int:
+    """Categorize item names; one op per name."""
+    for name in corpus.item_names:
+        categorize_item(name)
+    return len(corpus.item_names)
+
+
+# Shared by runs so its ingredient index, like the catalog's in production, is
+# built by the warm-up run and not timed or traced
+_matcher = IngredientMatcher()
+
+
+def bench_ingredient_match(corpus: Corpus) -> int:
+    """Match item names against the ingredient catalog; one op per name."""
+    matcher = _matcher
+    names = corpus.item_names[:500]  # A slice keeps the run short
+
+    async def run() -> None:
+        for name in names:
+            await matcher.match(name, corpus.ingredients)
+
+    asyncio.run(run())
+    return len(names)
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "parse_ocr_result.lines": bench_parse_ocr_lines,
+    "parse_ocr_result.fixture": bench_parse_ocr_fixtures,
+    "parse_lines": bench_parse_lines,
+    "categorize_item": bench_categorize_item,
+    "ingredient_matcher.match": bench_ingredient_match,
+}
+
+
+_CALIBRATION_PATTERN = re.compile(r"(-?\d+[,.]?\d*)\s*(NOK|kr)?$", re.IGNORECASE)
+_CALIBRATION_LINES = [f"VARE {i} LETTMELK 1L {i},90" for i in range(1000)]
+
+
+def calibrate() -> None:
+    """Fixed string and regex workload, similar in kind to receipt parsing."""
+    counts: dict[str, int] = {}
+    for _ in range(10):
+        for line in _CALIBRATION_LINES:
+            _CALIBRATION_PATTERN.search(line)
+            for word in line.lower().split():
+                counts[word] = counts.get(word, 0) + 1
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_benchmark(name: str, corpus: Corpus, repeat: int) -> BenchmarkResult:
+    """
+    Time a benchmark, interleaved with the calibration workload.
+
+    Each timed run is paired with a calibration run just before it, and the
+    median time ratio gives the normalized throughput; this cancels most of
+    the drift from CPU frequency changes and noisy neighbours. Peak memory
+    comes from one extra traced run.
+    """
+    bench = BENCHMARKS[name]
+    ops = bench(corpus)  # Warm-up
+    times = []
+    ratios = []
+    for _ in range(repeat):
+        calibration_time = _timed(calibrate)
+        bench_time = _timed(lambda: bench(corpus))
+        times.append(bench_time)
+        ratios.append(bench_time / calibration_time)
+
+    tracemalloc.start()
+    try:
+        bench(corpus)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=name,
+        ops=ops,
+        ops_per_sec=round(ops / min(times), 1),
+        normalized=round(ops / statistics.median(ratios), 2),
+        peak_kib=round(peak / 1024, 1),
+    )
+
+
+def compare(
+    results: list[BenchmarkResult],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Describe each result that is slower or uses more memory than the baseline allows."""
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.name)
+        # Throughput is only comparable on the same corpus
+        if expected is None or expected["ops"] != result.ops:
+            continue
+        min_normalized = expected["normalized"] * (1 - tolerance)
+        if result.normalized < min_normalized:
+            regressions.append(
+                f"{result.name}: throughput {result.normalized} < {min_normalized:.2f} "
+                f"(baseline {expected['normalized']})"
+            )
+        max_peak = max(
+            expected["peak_kib"] * (1 + tolerance), expected["peak_kib"] + MEMORY_FLOOR_KIB
+        )
+        if result.peak_kib > max_peak:
+            regressions.append(
+                f"{result.name}: peak memory {result.peak_kib} KiB > {max_peak:.1f} KiB "
+                f"(baseline {expected['peak_kib']} KiB)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks; return the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--receipts", type=int, default=200, help="Receipts of each kind")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per benchmark")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS))
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(receipts=args.receipts, seed=args.seed)
+    names = args.only or list(BENCHMARKS)
+    results = [run_benchmark(name, corpus, args.repeat) for name in names]
+
+    print(f"{'benchmark':<28} {'ops':>7} {'ops/s':>12} {'normalized':>11} {'peak KiB':>10}")
+    for r in results:
+        print(
+            f"{r.name:<28} {r.ops:>7} {r.ops_per_sec:>12.1f} {r.normalized:>11.2f} "
+            f"{r.peak_kib:>10.1f}"
+        )
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update({r.name: asdict(r) for r in results})
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline", file=sys.stderr)
+        return 1
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,23 @@
 """Admin endpoints for database management."""
 
-from fastapi import APIRouter
-from pydantic import BaseModel
+import uuid
+from datetime import datetime
 
-from src.api.deps import AdminAuth
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from src.api.deps import (
+    AdminAuth,
+    AnalyticsCacheDep,
+    CatalogCacheDep,
+    DbSession,
+    ItemBackfillDep,
+    MatchMemoryDep,
+)
+from src.db.models import BackfillCheckpoint
 from src.db.seed_demo_data import seed_demo_data
+from src.services.item_backfill import JOB, BackfillRunningError, ItemBackfill
+from src.services.match_memory import memory_totals
 
 router = APIRouter()
 
@@ -24,3 +37,140 @@ async def seed_demo(
     """Seed database with demo data. Requires X-Admin-Key header."""
     await seed_demo_data(clear_first=clear_first)
     return SeedResponse(status="ok", message="Demo data seeded")
+
+
+class CatalogCacheStats(BaseModel):
+    """Catalog cache state of the worker that served the request."""
+
+    loaded: bool
+    version: int | None
+    categories: int
+    ingredients: int
+    hits: int
+    misses: int
+    version_checks: int
+
+
+@router.get("/admin/catalog-cache", response_model=CatalogCacheStats)
+async def catalog_cache_stats(_auth: AdminAuth, catalog_cache: CatalogCacheDep):
+    """Catalog cache hit/miss counters. Requires X-Admin-Key header."""
+    return CatalogCacheStats.model_validate(catalog_cache.stats())
+
+
+class AnalyticsCacheStats(BaseModel):
+    """Analytics response cache counters of the worker that served the request."""
+
+    enabled: bool
+    backend: str | None = None
+    entries: int | None = None  # Memory backend only
+    hits: int = 0
+    misses: int = 0
+    not_modified: int = 0  # Answered 304 from the client's ETag
+
+
+@router.get("/admin/analytics-cache", response_model=AnalyticsCacheStats)
+async def analytics_cache_stats(_auth: AdminAuth, analytics_cache: AnalyticsCacheDep):
+    """Analytics cache hit/miss counters. Requires X-Admin-Key header."""
+    if analytics_cache is None:
+        return AnalyticsCacheStats(enabled=False)
+    return AnalyticsCacheStats.model_validate({"enabled": True, **analytics_cache.stats()})
+
+
+class MatchMemoryStats(BaseModel):
+    """Learned match memory: table totals plus the serving worker's counters."""
+
+    entries: int
+    corrections: int
+    total_hits: int  # Lookups served from memory, all workers, as of the last flush
+    cached: int
+    cache_hits: int
+    db_hits: int
+    learned: int
+    unmatched: int
+    pending_hits: int  # Counted by this worker but not yet written
+
+
+@router.get("/admin/match-memory", response_model=MatchMemoryStats)
+async def match_memory_stats(_auth: AdminAuth, db: DbSession, match_memory: MatchMemoryDep):
+    """How much item matching is served by learned memory. Requires X-Admin-Key header."""
+    totals = await memory_totals(db)
+    return MatchMemoryStats.model_validate({**totals, **match_memory.stats()})
+
+
+class GlobalCorrection(BaseModel):
+    """Ingredient every household's receipts should match a raw name to."""
+
+    raw_name: str = Field(..., min_length=1)
+    ingredient_id: uuid.UUID
+
+
+class GlobalCorrectionResponse(BaseModel):
+    raw_key: str
+    ingredient_id: uuid.UUID
+
+
+@router.put("/admin/match-memory/corrections", response_model=GlobalCorrectionResponse)
+async def set_global_correction(
+    _auth: AdminAuth,
+    data: GlobalCorrection,
+    db: DbSession,
+    catalog_cache: CatalogCacheDep,
+    match_memory: MatchMemoryDep,
+):
+    """Remember a match for households without their own. Requires X-Admin-Key header."""
+    catalog = await catalog_cache.get(db)
+    if data.ingredient_id not in catalog.ingredients_by_id:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+    raw_key = await match_memory.remember_global(db, data.raw_name, data.ingredient_id)
+    return GlobalCorrectionResponse(raw_key=raw_key, ingredient_id=data.ingredient_id)
+
+
+class ItemBackfillStatus(BaseModel):
+    """Checkpoint of the item ingredient backfill."""
+
+    running: bool  # In the worker that served the request
+    processed: int
+    matched: int
+    last_id: uuid.UUID | None
+    started_at: datetime | None
+    updated_at: datetime | None
+    completed_at: datetime | None
+    items_per_second: float | None  # Throughput of the running pass
+
+
+async def backfill_status(db: DbSession, backfill: ItemBackfill) -> ItemBackfillStatus:
+    checkpoint = await db.get(BackfillCheckpoint, JOB)
+    running = backfill.running
+    return ItemBackfillStatus(
+        running=running,
+        processed=checkpoint.processed if checkpoint else 0,
+        matched=checkpoint.matched if checkpoint else 0,
+        last_id=checkpoint.last_id if checkpoint else None,
+        started_at=checkpoint.started_at if checkpoint else None,
+        updated_at=checkpoint.updated_at if checkpoint else None,
+        completed_at=checkpoint.completed_at if checkpoint else None,
+        items_per_second=(
+            backfill.progress.items_per_second if running and backfill.progress else None
+        ),
+    )
+
+
+@router.post("/admin/backfill/items", response_model=ItemBackfillStatus, status_code=202)
+async def start_item_backfill(
+    _auth: AdminAuth,
+    db: DbSession,
+    backfill: ItemBackfillDep,
+    restart: bool = False,
+):
+    """Match historical items to ingredients in the background. Requires X-Admin-Key header."""
+    try:
+        backfill.start(restart=restart)
+    except BackfillRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return await backfill_status(db, backfill)
+
+
+@router.get("/admin/backfill/items", response_model=ItemBackfillStatus)
+async def item_backfill_status(_auth: AdminAuth, db: DbSession, backfill: ItemBackfillDep):
+    """Progress of the item ingredient backfill. Requires X-Admin-Key header."""
+    return await backfill_status(db, backfill)
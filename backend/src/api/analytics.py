@@ -1,14 +1,42 @@
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import functools
+import inspect
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, time, timedelta
 from decimal import Decimal
+from typing import Annotated, Any, TypeVar, get_origin
 from uuid import UUID
 
-from fastapi import APIRouter, Query
-from pydantic import BaseModel
-from sqlalchemy import func, select
-
-from src.api.deps import DbSession, RestockPredictorDep
+from fastapi import APIRouter, HTTPException, Query, Request, Response, params
+from pydantic import BaseModel, Field
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Select,
+    and_,
+    cast,
+    func,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import INTERVAL
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.deps import (
+    AnalyticsCacheDep,
+    DbSession,
+    RestockPredictorDep,
+    SessionFactoryDep,
+)
+from src.config import settings
 from src.db.models import (
     Category,
+    Household,
     Ingredient,
     InventoryEvent,
     InventoryLot,
@@ -16,21 +44,107 @@ from src.db.models import (
     Leftover,
     MealPlan,
     Receipt,
+    Recipe,
 )
 from src.schemas.analytics import (
     CostPerMealResponse,
     LeftoverWasteEntry,
+    LeftoverWastePage,
     MealCostEntry,
-    RestockPrediction,
     RestockPredictionsResponse,
     SpendTrendPoint,
     SpendTrendResponse,
+    WasteBreakdown,
     WasteEntry,
+    WasteEntryPage,
     WasteResponse,
 )
+from src.services.analytics_cache import AnalyticsCache
+from src.services.restock_snapshots import load_snapshot, store_snapshots
+from src.services.spend_rollup import spend_facts
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+Endpoint = Callable[..., Awaitable[BaseModel]]
+T = TypeVar("T")
+
+
+def _is_dependency(parameter: inspect.Parameter) -> bool:
+    annotation = parameter.annotation
+    return get_origin(annotation) is Annotated and any(
+        isinstance(meta, params.Depends) for meta in annotation.__metadata__
+    )
+
+
+def cached(endpoint: Endpoint) -> Callable[..., Awaitable[Response | BaseModel]]:
+    """
+    Serve an analytics endpoint through the response cache, with ETags.
+
+    The endpoint's query parameters make up the cache key and its
+    ``household_id`` the data version scope; requests without a household are
+    computed every time. Adds the request and the cache to the parameters
+    FastAPI injects.
+    """
+    signature = inspect.signature(endpoint)
+    query_params = [name for name, p in signature.parameters.items() if not _is_dependency(p)]
+
+    @functools.wraps(endpoint)
+    async def wrapper(
+        request: Request,
+        analytics_cache: AnalyticsCache | None,
+        db: AsyncSession,
+        **kwargs: object,
+    ) -> Response | BaseModel:
+        household_id = kwargs.get("household_id")
+        if analytics_cache is None or not isinstance(household_id, UUID):
+            return await endpoint(db=db, **kwargs)
+
+        lookup = await analytics_cache.lookup(
+            db,
+            household_id,
+            request.url.path,
+            {name: kwargs[name] for name in query_params},
+            request.headers.get("if-none-match"),
+        )
+        headers = {"ETag": lookup.etag, "Cache-Control": "private, no-cache"}
+        if lookup.not_modified:
+            return Response(status_code=304, headers=headers)
+
+        body = lookup.body
+        if body is None:
+            result = await endpoint(db=db, **kwargs)
+            body = result.model_dump_json().encode()
+            await analytics_cache.store(db, lookup, body)
+        return Response(body, media_type="application/json", headers=headers)
+
+    wrapper.__signature__ = signature.replace(  # type: ignore[attr-defined]
+        parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            inspect.Parameter(
+                "analytics_cache", inspect.Parameter.KEYWORD_ONLY, annotation=AnalyticsCacheDep
+            ),
+        ]
+    )
+    return wrapper
+
+
+def cached_get(path: str, response_model: type[BaseModel]) -> Callable[[Endpoint], Endpoint]:
+    """
+    Register an analytics GET route served through ``cached``.
+
+    The decorated function is returned uncached, so the dashboard can call it
+    directly with a session of its own.
+    """
+
+    def register(endpoint: Endpoint) -> Endpoint:
+        router.get(path, response_model=response_model)(cached(endpoint))
+        return endpoint
+
+    return register
+
 
 class SummaryResponse(BaseModel):
     total_receipts: int
@@ -85,40 +199,69 @@ class ByStoreResponse(BaseModel):
     period_end: datetime | None
 
 
-@router.get("/analytics/summary", response_model=SummaryResponse)
+class DashboardQuery(BaseModel):
+    household_id: UUID
+    start_date: datetime
+    end_date: datetime
+    granularity: str = Field("weekly", pattern="^(daily|weekly|monthly)$")
+    top_items_sort_by: str = Field("spend", pattern="^(spend|count)$")
+    top_items_limit: int = Field(10, ge=1, le=50)
+
+
+class DashboardWidgets(BaseModel):
+    # Widgets computed from stored data only, cached together; None if it failed
+    summary: SummaryResponse | None = None
+    by_category: ByCategory | None = None
+    top_items: TopItemsResponse | None = None
+    by_store: ByStoreResponse | None = None
+    spend_trend: SpendTrendResponse | None = None
+    cost_per_meal: CostPerMealResponse | None = None
+    waste: WasteResponse | None = None
+
+
+class DashboardResponse(DashboardWidgets):
+    restock: RestockPredictionsResponse | None = None
+    # Receipts of the period with no household yet, left out of the receipt widgets
+    unassigned_receipts: int | None = None
+    errors: dict[str, str] = Field(default_factory=dict)  # Widget name -> why it is missing
+
+
+async def count_unassigned_receipts(
+    db: AsyncSession, start_date: datetime, end_date: datetime
+) -> int:
+    """Receipts of a period not assigned to a household yet."""
+    result = await db.execute(
+        select(func.count())
+        .select_from(Receipt)
+        .where(
+            Receipt.household_id.is_(None),
+            Receipt.purchase_date >= start_date,
+            Receipt.purchase_date <= end_date,
+        )
+    )
+    return result.scalar_one()
+
+
+@cached_get("/analytics/summary", SummaryResponse)
 async def get_summary(
     db: DbSession,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
+    household_id: UUID | None = None,
 ):
-    """Get spending summary for a period."""
+    """Get spending summary for a period, of one household or all."""
+    spend = spend_facts(start_date, end_date, household_id)
     query = select(
-        func.count(Receipt.id).label("total_receipts"),
-        func.coalesce(func.sum(Receipt.total_amount), 0).label("total_spent"),
-        func.min(Receipt.purchase_date).label("period_start"),
-        func.max(Receipt.purchase_date).label("period_end"),
+        func.coalesce(func.sum(spend.c.receipt_count), 0).label("total_receipts"),
+        func.coalesce(func.sum(spend.c.receipt_total), 0).label("total_spent"),
+        func.coalesce(func.sum(spend.c.item_count), 0).label("total_items"),
+        func.min(spend.c.first_purchase_at).label("period_start"),
+        func.max(spend.c.last_purchase_at).label("period_end"),
     )
 
-    if start_date:
-        query = query.where(Receipt.purchase_date >= start_date)
-    if end_date:
-        query = query.where(Receipt.purchase_date <= end_date)
-
     result = await db.execute(query)
     row = result.one()
 
-    # Get total items
-    items_query = select(func.count(Item.id))
-    if start_date or end_date:
-        items_query = items_query.join(Receipt)
-        if start_date:
-            items_query = items_query.where(Receipt.purchase_date >= start_date)
-        if end_date:
-            items_query = items_query.where(Receipt.purchase_date <= end_date)
-
-    items_result = await db.execute(items_query)
-    total_items = items_result.scalar() or 0
-
     total_receipts = row.total_receipts or 0
     total_spent = Decimal(str(row.total_spent or 0))
     avg_amount = total_spent / total_receipts if total_receipts > 0 else Decimal("0")
@@ -126,39 +269,36 @@ async def get_summary(
     return SummaryResponse(
         total_receipts=total_receipts,
         total_spent=total_spent,
-        total_items=total_items,
+        total_items=row.total_items,
         avg_receipt_amount=avg_amount.quantize(Decimal("0.01")),
         period_start=row.period_start,
         period_end=row.period_end,
     )
 
 
-@router.get("/analytics/by-category", response_model=ByCategory)
+@cached_get("/analytics/by-category", ByCategory)
 async def get_by_category(
     db: DbSession,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
+    household_id: UUID | None = None,
 ):
-    """Get spending breakdown by category."""
+    """Get spending breakdown by category, of one household or all."""
+    spend = spend_facts(start_date, end_date, household_id)
+
     # Categorized items
     query = (
         select(
             Category.name,
             Category.color,
-            func.sum(Item.total_price).label("total_spent"),
-            func.count(Item.id).label("item_count"),
+            func.sum(spend.c.item_total).label("total_spent"),
+            func.sum(spend.c.item_count).label("item_count"),
         )
-        .join(Item, Item.category_id == Category.id)
-        .join(Receipt, Item.receipt_id == Receipt.id)
+        .join(spend, spend.c.category_id == Category.id)
         .group_by(Category.id, Category.name, Category.color)
-        .order_by(func.sum(Item.total_price).desc())
+        .order_by(func.sum(spend.c.item_total).desc())
     )
 
-    if start_date:
-        query = query.where(Receipt.purchase_date >= start_date)
-    if end_date:
-        query = query.where(Receipt.purchase_date <= end_date)
-
     result = await db.execute(query)
     categories = [
         CategorySpending(
@@ -172,16 +312,9 @@ async def get_by_category(
 
     # Uncategorized items
     uncat_query = select(
-        func.coalesce(func.sum(Item.total_price), 0).label("total"),
-        func.count(Item.id).label("count"),
-    ).where(Item.category_id.is_(None))
-
-    if start_date or end_date:
-        uncat_query = uncat_query.join(Receipt, Item.receipt_id == Receipt.id)
-        if start_date:
-            uncat_query = uncat_query.where(Receipt.purchase_date >= start_date)
-        if end_date:
-            uncat_query = uncat_query.where(Receipt.purchase_date <= end_date)
+        func.coalesce(func.sum(spend.c.item_total), 0).label("total"),
+        func.coalesce(func.sum(spend.c.item_count), 0).label("count"),
+    ).where(spend.c.category_id.is_(None))
 
     uncat_result = await db.execute(uncat_query)
     uncat_row = uncat_result.one()
@@ -193,15 +326,16 @@ async def get_by_category(
     )
 
 
-@router.get("/analytics/top-items", response_model=TopItemsResponse)
+@cached_get("/analytics/top-items", TopItemsResponse)
 async def get_top_items(
     db: DbSession,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
+    household_id: UUID | None = None,
     sort_by: str = Query("spend", pattern="^(spend|count)$"),
     limit: int = Query(10, ge=1, le=50),
 ):
-    """Get top purchased items by spend or frequency."""
+    """Get top purchased items by spend or frequency, of one household or all."""
     # Use canonical_name if available, otherwise raw_name
     item_name = func.coalesce(Item.canonical_name, Item.raw_name)
 
@@ -213,15 +347,17 @@ async def get_top_items(
             func.count(Item.id).label("purchase_count"),
             func.max(Item.unit).label("unit"),  # Take any unit (assuming consistent)
         )
-        .join(Receipt, Item.receipt_id == Receipt.id)
         .where(Item.is_pant == False)  # Exclude bottle deposits  # noqa: E712
         .group_by(item_name)
     )
 
+    # Items carry their receipt's household and date, so no join is needed
+    if household_id:
+        query = query.where(Item.household_id == household_id)
     if start_date:
-        query = query.where(Receipt.purchase_date >= start_date)
+        query = query.where(Item.purchase_date >= start_date)
     if end_date:
-        query = query.where(Receipt.purchase_date <= end_date)
+        query = query.where(Item.purchase_date <= end_date)
 
     # Order by spend or count
     if sort_by == "spend":
@@ -259,33 +395,28 @@ async def get_top_items(
     )
 
 
-@router.get("/analytics/by-store", response_model=ByStoreResponse)
+@cached_get("/analytics/by-store", ByStoreResponse)
 async def get_by_store(
     db: DbSession,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
+    household_id: UUID | None = None,
 ):
-    """Get spending breakdown by store/merchant."""
-    # Normalize store names: uppercase, trim whitespace
-    store_name = func.upper(func.trim(Receipt.merchant_name))
+    """Get spending breakdown by store/merchant, of one household or all."""
+    # Store names are normalized in the rollup: uppercase, trimmed
+    spend = spend_facts(start_date, end_date, household_id)
 
     query = (
         select(
-            store_name.label("store_name"),
-            func.sum(Receipt.total_amount).label("total_spent"),
-            func.count(Receipt.id).label("receipt_count"),
-            func.max(Receipt.purchase_date).label("last_visit"),
+            spend.c.merchant.label("store_name"),
+            func.sum(spend.c.receipt_total).label("total_spent"),
+            func.sum(spend.c.receipt_count).label("receipt_count"),
+            func.max(spend.c.last_purchase_at).label("last_visit"),
         )
-        .where(Receipt.merchant_name.isnot(None))
-        .group_by(store_name)
-        .order_by(func.sum(Receipt.total_amount).desc())
+        .group_by(spend.c.merchant)
+        .order_by(func.sum(spend.c.receipt_total).desc())
     )
 
-    if start_date:
-        query = query.where(Receipt.purchase_date >= start_date)
-    if end_date:
-        query = query.where(Receipt.purchase_date <= end_date)
-
     result = await db.execute(query)
     rows = result.all()
 
@@ -311,7 +442,7 @@ async def get_by_store(
     )
 
 
-@router.get("/analytics/cost-per-meal", response_model=CostPerMealResponse)
+@cached_get("/analytics/cost-per-meal", CostPerMealResponse)
 async def get_cost_per_meal(
     db: DbSession,
     household_id: UUID,
@@ -368,146 +499,356 @@ async def get_cost_per_meal(
     )
 
 
-@router.get("/analytics/waste", response_model=WasteResponse)
-async def get_waste_analytics(
-    db: DbSession,
-    household_id: UUID,
-    start_date: datetime | None = None,
-    end_date: datetime | None = None,
-):
-    """Get waste analytics including discarded inventory and leftovers."""
-    from sqlalchemy.orm import selectinload
+# GROUPING(ingredient, category, reason, week) of each waste grouping set, with
+# its response field and column; a bit is set for every column aggregated away
+WASTE_GROUPINGS = {
+    0b0111: ("by_ingredient", "ingredient"),
+    0b1011: ("by_category", "category"),
+    0b1101: ("by_reason", "reason"),
+    0b1110: ("by_week", "week"),
+}
+WASTE_TOTAL = 0b1111
 
-    # Get discarded inventory events
-    inv_query = (
-        select(InventoryEvent)
-        .join(InventoryLot, InventoryEvent.lot_id == InventoryLot.id)
-        .where(
-            InventoryLot.household_id == household_id,
-            InventoryEvent.event_type == "discard",
-        )
-        .options(selectinload(InventoryEvent.lot).selectinload(InventoryLot.ingredient))
-        .order_by(InventoryEvent.created_at.desc())
-    )
+Cursor = tuple[datetime, UUID]
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Opaque keyset cursor after a row of a (created_at, id) descending listing."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Keyset position of a cursor from ``encode_cursor``; 400 if malformed."""
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
 
+
+def _discard_filters(
+    household_id: UUID, start_date: datetime | None, end_date: datetime | None
+) -> list[ColumnElement[bool]]:
+    filters = [InventoryLot.household_id == household_id, InventoryEvent.event_type == "discard"]
     if start_date:
-        inv_query = inv_query.where(InventoryEvent.created_at >= start_date)
+        filters.append(InventoryEvent.created_at >= start_date)
     if end_date:
-        inv_query = inv_query.where(InventoryEvent.created_at <= end_date)
-
-    inv_result = await db.execute(inv_query)
-    inv_events = inv_result.scalars().all()
+        filters.append(InventoryEvent.created_at <= end_date)
+    return filters
 
-    inventory_discards = []
-    total_waste_value = Decimal("0")
 
-    for event in inv_events:
-        lot = event.lot
-        quantity = abs(event.quantity_delta)
-        # Estimate value based on lot's unit cost
-        estimated_value = quantity * lot.unit_cost if lot.unit_cost else None
+def _leftover_filters(
+    household_id: UUID, start_date: datetime | None, end_date: datetime | None
+) -> list[ColumnElement[bool]]:
+    filters = [Leftover.household_id == household_id, Leftover.status == "discarded"]
+    if start_date:
+        filters.append(Leftover.created_at >= start_date)
+    if end_date:
+        filters.append(Leftover.created_at <= end_date)
+    return filters
+
+
+def waste_totals_query(
+    household_id: UUID, start_date: datetime | None, end_date: datetime | None
+) -> Select[Any]:
+    """
+    Discard counts and values per ingredient, category, reason and week, and overall.
+
+    One pass over the discards with GROUPING SETS; the ``grouping`` column
+    tells the sets apart (see ``WASTE_GROUPINGS``). A discard is valued at its
+    quantity times the unit cost of its lot.
+    """
+    value = func.abs(InventoryEvent.quantity_delta) * InventoryLot.unit_cost
+    reason = func.coalesce(InventoryEvent.reason, "discarded")
+    week = func.date_trunc("week", InventoryEvent.created_at)
+    return (
+        select(
+            func.grouping(Ingredient.id, Category.name, reason, week).label("grouping"),
+            Ingredient.name.label("ingredient"),
+            Category.name.label("category"),
+            reason.label("reason"),
+            week.label("week"),
+            func.count().label("discard_count"),
+            func.coalesce(func.sum(value), 0).label("estimated_value"),
+        )
+        .select_from(InventoryEvent)
+        .join(InventoryLot, InventoryEvent.lot_id == InventoryLot.id)
+        .join(Ingredient, InventoryLot.ingredient_id == Ingredient.id)
+        .outerjoin(Category, Ingredient.category_id == Category.id)
+        .where(*_discard_filters(household_id, start_date, end_date))
+        .group_by(
+            func.grouping_sets(
+                tuple_(Ingredient.id, Ingredient.name), Category.name, reason, week, tuple_()
+            )
+        )
+    )
 
-        if estimated_value:
-            total_waste_value += estimated_value
 
-        inventory_discards.append(
+async def _inventory_discard_page(
+    db: AsyncSession,
+    household_id: UUID,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    after: Cursor | None,
+    limit: int,
+) -> WasteEntryPage:
+    query = (
+        select(
+            InventoryEvent.id,
+            InventoryEvent.created_at,
+            InventoryEvent.quantity_delta,
+            InventoryEvent.unit,
+            InventoryEvent.reason,
+            InventoryLot.unit_cost,
+            Ingredient.name.label("ingredient_name"),
+        )
+        .join(InventoryLot, InventoryEvent.lot_id == InventoryLot.id)
+        .join(Ingredient, InventoryLot.ingredient_id == Ingredient.id)
+        .where(*_discard_filters(household_id, start_date, end_date))
+        .order_by(InventoryEvent.created_at.desc(), InventoryEvent.id.desc())
+        .limit(limit + 1)  # One more tells whether there is a next page
+    )
+    if after is not None:
+        query = query.where(tuple_(InventoryEvent.created_at, InventoryEvent.id) < tuple_(*after))
+
+    rows = (await db.execute(query)).all()
+    items = []
+    for row in rows[:limit]:
+        quantity = abs(row.quantity_delta)
+        items.append(
             WasteEntry(
-                date=event.created_at,
-                ingredient_name=lot.ingredient.name if lot.ingredient else None,
+                date=row.created_at,
+                ingredient_name=row.ingredient_name,
                 quantity=quantity,
-                unit=event.unit,
-                reason=event.reason or "discarded",
-                estimated_value=estimated_value,
+                unit=row.unit,
+                reason=row.reason or "discarded",
+                # Estimate value based on lot's unit cost
+                estimated_value=quantity * row.unit_cost if row.unit_cost else None,
             )
         )
-
-    # Get discarded leftovers
-    leftover_query = (
-        select(Leftover)
-        .where(
-            Leftover.household_id == household_id,
-            Leftover.status == "discarded",
-        )
-        .options(selectinload(Leftover.recipe))
-        .order_by(Leftover.created_at.desc())
+    last = rows[limit - 1] if len(rows) > limit else None
+    return WasteEntryPage(
+        items=items, next_cursor=encode_cursor(last.created_at, last.id) if last else None
     )
 
-    if start_date:
-        leftover_query = leftover_query.where(Leftover.created_at >= start_date)
-    if end_date:
-        leftover_query = leftover_query.where(Leftover.created_at <= end_date)
 
-    leftover_result = await db.execute(leftover_query)
-    leftovers = leftover_result.scalars().all()
+async def _leftover_discard_page(
+    db: AsyncSession,
+    household_id: UUID,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    after: Cursor | None,
+    limit: int,
+) -> LeftoverWastePage:
+    query = (
+        select(
+            Leftover.id,
+            Leftover.created_at,
+            Leftover.remaining_servings,
+            Recipe.name.label("recipe_name"),
+        )
+        .outerjoin(Recipe, Leftover.recipe_id == Recipe.id)
+        .where(*_leftover_filters(household_id, start_date, end_date))
+        .order_by(Leftover.created_at.desc(), Leftover.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        query = query.where(tuple_(Leftover.created_at, Leftover.id) < tuple_(*after))
 
-    leftover_discards = [
+    rows = (await db.execute(query)).all()
+    items = [
         LeftoverWasteEntry(
-            leftover_id=lo.id,
-            recipe_name=lo.recipe.name if lo.recipe else "Unknown",
-            servings_wasted=lo.remaining_servings,
-            created_at=lo.created_at,
+            leftover_id=row.id,
+            recipe_name=row.recipe_name or "Unknown",
+            servings_wasted=row.remaining_servings,
+            created_at=row.created_at,
             discarded_at=None,  # We don't track when it was marked discarded
         )
-        for lo in leftovers
+        for row in rows[:limit]
     ]
+    last = rows[limit - 1] if len(rows) > limit else None
+    return LeftoverWastePage(
+        items=items, next_cursor=encode_cursor(last.created_at, last.id) if last else None
+    )
 
-    total_servings_wasted = sum(lo.remaining_servings for lo in leftovers)
+
+@cached_get("/analytics/waste", WasteResponse)
+async def get_waste_analytics(
+    db: DbSession,
+    household_id: UUID,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+):
+    """
+    Get waste analytics including discarded inventory and leftovers.
+
+    Totals and breakdowns are aggregated in SQL; the discards themselves are
+    listed newest first up to ``limit`` each, continued by the
+    ``/analytics/waste/*-discards`` endpoints.
+    """
+    breakdowns: dict[str, list[WasteBreakdown]] = {
+        field: [] for field, _ in WASTE_GROUPINGS.values()
+    }
+    total_count, total_value = 0, Decimal("0")
+    for row in (await db.execute(waste_totals_query(household_id, start_date, end_date))).all():
+        value = Decimal(str(row.estimated_value))
+        if row.grouping == WASTE_TOTAL:
+            total_count, total_value = row.discard_count, value
+            continue
+        field, column = WASTE_GROUPINGS[row.grouping]
+        name = getattr(row, column)
+        if column == "week":
+            name = name.strftime("%G-W%V")
+        breakdowns[field].append(
+            WasteBreakdown(name=name, discard_count=row.discard_count, estimated_value=value)
+        )
+    for field, entries in breakdowns.items():
+        if field == "by_week":
+            entries.sort(key=lambda b: b.name or "")
+        else:
+            entries.sort(key=lambda b: (-b.estimated_value, -b.discard_count))
+
+    leftover_totals = (
+        await db.execute(
+            select(
+                func.count(Leftover.id).label("count"),
+                func.coalesce(func.sum(Leftover.remaining_servings), 0).label("servings"),
+            ).where(*_leftover_filters(household_id, start_date, end_date))
+        )
+    ).one()
+
+    inventory = await _inventory_discard_page(db, household_id, start_date, end_date, None, limit)
+    leftovers = await _leftover_discard_page(db, household_id, start_date, end_date, None, limit)
 
     return WasteResponse(
-        inventory_discards=inventory_discards,
-        leftover_discards=leftover_discards,
-        total_inventory_waste_value=total_waste_value,
-        total_leftover_servings_wasted=total_servings_wasted,
+        inventory_discards=inventory.items,
+        leftover_discards=leftovers.items,
+        inventory_next_cursor=inventory.next_cursor,
+        leftover_next_cursor=leftovers.next_cursor,
+        inventory_discard_count=total_count,
+        leftover_discard_count=leftover_totals.count,
+        total_inventory_waste_value=total_value,
+        total_leftover_servings_wasted=leftover_totals.servings,
+        **breakdowns,
         period_start=start_date,
         period_end=end_date,
     )
 
 
-@router.get("/analytics/spend-trend", response_model=SpendTrendResponse)
-async def get_spend_trend(
+@cached_get("/analytics/waste/inventory-discards", WasteEntryPage)
+async def get_inventory_discards(
     db: DbSession,
+    household_id: UUID,
+    cursor: str,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+):
+    """Get the next page of discarded inventory, from a waste response's cursor."""
+    return await _inventory_discard_page(
+        db, household_id, start_date, end_date, decode_cursor(cursor), limit
+    )
+
+
+@cached_get("/analytics/waste/leftover-discards", LeftoverWastePage)
+async def get_leftover_discards(
+    db: DbSession,
+    household_id: UUID,
+    cursor: str,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+):
+    """Get the next page of discarded leftovers, from a waste response's cursor."""
+    return await _leftover_discard_page(
+        db, household_id, start_date, end_date, decode_cursor(cursor), limit
+    )
+
+
+TREND_UNITS = {"daily": "day", "weekly": "week", "monthly": "month"}
+# Periods back to the same period last year; 364 days keeps daily comparisons on the same weekday
+YEAR_AGO_PERIODS = {"daily": 364, "weekly": 52, "monthly": 12}
+
+
+def period_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the trend period containing a moment, like ``date_trunc``."""
+    day = datetime.combine(moment.date(), time.min)
+    if granularity == "weekly":
+        return day - timedelta(days=day.weekday())
+    if granularity == "monthly":
+        return day.replace(day=1)
+    return day
+
+
+def periods_back(start: datetime, granularity: str, count: int) -> datetime:
+    """Start of the trend period ``count`` periods before the one starting at ``start``."""
+    if granularity == "monthly":
+        months = start.year * 12 + start.month - 1 - count
+        return start.replace(year=months // 12, month=months % 12 + 1)
+    return start - timedelta(days=count * (7 if granularity == "weekly" else 1))
+
+
+def spend_trend_query(
     household_id: UUID,
     start_date: datetime,
     end_date: datetime,
-    granularity: str = Query("weekly", pattern="^(daily|weekly|monthly)$"),
-):
-    """Get spending trends over time."""
-    # Determine date truncation based on granularity
-    if granularity == "daily":
-        trunc_func = func.date_trunc("day", Receipt.purchase_date)
-    elif granularity == "weekly":
-        trunc_func = func.date_trunc("week", Receipt.purchase_date)
-    else:  # monthly
-        trunc_func = func.date_trunc("month", Receipt.purchase_date)
-
-    # Receipt spending by period
-    receipt_query = (
-        select(
-            trunc_func.label("period"),
-            func.sum(Receipt.total_amount).label("total_spent"),
-            func.count(Receipt.id).label("receipt_count"),
-        )
-        .where(
-            Receipt.household_id == household_id,
-            Receipt.purchase_date >= start_date,
-            Receipt.purchase_date <= end_date,
+    granularity: str,
+    compare: str | None = None,
+) -> Select[Any]:
+    """
+    Receipt spend and cooked-meal cost per period, with empty periods filled.
+
+    ``generate_series`` yields every period from the one containing
+    ``start_date`` to the one containing ``end_date``, both aggregates are
+    joined onto it, and ``lag`` over the series adds the compared period's
+    figures. For a comparison the series and aggregates start early enough to
+    cover the compared periods, which are dropped from the result.
+    """
+    unit = TREND_UNITS[granularity]
+    first_period = period_start(start_date, granularity)
+    offset = 0
+    if compare is not None:
+        offset = 1 if compare == "previous" else YEAR_AGO_PERIODS[granularity]
+    series_start = periods_back(first_period, granularity, offset)
+
+    periods = (
+        func.generate_series(
+            series_start,
+            period_start(end_date, granularity),
+            literal_column(f"INTERVAL '1 {unit}'", INTERVAL),  # unit is one of TREND_UNITS
         )
-        .group_by(trunc_func)
-        .order_by(trunc_func)
+        .table_valued("period")
+        .render_derived(name="periods")
     )
 
-    receipt_result = await db.execute(receipt_query)
-    receipt_data = {row.period: row for row in receipt_result.all()}
+    # Receipts in the range, plus whole compared periods before it
+    facts = spend_facts(start_date, end_date, household_id)
+    meal_range = and_(MealPlan.cooked_at >= start_date, MealPlan.cooked_at <= end_date)
+    if offset:
+        earlier = spend_facts(series_start, first_period - timedelta(microseconds=1), household_id)
+        facts = union_all(
+            *(select(f.c.day, f.c.receipt_total, f.c.receipt_count) for f in (facts, earlier))
+        ).subquery("trend_facts")
+        meal_range = or_(
+            meal_range,
+            and_(MealPlan.cooked_at >= series_start, MealPlan.cooked_at < first_period),
+        )
 
-    # Meal costs by period (use MealPlan.cooked_at for the trunc)
-    meal_trunc_func = func.date_trunc(
-        "day" if granularity == "daily" else "week" if granularity == "weekly" else "month",
-        MealPlan.cooked_at,
+    receipt_period = func.date_trunc(unit, cast(facts.c.day, DateTime))
+    receipts = (
+        select(
+            receipt_period.label("period"),
+            func.sum(facts.c.receipt_total).label("total_spent"),
+            func.sum(facts.c.receipt_count).label("receipt_count"),
+        )
+        .group_by(receipt_period)
+        .subquery("receipt_periods")
     )
-
-    meal_query = (
+    meal_period = func.date_trunc(unit, MealPlan.cooked_at)
+    meals = (
         select(
-            meal_trunc_func.label("period"),
+            meal_period.label("period"),
             func.sum(MealPlan.actual_cost).label("meal_cost"),
             func.count(MealPlan.id).label("meal_count"),
         )
@@ -515,49 +856,77 @@ async def get_spend_trend(
             MealPlan.household_id == household_id,
             MealPlan.status == "cooked",
             MealPlan.actual_cost.isnot(None),
-            MealPlan.cooked_at >= start_date,
-            MealPlan.cooked_at <= end_date,
+            meal_range,
         )
-        .group_by(meal_trunc_func)
-        .order_by(meal_trunc_func)
+        .group_by(meal_period)
+        .subquery("meal_periods")
     )
 
-    meal_result = await db.execute(meal_query)
-    meal_data = {row.period: row for row in meal_result.all()}
+    total_spent = func.coalesce(receipts.c.total_spent, 0)
+    meal_cost = func.coalesce(meals.c.meal_cost, 0)
+    columns = [
+        periods.c.period,
+        total_spent.label("total_spent"),
+        func.coalesce(receipts.c.receipt_count, 0).label("receipt_count"),
+        meal_cost.label("meal_cost"),
+        func.coalesce(meals.c.meal_count, 0).label("meal_count"),
+    ]
+    if offset:
+        columns += [
+            func.lag(total_spent, offset)
+            .over(order_by=periods.c.period)
+            .label("compare_total_spent"),
+            func.lag(meal_cost, offset).over(order_by=periods.c.period).label("compare_meal_cost"),
+        ]
+    trend = (
+        select(*columns)
+        .select_from(periods)
+        .outerjoin(receipts, receipts.c.period == periods.c.period)
+        .outerjoin(meals, meals.c.period == periods.c.period)
+        .subquery("trend")
+    )
+    return select(trend).where(trend.c.period >= first_period).order_by(trend.c.period)
 
-    # Combine data points
-    all_periods = sorted(set(receipt_data.keys()) | set(meal_data.keys()))
 
-    trends = []
-    for period in all_periods:
-        receipt_row = receipt_data.get(period)
-        meal_row = meal_data.get(period)
+@cached_get("/analytics/spend-trend", SpendTrendResponse)
+async def get_spend_trend(
+    db: DbSession,
+    household_id: UUID,
+    start_date: datetime,
+    end_date: datetime,
+    granularity: str = Query("weekly", pattern="^(daily|weekly|monthly)$"),
+    compare: Annotated[str | None, Query(pattern="^(previous|last_year)$")] = None,
+):
+    """
+    Get spending trends over time, one point per period including empty ones.
+
+    ``compare`` adds each period's figures for the previous period or the same
+    period last year.
+    """
+    result = await db.execute(
+        spend_trend_query(household_id, start_date, end_date, granularity, compare)
+    )
 
-        # Format period string
-        if granularity == "daily":
-            period_str = period.strftime("%Y-%m-%d")
-        elif granularity == "weekly":
-            period_str = period.strftime("%G-W%V")
-        else:
-            period_str = period.strftime("%Y-%m")
-
-        trends.append(
-            SpendTrendPoint(
-                period=period_str,
-                total_spent=Decimal(str(receipt_row.total_spent)) if receipt_row else Decimal("0"),
-                receipt_count=receipt_row.receipt_count if receipt_row else 0,
-                meal_count=meal_row.meal_count if meal_row else 0,
-                meal_cost=(
-                    Decimal(str(meal_row.meal_cost))
-                    if meal_row and meal_row.meal_cost
-                    else Decimal("0")
-                ),
-            )
+    period_format = {"daily": "%Y-%m-%d", "weekly": "%G-W%V", "monthly": "%Y-%m"}[granularity]
+    trends = [
+        SpendTrendPoint(
+            period=row.period.strftime(period_format),
+            total_spent=Decimal(str(row.total_spent)),
+            receipt_count=row.receipt_count,
+            meal_count=row.meal_count,
+            meal_cost=Decimal(str(row.meal_cost)),
+            compare_total_spent=(
+                Decimal(str(row.compare_total_spent)) if compare is not None else None
+            ),
+            compare_meal_cost=Decimal(str(row.compare_meal_cost)) if compare is not None else None,
         )
+        for row in result.all()
+    ]
 
     return SpendTrendResponse(
         trends=trends,
         granularity=granularity,
+        compare=compare,
         period_start=start_date,
         period_end=end_date,
     )
@@ -569,91 +938,115 @@ async def get_restock_predictions(
     predictor: RestockPredictorDep,
     household_id: UUID,
 ):
-    """Get restock predictions for inventory items."""
-    # Get all ingredients with inventory
-    inv_query = (
-        select(
-            InventoryLot.ingredient_id,
-            Ingredient.name,
-            func.sum(InventoryLot.quantity).label("total_quantity"),
-            InventoryLot.unit,
-        )
-        .join(Ingredient, InventoryLot.ingredient_id == Ingredient.id)
-        .where(
-            InventoryLot.household_id == household_id,
-            InventoryLot.quantity > 0,
+    """Get the household's latest restock predictions snapshot."""
+    snapshot = await load_snapshot(db, household_id)
+    if snapshot is None:
+        # Not reached by the refresher yet, or no such household
+        result = await db.execute(select(Household.id).where(Household.id == household_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Household not found")
+        snapshots = await store_snapshots(db, predictor, [household_id], datetime.now())
+        snapshot = snapshots[household_id]
+    return snapshot
+
+
+@router.get("/analytics/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    db: DbSession,
+    analytics_cache: AnalyticsCacheDep,
+    session_factory: SessionFactoryDep,
+    predictor: RestockPredictorDep,
+    query: Annotated[DashboardQuery, Query()],
+):
+    """
+    Get all analytics widgets of a household for a period in one call.
+
+    The widgets are independent, so they are computed concurrently, each on its
+    own pooled connection and at most ``analytics_dashboard_concurrency`` at a
+    time. Every widget covers the household only: uploads are not assigned to
+    a household until they are added to its inventory, so the receipts of the
+    period still without one are counted in ``unassigned_receipts`` instead. A
+    widget that fails is left out and named in ``errors``; the others are
+    still returned.
+
+    Widgets computed from stored data are cached together under the
+    household's data version. Restock predictions are read from the household's
+    snapshot and unassigned receipts counted on every call; a snapshot computed
+    because none existed yet is committed with its widget.
+    """
+    slots = asyncio.Semaphore(settings.analytics_dashboard_concurrency)
+    errors: dict[str, str] = {}
+
+    async def widget(
+        name: str, endpoint: Callable[..., Awaitable[T]], **kwargs: object
+    ) -> T | None:
+        try:
+            async with slots, session_factory() as session:
+                result = await endpoint(db=session, **kwargs)
+                await session.commit()
+                return result
+        except HTTPException as e:
+            errors[name] = str(e.detail)
+        except Exception:
+            logger.exception("Dashboard widget %s failed", name)
+            errors[name] = "Failed to compute"
+        return None
+
+    lookup = None
+    if analytics_cache is not None:
+        lookup = await analytics_cache.lookup(
+            db, query.household_id, request.url.path, query.model_dump()
         )
-        .group_by(InventoryLot.ingredient_id, Ingredient.name, InventoryLot.unit)
-    )
-
-    inv_result = await db.execute(inv_query)
-    inventory_items = inv_result.all()
-
-    predictions = []
-    now = datetime.now()
 
-    # Fetch all consumption events for these ingredients in one query
-    ingredient_ids = [item.ingredient_id for item in inventory_items]
-    if ingredient_ids:
-        events_query = (
-            select(
-                InventoryEvent.quantity_delta,
-                InventoryEvent.created_at,
-                InventoryLot.ingredient_id,
-            )
-            .join(InventoryLot, InventoryEvent.lot_id == InventoryLot.id)
-            .where(
-                InventoryLot.household_id == household_id,
-                InventoryLot.ingredient_id.in_(ingredient_ids),
-                InventoryEvent.event_type == "consume",
-                InventoryEvent.created_at >= now - timedelta(days=30),
+    cached_widgets = None
+    if lookup is not None and lookup.body is not None:
+        cached_widgets = DashboardWidgets.model_validate_json(lookup.body)
+
+    computed: dict[str, asyncio.Task[BaseModel | None]] = {}
+    async with asyncio.TaskGroup() as tasks:
+        restock = tasks.create_task(
+            widget(
+                "restock",
+                get_restock_predictions,
+                predictor=predictor,
+                household_id=query.household_id,
             )
         )
-        events_result = await db.execute(events_query)
-
-        # Group events by ingredient_id
-        events_by_ingredient: dict[UUID, list[dict]] = {}
-        for row in events_result.all():
-            ing_id = row.ingredient_id
-            if ing_id not in events_by_ingredient:
-                events_by_ingredient[ing_id] = []
-            events_by_ingredient[ing_id].append(
-                {
-                    "quantity_delta": row.quantity_delta,
-                    "created_at": row.created_at,
-                }
-            )
-    else:
-        events_by_ingredient = {}
-
-    for item in inventory_items:
-        events = events_by_ingredient.get(item.ingredient_id, [])
-
-        avg_usage = predictor.calculate_average_daily_usage(events)
-        runout_info = predictor.predict_runout(
-            current_quantity=Decimal(str(item.total_quantity)),
-            average_daily_usage=avg_usage,
-            from_date=now,
-        )
-
-        predictions.append(
-            RestockPrediction(
-                ingredient_id=item.ingredient_id,
-                ingredient_name=item.name,
-                current_quantity=Decimal(str(item.total_quantity)),
-                unit=item.unit,
-                average_daily_usage=avg_usage,
-                days_until_empty=runout_info["days_until_empty"],
-                predicted_runout_date=runout_info["predicted_runout_date"],
-                recommended_restock_date=runout_info["recommended_restock_date"],
+        unassigned = tasks.create_task(
+            widget(
+                "unassigned_receipts",
+                count_unassigned_receipts,
+                start_date=query.start_date,
+                end_date=query.end_date,
             )
         )
-
-    # Sort by days until empty (soonest first, None at end)
-    predictions.sort(key=lambda p: (p.days_until_empty is None, p.days_until_empty or 999))
-
-    return RestockPredictionsResponse(
-        predictions=predictions,
-        household_id=household_id,
-        generated_at=now,
+        if cached_widgets is None:
+            period = query.model_dump(include={"household_id", "start_date", "end_date"})
+            top_items = {"sort_by": query.top_items_sort_by, "limit": query.top_items_limit}
+            endpoints: dict[str, tuple[Callable[..., Awaitable[BaseModel]], dict[str, object]]] = {
+                "summary": (get_summary, period),
+                "by_category": (get_by_category, period),
+                "top_items": (get_top_items, {**period, **top_items}),
+                "by_store": (get_by_store, period),
+                "spend_trend": (get_spend_trend, {**period, "granularity": query.granularity}),
+                "cost_per_meal": (get_cost_per_meal, period),
+                "waste": (get_waste_analytics, period),
+            }
+            computed = {
+                name: tasks.create_task(widget(name, endpoint, **kwargs))
+                for name, (endpoint, kwargs) in endpoints.items()
+            }
+
+    widgets = cached_widgets
+    if widgets is None:
+        widgets = DashboardWidgets(**{name: task.result() for name, task in computed.items()})
+        if analytics_cache is not None and lookup is not None and not errors:
+            await analytics_cache.store(db, lookup, widgets.model_dump_json().encode())
+
+    return DashboardResponse(
+        **dict(widgets),
+        restock=restock.result(),
+        unassigned_receipts=unassigned.result(),
+        errors=errors,
     )
@@ -1,32 +1,98 @@
 import secrets
+from functools import cache
 from typing import Annotated
 
 from fastapi import Depends, Header, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.config import settings
+from src.db.engine import async_session_factory
 from src.db.session import get_db
+from src.services.analytics_cache import AnalyticsCache, analytics_cache
+from src.services.catalog_cache import CatalogCache, catalog_cache
+from src.services.image_preprocessor import ImagePreprocessor, image_preprocessor
+from src.services.item_backfill import ItemBackfill, item_backfill
+from src.services.match_memory import MatchMemory, match_memory
 from src.services.meal_plan_service import MealPlanService
 from src.services.mock_llm import MockLLMService
 from src.services.mock_ocr import MockOCRService
 from src.services.ocr import OCRService
+from src.services.receipt_jobs import ReceiptJobQueue, receipt_job_queue
 from src.services.recipe_importer import RecipeImporter
-from src.services.restock_predictor import RestockPredictor
+from src.services.restock_predictor import RestockPredictor, restock_predictor
+from src.services.restock_snapshots import RestockSnapshotRefresher, restock_refresher
 from src.services.shopping_generator import ShoppingGenerator
 
 DbSession = Annotated[AsyncSession, Depends(get_db)]
 
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_session_factory
+
+
+# For endpoints running queries concurrently, each on a session of its own
+SessionFactoryDep = Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
+
+
+@cache
+def _textract_service() -> OCRService:
+    # One boto3 client per process; clients are thread-safe and costly to create
+    from src.services.textract_ocr import TextractOCRService
+
+    return TextractOCRService()
+
+
 def get_ocr_service() -> OCRService:
     if settings.use_mock_ocr:
         return MockOCRService()
-    # Future: return TextractOCRService()
-    return MockOCRService()
+    return _textract_service()
 
 
 OCRServiceDep = Annotated[OCRService, Depends(get_ocr_service)]
 
 
+def get_image_preprocessor() -> ImagePreprocessor | None:
+    return image_preprocessor if settings.image_preprocess else None
+
+
+ImagePreprocessorDep = Annotated[ImagePreprocessor | None, Depends(get_image_preprocessor)]
+
+
+def get_receipt_job_queue() -> ReceiptJobQueue:
+    return receipt_job_queue
+
+
+ReceiptJobQueueDep = Annotated[ReceiptJobQueue, Depends(get_receipt_job_queue)]
+
+
+def get_catalog_cache() -> CatalogCache:
+    return catalog_cache
+
+
+CatalogCacheDep = Annotated[CatalogCache, Depends(get_catalog_cache)]
+
+
+def get_analytics_cache() -> AnalyticsCache | None:
+    return analytics_cache if settings.analytics_cache != "off" else None
+
+
+AnalyticsCacheDep = Annotated[AnalyticsCache | None, Depends(get_analytics_cache)]
+
+
+def get_match_memory() -> MatchMemory:
+    return match_memory
+
+
+MatchMemoryDep = Annotated[MatchMemory, Depends(get_match_memory)]
+
+
+def get_item_backfill() -> ItemBackfill:
+    return item_backfill
+
+
+ItemBackfillDep = Annotated[ItemBackfill, Depends(get_item_backfill)]
+
+
 def get_recipe_importer() -> RecipeImporter:
     llm_service = MockLLMService()
     return RecipeImporter(llm_service=llm_service)
@@ -50,12 +116,19 @@ ShoppingGeneratorDep = Annotated[ShoppingGenerator, Depends(get_shopping_generat
 
 
 def get_restock_predictor() -> RestockPredictor:
-    return RestockPredictor()
+    return restock_predictor
 
 
 RestockPredictorDep = Annotated[RestockPredictor, Depends(get_restock_predictor)]
 
 
+def get_restock_refresher() -> RestockSnapshotRefresher:
+    return restock_refresher
+
+
+RestockRefresherDep = Annotated[RestockSnapshotRefresher, Depends(get_restock_refresher)]
+
+
 async def verify_admin_key(x_admin_key: str = Header(..., alias="X-Admin-Key")) -> None:
     """Verify admin API key from header."""
     if not settings.admin_api_key:
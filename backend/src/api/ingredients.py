@@ -1,18 +1,21 @@
 """Ingredient management API routes."""
 
 import uuid
+from typing import Literal
 
 from fastapi import APIRouter, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
-from src.api.deps import DbSession
+from src.api.deps import CatalogCacheDep, DbSession
 from src.db.models import Ingredient
 from src.schemas.ingredient import (
     IngredientCreate,
     IngredientResponse,
     IngredientUpdate,
 )
+from src.services.analytics_cache import mark_all_data_changed
+from src.services.ingredient_search import search_ingredient_ids
 
 router = APIRouter()
 
@@ -20,27 +23,39 @@ router = APIRouter()
 @router.get("/ingredients", response_model=list[IngredientResponse])
 async def list_ingredients(
     db: DbSession,
+    catalog_cache: CatalogCacheDep,
     search: str | None = Query(None, description="Search by name or alias"),
+    mode: Literal["contains", "fuzzy"] = Query(
+        "contains", description="contains: substring filter; fuzzy: ranked trigram search"
+    ),
     category_id: uuid.UUID | None = Query(None, description="Filter by category"),
     skip: int = 0,
     limit: int = 50,
 ):
     """List all ingredients with optional filtering."""
-    query = select(Ingredient).options(selectinload(Ingredient.category))
+    catalog = await catalog_cache.get(db)
+
+    if search and mode == "fuzzy":
+        ids = await search_ingredient_ids(db, search, category_id, skip, limit)
+        # Served from the snapshot; an ingredient created moments ago may be missing
+        return [catalog.ingredients_by_id[i] for i in ids if i in catalog.ingredients_by_id]
+
+    ingredients = catalog.ingredients
 
     if search:
-        search_lower = f"%{search.lower()}%"
-        query = query.where(
-            Ingredient.name.ilike(search_lower) | Ingredient.canonical_name.ilike(search_lower)
-        )
+        search_lower = search.lower()
+        ingredients = [
+            i
+            for i in ingredients
+            if search_lower in i.name.lower()
+            or search_lower in i.canonical_name.lower()
+            or any(search_lower in alias for alias in i.normalized_aliases)
+        ]
 
     if category_id:
-        query = query.where(Ingredient.category_id == category_id)
+        ingredients = [i for i in ingredients if i.category_id == category_id]
 
-    query = query.order_by(Ingredient.name).offset(skip).limit(limit)
-
-    result = await db.execute(query)
-    return result.scalars().all()
+    return ingredients[skip : skip + limit]
 
 
 @router.get("/ingredients/{ingredient_id}", response_model=IngredientResponse)
@@ -60,7 +75,7 @@ async def get_ingredient(ingredient_id: uuid.UUID, db: DbSession):
 
 
 @router.post("/ingredients", response_model=IngredientResponse)
-async def create_ingredient(data: IngredientCreate, db: DbSession):
+async def create_ingredient(data: IngredientCreate, db: DbSession, catalog_cache: CatalogCacheDep):
     """Create a new ingredient."""
     # Check for duplicate canonical_name
     result = await db.execute(
@@ -82,6 +97,7 @@ async def create_ingredient(data: IngredientCreate, db: DbSession):
     )
     db.add(ingredient)
     await db.flush()
+    await catalog_cache.mark_changed(db)
 
     # Reload with category
     result = await db.execute(
@@ -97,6 +113,7 @@ async def update_ingredient(
     ingredient_id: uuid.UUID,
     data: IngredientUpdate,
     db: DbSession,
+    catalog_cache: CatalogCacheDep,
 ):
     """Update an ingredient."""
     result = await db.execute(select(Ingredient).where(Ingredient.id == ingredient_id))
@@ -118,6 +135,9 @@ async def update_ingredient(
         ingredient.category_id = data.category_id
 
     await db.flush()
+    await catalog_cache.mark_changed(db)
+    if data.name is not None:
+        await mark_all_data_changed(db)  # Cached waste responses name it
 
     # Reload with category
     result = await db.execute(
@@ -129,7 +149,9 @@ async def update_ingredient(
 
 
 @router.delete("/ingredients/{ingredient_id}")
-async def delete_ingredient(ingredient_id: uuid.UUID, db: DbSession):
+async def delete_ingredient(
+    ingredient_id: uuid.UUID, db: DbSession, catalog_cache: CatalogCacheDep
+):
     """Delete an ingredient."""
     result = await db.execute(select(Ingredient).where(Ingredient.id == ingredient_id))
     ingredient = result.scalar_one_or_none()
@@ -138,4 +160,5 @@ async def delete_ingredient(ingredient_id: uuid.UUID, db: DbSession):
         raise HTTPException(status_code=404, detail="Ingredient not found")
 
     await db.delete(ingredient)
+    await catalog_cache.mark_changed(db)
     return {"message": "Ingredient deleted"}
@@ -4,11 +4,11 @@ import uuid
 from decimal import Decimal
 
 from fastapi import APIRouter, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import selectinload
 
 from src.api.deps import DbSession
-from src.db.models import Household, Ingredient, InventoryEvent, InventoryLot
+from src.db.models import Household, Ingredient, InventoryEvent, InventoryLot, Item, Receipt
 from src.schemas.inventory import (
     ConsumeRequest,
     DiscardRequest,
@@ -17,8 +17,12 @@ from src.schemas.inventory import (
     InventoryLotCreate,
     InventoryLotResponse,
     InventoryLotUpdate,
+    ReceiptInventoryResult,
     TransferRequest,
 )
+from src.services.analytics_cache import mark_data_changed
+from src.services.receipt_inventory import ingest_receipts
+from src.services.spend_rollup import prune_rollup, record_receipts, retract_receipts
 
 router = APIRouter()
 
@@ -166,6 +170,7 @@ async def create_inventory_lot(
     db.add(event)
 
     await db.flush()
+    await mark_data_changed(db, lot.household_id)
 
     # Reload with ingredient
     result = await db.execute(
@@ -239,6 +244,7 @@ async def consume_from_lot(
     db.add(event)
 
     await db.flush()
+    await mark_data_changed(db, lot.household_id)
 
     # Reload with ingredient
     result = await db.execute(
@@ -279,6 +285,7 @@ async def discard_lot(
     db.add(event)
 
     await db.flush()
+    await mark_data_changed(db, lot.household_id)
 
     # Reload with ingredient
     result = await db.execute(
@@ -323,6 +330,7 @@ async def transfer_lot(
     db.add(event)
 
     await db.flush()
+    await mark_data_changed(db, lot.household_id)
 
     # Reload with ingredient
     result = await db.execute(
@@ -356,3 +364,46 @@ async def get_lot_events(
 
     result = await db.execute(query)
     return result.scalars().all()
+
+
+@router.post("/inventory/from-receipts", response_model=ReceiptInventoryResult)
+async def ingest_pending_receipts(
+    db: DbSession,
+    household_id: uuid.UUID = Query(..., description="Household ID"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum receipts to process"),
+):
+    """Turn a household's pending receipts into inventory lots, oldest first."""
+    return await ingest_receipts(db, household_id, limit=limit)
+
+
+@router.post("/receipts/{receipt_id}/inventory", response_model=ReceiptInventoryResult)
+async def ingest_receipt(
+    receipt_id: uuid.UUID,
+    db: DbSession,
+    household_id: uuid.UUID | None = Query(
+        None, description="Household to assign the receipt to, if it has none"
+    ),
+):
+    """Turn one pending receipt into inventory lots."""
+    result = await db.execute(select(Receipt).where(Receipt.id == receipt_id))
+    receipt = result.scalar_one_or_none()
+
+    if not receipt:
+        raise HTTPException(status_code=404, detail="Receipt not found")
+    if receipt.inventory_status != "pending":
+        raise HTTPException(status_code=409, detail="Receipt already added to inventory")
+
+    if receipt.household_id is None:
+        if household_id is None:
+            raise HTTPException(status_code=400, detail="Receipt has no household")
+        keys = await retract_receipts(db, [receipt.id])
+        receipt.household_id = household_id
+        await db.execute(
+            update(Item).where(Item.receipt_id == receipt.id).values(household_id=household_id)
+        )
+        await db.flush()
+        await record_receipts(db, [receipt.id])
+        await prune_rollup(db, keys)
+        await mark_data_changed(db, household_id)
+
+    return await ingest_receipts(db, receipt.household_id, receipt_ids=[receipt.id])
@@ -8,7 +8,8 @@ from fastapi import APIRouter, HTTPException, Query, Response
 from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 
-from src.api.deps import DbSession, MealPlanServiceDep
+from src.api.deps import DbSession, MealPlanServiceDep, RestockRefresherDep
+from src.config import settings
 from src.db.models import InventoryEvent, InventoryLot, Leftover, MealPlan, Recipe
 from src.schemas.meal_plan import (
     CookRequest,
@@ -21,6 +22,7 @@ from src.schemas.meal_plan import (
     MealPlanResponse,
     MealPlanUpdate,
 )
+from src.services.analytics_cache import mark_data_changed
 
 router = APIRouter()
 
@@ -42,6 +44,7 @@ async def create_meal_plan(
     )
     db.add(meal_plan)
     await db.flush()
+    await mark_data_changed(db, meal_plan.household_id)
 
     # Re-select with proper eager loading for nested relationships
     result = await db.execute(
@@ -139,6 +142,7 @@ async def update_meal_plan(
         setattr(meal_plan, key, value)
 
     await db.flush()
+    await mark_data_changed(db, meal_plan.household_id)
 
     # Re-select with proper eager loading for nested relationships
     result = await db.execute(
@@ -166,6 +170,7 @@ async def delete_meal_plan(
 
     await db.delete(meal_plan)
     await db.flush()
+    await mark_data_changed(db, meal_plan.household_id)
 
     return Response(status_code=204)
 
@@ -174,6 +179,7 @@ async def delete_meal_plan(
 async def cook_meal_plan(
     db: DbSession,
     meal_plan_service: MealPlanServiceDep,
+    restock_refresher: RestockRefresherDep,
     meal_plan_id: UUID,
     cook_data: CookRequest,
 ) -> CookResponse:
@@ -295,6 +301,9 @@ async def cook_meal_plan(
         meal_plan.is_leftover_source = True
 
     await db.flush()
+    await mark_data_changed(db, meal_plan.household_id)
+    if len(inventory_consumed) >= settings.restock_refresh_consume_events:
+        restock_refresher.request_after_commit(db, meal_plan.household_id)
 
     # Re-select with proper eager loading for nested relationships
     result = await db.execute(
@@ -370,5 +379,6 @@ async def update_leftover(
         setattr(leftover, key, value)
 
     await db.flush()
+    await mark_data_changed(db, leftover.household_id)
 
     return LeftoverResponse.model_validate(leftover)
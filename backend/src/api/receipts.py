@@ -1,12 +1,17 @@
+from decimal import Decimal
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
 
-from src.api.deps import DbSession
-from src.db.models import Item, Receipt
+from src.api.deps import CatalogCacheDep, DbSession, MatchMemoryDep
+from src.db.models import InventoryLot, Item, Receipt
+from src.schemas.item import ItemIngredientResponse, ItemIngredientUpdate
 from src.schemas.receipt import ReceiptListResponse, ReceiptResponse
+from src.services.analytics_cache import mark_data_changed
+from src.services.raw_ocr import load_raw_ocr_json
+from src.services.spend_rollup import prune_rollup, retract_receipts
 
 router = APIRouter()
 
@@ -75,6 +80,77 @@ async def get_receipt(receipt_id: UUID, db: DbSession):
     return receipt
 
 
+@router.get("/receipts/{receipt_id}/ocr")
+async def get_receipt_ocr(receipt_id: UUID, db: DbSession):
+    """Get the raw OCR output a receipt was parsed from."""
+    raw_ocr = await load_raw_ocr_json(db, receipt_id)
+
+    if raw_ocr is None:
+        raise HTTPException(status_code=404, detail="Raw OCR not found")
+
+    # Already JSON; skip decoding and re-encoding it
+    return Response(content=raw_ocr, media_type="application/json")
+
+
+@router.put(
+    "/receipts/{receipt_id}/items/{item_id}/ingredient", response_model=ItemIngredientResponse
+)
+async def set_item_ingredient(
+    receipt_id: UUID,
+    item_id: UUID,
+    data: ItemIngredientUpdate,
+    db: DbSession,
+    catalog_cache: CatalogCacheDep,
+    match_memory: MatchMemoryDep,
+    household_id: UUID | None = None,
+):
+    """
+    Link an item to an ingredient and remember the choice for items with the same name.
+
+    The choice is remembered for the household the receipt belongs to: its own,
+    its item's, or that of the inventory its items were added to. A receipt with
+    none of these takes the household from ``household_id``; global corrections
+    are made through the admin API only.
+    """
+    lot_household = (
+        select(InventoryLot.household_id)
+        .where(InventoryLot.source_type == "receipt", InventoryLot.source_id == Receipt.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(Item, func.coalesce(Receipt.household_id, Item.household_id, lot_household))
+        .join(Receipt, Item.receipt_id == Receipt.id)
+        .where(Item.id == item_id, Item.receipt_id == receipt_id)
+    )
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    catalog = await catalog_cache.get(db)
+    if data.ingredient_id not in catalog.ingredients_by_id:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+
+    item, assigned_household = row
+    if assigned_household is not None:
+        if household_id is not None and household_id != assigned_household:
+            raise HTTPException(status_code=409, detail="Receipt belongs to another household")
+        household_id = assigned_household
+    if household_id is None:
+        raise HTTPException(
+            status_code=400, detail="household_id is required for a receipt without a household"
+        )
+
+    item.ingredient_id = data.ingredient_id
+    item.ingredient_confidence = Decimal("1.0")
+    await match_memory.remember(
+        db, item.canonical_name or item.raw_name, data.ingredient_id, household_id
+    )
+    await db.flush()
+    return item
+
+
 @router.delete("/receipts/{receipt_id}")
 async def delete_receipt(receipt_id: UUID, db: DbSession):
     """Delete a receipt and all its items."""
@@ -85,5 +161,9 @@ async def delete_receipt(receipt_id: UUID, db: DbSession):
     if not receipt:
         raise HTTPException(status_code=404, detail="Receipt not found")
 
+    keys = await retract_receipts(db, [receipt.id])
     await db.delete(receipt)
+    await db.flush()
+    await prune_rollup(db, keys)
+    await mark_data_changed(db, receipt.household_id)
     return {"message": "Receipt deleted"}
@@ -17,6 +17,7 @@ from src.schemas.recipe import (
     RecipeResponse,
     RecipeUpdate,
 )
+from src.services.analytics_cache import mark_data_changed
 
 router = APIRouter()
 
@@ -208,6 +209,7 @@ async def update_recipe(
         setattr(recipe, key, value)
 
     await db.flush()
+    await mark_data_changed(db, recipe.household_id)  # Cost per meal names the recipe
     await db.refresh(recipe, ["ingredients"])
 
     return RecipeResponse.model_validate(recipe)
@@ -228,5 +230,6 @@ async def delete_recipe(
 
     await db.delete(recipe)
     await db.flush()
+    await mark_data_changed(db, recipe.household_id)
 
     return Response(status_code=204)
@@ -1,107 +1,272 @@
+import asyncio
 import uuid
 from pathlib import Path
+from typing import Any
 
-import aiofiles
-from fastapi import APIRouter, HTTPException, UploadFile
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, HTTPException, Query, Response, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.deps import DbSession, OCRServiceDep
+from src.api.deps import (
+    DbSession,
+    ImagePreprocessorDep,
+    OCRServiceDep,
+    ReceiptJobQueueDep,
+)
 from src.config import settings
-from src.db.models import Category, Item, Receipt
-from src.schemas.receipt import ReceiptResponse
-from src.services.categorizer import categorize_item
+from src.schemas.receipt import (
+    BatchUploadResponse,
+    BatchUploadResult,
+    ReceiptJobResponse,
+    ReceiptResponse,
+)
+from src.services.image_preprocessor import ImagePreprocessor
+from src.services.image_store import (
+    InvalidImageError,
+    StoredImage,
+    UploadTooLargeError,
+    store_content_addressed,
+)
+from src.services.ocr import OCRService
 from src.services.parser import parse_ocr_result
+from src.services.receipt_ingestion import (
+    build_receipt_rows,
+    cache_ocr_results,
+    find_receipts_by_image,
+    insert_receipts,
+    load_cached_ocr,
+    load_category_map,
+    load_receipt,
+    save_receipt,
+)
+from src.services.receipt_jobs import QueueFullError
 
 router = APIRouter()
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".heic"}
 
 
-@router.post("/receipts/upload", response_model=ReceiptResponse)
-async def upload_receipt(
-    file: UploadFile,
-    db: DbSession,
-    ocr_service: OCRServiceDep,
-):
-    """Upload a receipt image for OCR processing."""
-    if not file.filename:
+def _check_extension(filename: str | None) -> None:
+    """Reject uploads without a filename or with an unsupported extension."""
+    if not filename:
         raise HTTPException(status_code=400, detail="No filename provided")
 
-    ext = Path(file.filename).suffix.lower()
+    ext = Path(filename).suffix.lower()
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"File type not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    # Save uploaded file
-    upload_dir = Path(settings.upload_dir)
-    upload_dir.mkdir(parents=True, exist_ok=True)
 
-    file_id = uuid.uuid4()
-    filename = f"{file_id}{ext}"
-    file_path = upload_dir / filename
+async def _store_upload(file: UploadFile, preprocessor: ImagePreprocessor | None) -> StoredImage:
+    """Stream an uploaded file into the content-addressed image store."""
+    _check_extension(file.filename)
+    try:
+        return await store_content_addressed(
+            file,
+            Path(settings.upload_dir),
+            max_bytes=settings.max_upload_bytes,
+            preprocessor=preprocessor,
+        )
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
 
-    async with aiofiles.open(file_path, "wb") as f:
-        content = await file.read()
-        await f.write(content)
 
-    # Process with OCR
+async def _run_ocr(ocr_service: OCRService, image: StoredImage) -> dict[str, Any]:
+    """Run OCR on a stored image, removing a newly stored file if OCR fails."""
     try:
-        ocr_result = await ocr_service.extract_text(file_path)
+        return await ocr_service.extract_text(image.path)
     except Exception as e:
-        # Clean up file on OCR failure
-        file_path.unlink(missing_ok=True)
+        # Clean up file on OCR failure, unless an earlier upload owns it
+        image.discard()
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {e}") from e
 
+
+def _error_detail(error: BaseException) -> str:
+    return str(error.detail) if isinstance(error, HTTPException) else str(error)
+
+
+@router.post("/receipts/upload", response_model=ReceiptResponse | ReceiptJobResponse)
+async def upload_receipt(
+    file: UploadFile,
+    db: DbSession,
+    ocr_service: OCRServiceDep,
+    job_queue: ReceiptJobQueueDep,
+    preprocessor: ImagePreprocessorDep,
+    response: Response,
+    background: bool = Query(False, description="Queue OCR and return 202 with a job ID"),
+):
+    """Upload a receipt image for OCR processing."""
+    image = await _store_upload(file, preprocessor)
+
+    # Hand off to the background workers once the image is stored
+    if background:
+        try:
+            job = job_queue.submit(image, ocr_service)
+        except QueueFullError as e:
+            image.discard()
+            raise HTTPException(status_code=503, detail=str(e)) from e
+        response.status_code = 202
+        return ReceiptJobResponse.model_validate(job)
+
+    # Re-uploads of the same image link to the receipt already created from it
+    existing = await find_receipts_by_image(db, [image.sha256])
+    if image.sha256 in existing:
+        return await load_receipt(db, existing[image.sha256])
+
+    ocr_result = (await load_cached_ocr(db, ocr_service, [image.sha256])).get(image.sha256)
+    if ocr_result is None:
+        # Release the pooled connection while OCR runs
+        await db.commit()
+        ocr_result = await _run_ocr(ocr_service, image)
+        await cache_ocr_results(db, ocr_service, {image.sha256: ocr_result})
+
     # Parse OCR result
     parsed = parse_ocr_result(ocr_result)
 
-    # Fetch categories for item categorization
-    cat_result = await db.execute(select(Category))
-    categories = {c.name.lower(): c.id for c in cat_result.scalars().all()}
-
-    # Create receipt
-    receipt = Receipt(
-        merchant_name=parsed.merchant_name,
-        store_location=parsed.store_location,
-        purchase_date=parsed.purchase_date,
-        total_amount=parsed.total_amount,
-        currency=parsed.currency,
-        payment_method=parsed.payment_method,
-        image_path=str(file_path),
-        raw_ocr=ocr_result,
-    )
-    db.add(receipt)
-    await db.flush()
-
-    # Create items
-    for item_data in parsed.items:
-        category_name = categorize_item(item_data.raw_name)
-        category_id = categories.get(category_name.lower()) if category_name else None
-
-        item = Item(
-            receipt_id=receipt.id,
-            raw_name=item_data.raw_name,
-            canonical_name=item_data.canonical_name,
-            quantity=item_data.quantity,
-            unit=item_data.unit,
-            unit_price=item_data.unit_price,
-            total_price=item_data.total_price,
-            category_id=category_id,
-            is_pant=item_data.is_pant,
-            discount_amount=item_data.discount_amount,
+    return await save_receipt(db, parsed, image)
+
+
+async def _resolve_ocr(
+    db: AsyncSession,
+    ocr_service: OCRService,
+    images: dict[str, StoredImage],
+    semaphore: asyncio.Semaphore,
+) -> tuple[dict[str, dict[str, Any]], dict[str, str]]:
+    """
+    Collect OCR results for images keyed by hash, reusing cached results.
+
+    Cache misses are OCR'd concurrently and cached. Returns the results and the
+    error messages for images whose OCR failed.
+    """
+    ocr_results = await load_cached_ocr(db, ocr_service, images.keys())
+    to_ocr = [img for h, img in images.items() if h not in ocr_results]
+    if not to_ocr:
+        return ocr_results, {}
+
+    async def ocr(image: StoredImage) -> dict[str, Any]:
+        async with semaphore:
+            return await _run_ocr(ocr_service, image)
+
+    # Release the pooled connection while OCR runs
+    await db.commit()
+    outcomes = await asyncio.gather(*(ocr(img) for img in to_ocr), return_exceptions=True)
+
+    fresh = {}
+    errors = {}
+    for img, outcome in zip(to_ocr, outcomes, strict=True):
+        if isinstance(outcome, BaseException):
+            errors[img.sha256] = _error_detail(outcome)
+        else:
+            fresh[img.sha256] = outcome
+    await cache_ocr_results(db, ocr_service, fresh)
+
+    return {**ocr_results, **fresh}, errors
+
+
+@router.post("/receipts/upload/batch", response_model=BatchUploadResponse)
+async def upload_receipt_batch(
+    files: list[UploadFile],
+    db: DbSession,
+    ocr_service: OCRServiceDep,
+    preprocessor: ImagePreprocessorDep,
+):
+    """Upload many receipt images, running OCR concurrently and inserting in bulk."""
+    if len(files) > settings.batch_upload_max_files:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum per batch: {settings.batch_upload_max_files}",
         )
-        db.add(item)
 
-    await db.flush()
+    semaphore = asyncio.Semaphore(settings.batch_upload_concurrency)
 
-    # Reload with relationships
-    query = (
-        select(Receipt)
-        .options(selectinload(Receipt.items).selectinload(Item.category))
-        .where(Receipt.id == receipt.id)
+    async def store(file: UploadFile) -> StoredImage:
+        async with semaphore:
+            return await _store_upload(file, preprocessor)
+
+    stored = await asyncio.gather(*(store(file) for file in files), return_exceptions=True)
+    images = {s.sha256: s for s in stored if isinstance(s, StoredImage)}
+
+    # Skip OCR for images that already have a receipt
+    existing = await find_receipts_by_image(db, images.keys())
+    ocr_results, ocr_errors = await _resolve_ocr(
+        db,
+        ocr_service,
+        {h: img for h, img in images.items() if h not in existing},
+        semaphore,
     )
-    result = await db.execute(query)
-    return result.scalar_one()
+
+    # One category lookup shared by every receipt in the batch
+    categories = await load_category_map(db)
+
+    results = []
+    new_receipts = []
+    for file, image in zip(files, stored, strict=True):
+        filename = file.filename or ""
+        if isinstance(image, BaseException):
+            error = _error_detail(image)
+            results.append(BatchUploadResult(filename=filename, success=False, error=error))
+            continue
+
+        if image.sha256 in existing:
+            results.append(
+                BatchUploadResult(
+                    filename=filename,
+                    success=True,
+                    receipt_id=existing[image.sha256],
+                    duplicate=True,
+                )
+            )
+            continue
+
+        if image.sha256 in ocr_errors:
+            error = ocr_errors[image.sha256]
+            results.append(BatchUploadResult(filename=filename, success=False, error=error))
+            continue
+
+        ocr_result = ocr_results[image.sha256]
+        try:
+            parsed = parse_ocr_result(ocr_result)
+        except Exception as e:
+            error = f"Parsing failed: {e}"
+            results.append(BatchUploadResult(filename=filename, success=False, error=error))
+            continue
+
+        rows = build_receipt_rows(parsed, image, categories)
+        new_receipts.append(rows)
+        receipt_id = rows[0]["id"]
+        # Later copies of the same image in this batch link to this receipt
+        existing[image.sha256] = receipt_id
+        results.append(BatchUploadResult(filename=filename, success=True, receipt_id=receipt_id))
+
+    saved = await insert_receipts(db, new_receipts, categories)
+    # A concurrent upload of the same image may have created its receipt first
+    raced = {
+        rows[0]["id"]: receipt.id
+        for rows, receipt in zip(new_receipts, saved, strict=True)
+        if receipt.id != rows[0]["id"]
+    }
+    for result in results:
+        if result.receipt_id in raced:
+            result.receipt_id = raced[result.receipt_id]
+            result.duplicate = True
+
+    succeeded = sum(1 for r in results if r.success)
+    return BatchUploadResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+
+@router.get("/receipts/jobs/{job_id}", response_model=ReceiptJobResponse)
+async def get_receipt_job(job_id: uuid.UUID, job_queue: ReceiptJobQueueDep):
+    """Get the status of a background receipt processing job."""
+    job = job_queue.get(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
@@ -1,8 +1,20 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Numeric, Text, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    Numeric,
+    Text,
+    func,
+)
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -57,6 +69,57 @@ class Ingredient(Base):
     __table_args__ = (
         Index("idx_ingredients_canonical", canonical_name),
         Index("idx_ingredients_category", category_id),
+        # Trigram search; ingredient_search_text() is defined in migration 011
+        Index(
+            "idx_ingredients_search_trgm",
+            func.ingredient_search_text(name, canonical_name, aliases).label("search_text"),
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
+
+
+class IngredientMatchMemory(Base):
+    """Learned match of a raw receipt item name to an ingredient.
+
+    Rows without a household are global; household rows are user corrections that
+    override the global row for that household.
+    """
+
+    __tablename__ = "ingredient_match_memory"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    raw_key: Mapped[str] = mapped_column(Text, nullable=False)  # Uppercased, single-spaced
+    household_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("households.id", ondelete="CASCADE"), nullable=True
+    )
+    ingredient_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("ingredients.id", ondelete="CASCADE"), nullable=False
+    )
+    confidence: Mapped[Decimal] = mapped_column(Numeric(3, 2), nullable=False)
+    method: Mapped[str] = mapped_column(Text, nullable=False)  # exact|alias|fuzzy|user
+    # Catalog version a matcher result was learned against; NULL for user corrections
+    catalog_version: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    hit_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        Index(
+            "idx_match_memory_global",
+            raw_key,
+            unique=True,
+            postgresql_where=household_id.is_(None),
+        ),
+        Index(
+            "idx_match_memory_household",
+            household_id,
+            raw_key,
+            unique=True,
+            postgresql_where=household_id.isnot(None),
+        ),
     )
 
 
@@ -92,7 +155,7 @@ class InventoryLot(Base):
     location: Mapped[str] = mapped_column(Text, default="pantry")  # pantry|fridge|freezer
     purchase_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     expiry_date: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    unit_cost: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    unit_cost: Mapped[Decimal] = mapped_column(Numeric(12, 6), nullable=False)  # Per unit
     total_cost: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     currency: Mapped[str] = mapped_column(Text, default="NOK")
     confidence: Mapped[Decimal] = mapped_column(Numeric(3, 2), default=Decimal("1.0"))
@@ -140,6 +203,12 @@ class InventoryEvent(Base):
         Index("idx_inventory_events_lot", "lot_id"),
         Index("idx_inventory_events_type", "event_type"),
         Index("idx_inventory_events_created", "created_at"),
+        Index(
+            "idx_inventory_events_discards",
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=event_type == "discard",
+        ),
     )
 
 
@@ -264,6 +333,13 @@ class Leftover(Base):
         Index("idx_leftovers_household", "household_id"),
         Index("idx_leftovers_status", "status"),
         Index("idx_leftovers_expires", "expires_at"),
+        Index(
+            "idx_leftovers_household_discarded",
+            household_id,
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=status == "discarded",
+        ),
     )
 
 
@@ -335,6 +411,45 @@ class Category(Base):
     items: Mapped[list["Item"]] = relationship("Item", back_populates="category")
 
 
+class CatalogVersion(Base):
+    """Single-row counter bumped whenever categories or ingredients change."""
+
+    __tablename__ = "catalog_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class DataVersion(Base):
+    """
+    Counter per household bumped by writes that change its analytics.
+
+    ``scope`` is the household id, or ``all`` for analytics across households.
+    """
+
+    __tablename__ = "data_versions"
+
+    scope: Mapped[str] = mapped_column(Text, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class BackfillCheckpoint(Base):
+    """Progress of a resumable batch job over a table, one row per job."""
+
+    __tablename__ = "backfill_checkpoints"
+
+    job: Mapped[str] = mapped_column(Text, primary_key=True)
+    last_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )  # Keyset cursor: highest id done
+    processed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    matched: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
 class Receipt(Base):
     __tablename__ = "receipts"
 
@@ -353,7 +468,8 @@ class Receipt(Base):
     warranty_months: Mapped[int | None] = mapped_column(nullable=True)
     return_window_days: Mapped[int | None] = mapped_column(nullable=True)
     image_path: Mapped[str | None] = mapped_column(Text, nullable=True)
-    raw_ocr: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    image_sha256: Mapped[str | None] = mapped_column(Text, nullable=True)
+    thumbnail_path: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=func.now(), onupdate=func.now(), nullable=False
@@ -364,7 +480,126 @@ class Receipt(Base):
     )
     household: Mapped["Household | None"] = relationship("Household", back_populates="receipts")
 
-    __table_args__ = (Index("idx_receipts_date", purchase_date.desc()),)
+    __table_args__ = (
+        Index("idx_receipts_date", purchase_date.desc()),
+        Index(
+            "idx_receipts_household_date",
+            household_id,
+            purchase_date.desc(),
+            postgresql_include=["total_amount"],
+        ),
+        # One receipt per image, also under concurrent uploads of the same image
+        Index(
+            "idx_receipts_image_sha256",
+            image_sha256,
+            unique=True,
+            postgresql_where=image_sha256.isnot(None),
+        ),
+    )
+
+
+class ReceiptOCR(Base):
+    """
+    Raw OCR output of a receipt, compressed and kept out of the receipts table.
+
+    Only receipts saved before OCR output moved into ``ocr_cache`` have a row;
+    newer receipts find theirs through their image hash.
+    """
+
+    __tablename__ = "receipt_ocr"
+
+    receipt_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("receipts.id", ondelete="CASCADE"), primary_key=True
+    )
+    encoding: Mapped[str] = mapped_column(Text, nullable=False)  # "zlib+json"
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    raw_size: Mapped[int] = mapped_column(Integer, nullable=False)  # Uncompressed bytes
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+
+class DailySpend(Base):
+    """
+    Spend per household, day, merchant and category, kept in step with receipts.
+
+    Receipt counts, totals and purchase times are on the row without a category;
+    item counts and totals are on the row of the item's category (uncategorized
+    items on the row without one).
+    """
+
+    __tablename__ = "daily_spend"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    household_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("households.id", ondelete="CASCADE"), nullable=True
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    merchant: Mapped[str] = mapped_column(Text, nullable=False)  # upper(trim(merchant_name))
+    category_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("categories.id"), nullable=True
+    )
+    receipt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    receipt_total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    item_total: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    first_purchase_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_purchase_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "idx_daily_spend_key",
+            household_id,
+            day,
+            merchant,
+            category_id,
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+        Index("idx_daily_spend_day", day),
+    )
+
+
+class OCRCacheEntry(Base):
+    """OCR output per image and engine version, compressed like ReceiptOCR."""
+
+    __tablename__ = "ocr_cache"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    image_sha256: Mapped[str] = mapped_column(Text, nullable=False)
+    engine: Mapped[str] = mapped_column(Text, nullable=False)
+    engine_version: Mapped[str] = mapped_column(Text, nullable=False)
+    encoding: Mapped[str] = mapped_column(Text, nullable=False)  # "zlib+json"
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    raw_size: Mapped[int] = mapped_column(Integer, nullable=False)  # Uncompressed bytes
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_ocr_cache_key", image_sha256, engine, engine_version, unique=True),
+    )
+
+
+class AnalyticsCacheEntry(Base):
+    """Cached analytics response shared by all workers; losing it only costs recomputes."""
+
+    __tablename__ = "analytics_cache"
+
+    key: Mapped[str] = mapped_column(Text, primary_key=True)  # sha256 of scope, path, params
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)  # Data version computed at
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # JSON response
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+
+class RestockSnapshot(Base):
+    """Latest restock predictions of a household, computed off the request path."""
+
+    __tablename__ = "restock_snapshots"
+
+    household_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("households.id", ondelete="CASCADE"), primary_key=True
+    )
+    predictions: Mapped[list] = mapped_column(JSONB, nullable=False)  # RestockPrediction list
+    generated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
 
 class Item(Base):
@@ -374,6 +609,11 @@ class Item(Base):
     receipt_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("receipts.id", ondelete="CASCADE"), nullable=False
     )
+    # Copies of the receipt's, so analytics filter items without joining receipts
+    household_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("households.id"), nullable=True
+    )
+    purchase_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     raw_name: Mapped[str] = mapped_column(Text, nullable=False)
     canonical_name: Mapped[str | None] = mapped_column(Text, nullable=True)
     quantity: Mapped[Decimal | None] = mapped_column(Numeric(10, 3), nullable=True)
@@ -402,6 +642,7 @@ class Item(Base):
 
     __table_args__ = (
         Index("idx_items_receipt", receipt_id),
+        Index("idx_items_household_date", household_id, purchase_date.desc()),
         Index("idx_items_category", category_id),
         Index("idx_items_ingredient", ingredient_id),
     )
@@ -7,6 +7,7 @@ from sqlalchemy import select
 
 from src.db.engine import async_session_factory
 from src.db.models import Category
+from src.services.catalog_cache import bump_catalog_version
 
 CATEGORIES = [
     {"name": "Meieri", "icon": "🥛", "color": "#60A5FA"},
@@ -44,6 +45,8 @@ async def seed_categories():
             else:
                 print(f"Category exists: {cat_data['name']}")
 
+        # Running API workers reload their catalog cache
+        await bump_catalog_version(session)
         await session.commit()
         print("Seeding complete!")
 
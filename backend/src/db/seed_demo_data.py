@@ -24,6 +24,8 @@ from src.db.models import (
     ShoppingListItem,
     User,
 )
+from src.services.analytics_cache import mark_data_changed
+from src.services.spend_rollup import rebuild_rollup
 
 # Fixed UUIDs for demo data (allows idempotent seeding)
 DEMO_HOUSEHOLD_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
@@ -813,6 +815,8 @@ async def create_receipts() -> list[uuid.UUID]:
                 item = Item(
                     id=uuid.uuid4(),
                     receipt_id=receipt.id,
+                    household_id=receipt.household_id,
+                    purchase_date=receipt.purchase_date,
                     raw_name=raw_name,
                     canonical_name=canonical,
                     quantity=qty,
@@ -827,6 +831,8 @@ async def create_receipts() -> list[uuid.UUID]:
                 )
                 session.add(item)
 
+        await session.flush()
+        await rebuild_rollup(session, DEMO_HOUSEHOLD_ID)
         await session.commit()
         print(f"Created {len(receipt_ids)} demo receipts")
 
@@ -1574,6 +1580,11 @@ async def seed_demo_data(clear_first: bool = True):
     await create_waste_events()
     await create_discarded_leftovers(recipe_map)
 
+    # Cached analytics of the demo household are stale now
+    async with async_session_factory() as session:
+        await mark_data_changed(session, DEMO_HOUSEHOLD_ID)
+        await session.commit()
+
     print("=" * 50)
     print("Demo data seeding complete!")
     print(f"Household ID: {DEMO_HOUSEHOLD_ID}")
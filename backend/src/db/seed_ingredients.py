@@ -7,6 +7,7 @@ from sqlalchemy import select
 
 from src.db.engine import async_session_factory
 from src.db.models import Category, Ingredient
+from src.services.catalog_cache import bump_catalog_version
 
 
 def _ing(name: str, canonical: str, unit: str, aliases: list[str], cat: str) -> dict:
@@ -111,6 +112,8 @@ async def seed_ingredients():
             else:
                 print(f"Ingredient exists: {ing_data['name']}")
 
+        # Running API workers reload their catalog cache
+        await bump_catalog_version(session)
         await session.commit()
         print(f"Seeding complete! Added {added} ingredients.")
 
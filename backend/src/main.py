@@ -1,8 +1,10 @@
+import logging
 import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
 
 from src.api import (
     admin,
@@ -17,12 +19,39 @@ from src.api import (
     shopping_lists,
     upload,
 )
-from src.db.engine import engine
+from src.db.engine import async_session_factory, engine
+from src.services.catalog_cache import catalog_cache
+from src.services.image_preprocessor import image_preprocessor
+from src.services.item_backfill import item_backfill
+from src.services.match_memory import match_memory
+from src.services.ocr_executor import ocr_executor
+from src.services.receipt_jobs import receipt_job_queue
+from src.services.restock_snapshots import restock_refresher
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    try:
+        async with async_session_factory() as db:
+            await catalog_cache.get(db)
+    except (OSError, SQLAlchemyError):
+        # Not fatal: the cache loads on first use once the database is reachable
+        logger.warning("Could not preload the catalog cache", exc_info=True)
+    restock_refresher.start()
     yield
+    await restock_refresher.stop()
+    await receipt_job_queue.stop()
+    await item_backfill.stop()  # Resumes from its checkpoint
+    try:
+        async with async_session_factory() as db:
+            await match_memory.flush_hits(db)
+            await db.commit()
+    except (OSError, SQLAlchemyError):
+        logger.warning("Could not write pending match memory hit counts", exc_info=True)
+    ocr_executor.shutdown()
+    image_preprocessor.shutdown()
     await engine.dispose()
 
 
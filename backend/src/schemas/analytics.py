@@ -47,17 +47,41 @@ class LeftoverWasteEntry(BaseModel):
     discarded_at: datetime | None
 
 
+class WasteBreakdown(BaseModel):
+    name: str | None  # Ingredient, category, reason or ISO week; None if uncategorized
+    discard_count: int
+    estimated_value: Decimal
+
+
 class WasteResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
-    inventory_discards: list[WasteEntry]
-    leftover_discards: list[LeftoverWasteEntry]
+    inventory_discards: list[WasteEntry]  # First page, newest first
+    leftover_discards: list[LeftoverWasteEntry]  # First page, newest first
+    inventory_next_cursor: str | None = None
+    leftover_next_cursor: str | None = None
+    inventory_discard_count: int
+    leftover_discard_count: int
     total_inventory_waste_value: Decimal
     total_leftover_servings_wasted: int
+    by_ingredient: list[WasteBreakdown]
+    by_category: list[WasteBreakdown]
+    by_reason: list[WasteBreakdown]
+    by_week: list[WasteBreakdown]
     period_start: datetime | None
     period_end: datetime | None
 
 
+class WasteEntryPage(BaseModel):
+    items: list[WasteEntry]
+    next_cursor: str | None  # Pass back as ``cursor`` for the next page
+
+
+class LeftoverWastePage(BaseModel):
+    items: list[LeftoverWasteEntry]
+    next_cursor: str | None  # Pass back as ``cursor`` for the next page
+
+
 # Spend Trend Analytics
 class SpendTrendPoint(BaseModel):
     period: str  # e.g., "2026-01" or "2026-W03"
@@ -65,6 +89,9 @@ class SpendTrendPoint(BaseModel):
     receipt_count: int
     meal_count: int
     meal_cost: Decimal
+    # Figures of the compared period, when a comparison was asked for
+    compare_total_spent: Decimal | None = None
+    compare_meal_cost: Decimal | None = None
 
 
 class SpendTrendResponse(BaseModel):
@@ -72,6 +99,7 @@ class SpendTrendResponse(BaseModel):
 
     trends: list[SpendTrendPoint]
     granularity: str  # "daily", "weekly", "monthly"
+    compare: str | None = None  # "previous", "last_year"
     period_start: datetime
     period_end: datetime
 
@@ -112,3 +112,12 @@ class TransferRequest(BaseModel):
     """Request to transfer lot to new location."""
 
     location: str  # pantry|fridge|freezer
+
+
+class ReceiptInventoryResult(BaseModel):
+    """Outcome of turning pending receipts into inventory lots."""
+
+    receipts: int
+    items: int
+    lots_created: int
+    unmatched_items: int  # Stock items no ingredient matched; left for manual review
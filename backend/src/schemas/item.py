@@ -34,3 +34,16 @@ class ItemResponse(ItemBase):
     id: UUID
     receipt_id: UUID
     category: CategoryResponse | None = None
+
+
+class ItemIngredientUpdate(BaseModel):
+    ingredient_id: UUID
+
+
+class ItemIngredientResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    receipt_id: UUID
+    ingredient_id: UUID | None
+    ingredient_confidence: Decimal | None
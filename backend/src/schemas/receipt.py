@@ -27,6 +27,7 @@ class ReceiptResponse(ReceiptBase):
 
     id: UUID
     image_path: str | None = None
+    thumbnail_path: str | None = None
     created_at: datetime
     updated_at: datetime
     items: list[ItemResponse] = []
@@ -42,3 +43,28 @@ class ReceiptListResponse(BaseModel):
     total_amount: Decimal
     currency: str
     item_count: int = 0
+
+
+class ReceiptJobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    status: str  # queued|processing|completed|failed
+    receipt_id: UUID | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+class BatchUploadResult(BaseModel):
+    filename: str
+    success: bool
+    receipt_id: UUID | None = None
+    duplicate: bool = False  # Linked to an existing receipt for the same image
+    error: str | None = None
+
+
+class BatchUploadResponse(BaseModel):
+    results: list[BatchUploadResult]
+    succeeded: int
+    failed: int
@@ -0,0 +1,243 @@
+"""Per-household cache of analytics responses.
+
+The dashboard asks for the same aggregations on every load, while the data
+behind them only changes when receipts are stored, meals cooked or inventory
+used. Responses are cached under a key made of the endpoint path and its
+normalized parameters, tagged with the data version of the household they
+describe.
+
+Writes bump the household's version in the writing transaction
+(``mark_data_changed``), so a cached response is only served while nothing it
+was computed from has changed; entries never need expiring. Analytics across
+households are not cached: they change with every upload, and a version
+shared by all writers would serialize them on one row.
+
+The version is part of the ETag, so a client sending it back in If-None-Match
+gets a 304 without the response being looked up at all.
+
+Responses are kept in process memory, or with ``analytics_cache=database`` in the
+unlogged ``analytics_cache`` table, shared by all uvicorn workers.
+"""
+
+import hashlib
+import json
+import uuid
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Protocol
+
+from sqlalchemy import Text, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.db.models import AnalyticsCacheEntry, DataVersion, Household
+
+
+async def read_data_version(db: AsyncSession, scope: str) -> int:
+    """Current data version of a scope; 0 if nothing was ever written to it."""
+    result = await db.execute(select(DataVersion.version).where(DataVersion.scope == scope))
+    return result.scalar_one_or_none() or 0
+
+
+async def mark_data_changed(db: AsyncSession, *household_ids: uuid.UUID | None) -> None:
+    """
+    Bump the data versions of households written in the caller's transaction.
+
+    None stands for data without a household, which no cached response covers,
+    so it bumps nothing. Scopes are updated in sorted order, so concurrent
+    writers lock the rows in the same order.
+    """
+    scopes = sorted({str(h) for h in household_ids if h is not None})
+    if not scopes:
+        return
+    stmt = insert(DataVersion).values([{"scope": scope, "version": 1} for scope in scopes])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[DataVersion.scope],
+            set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+        )
+    )
+
+
+async def mark_all_data_changed(db: AsyncSession) -> None:
+    """
+    Bump the data version of every household, in the caller's transaction.
+
+    For rare writes shared by all households, e.g. renaming a catalog
+    ingredient that their cached responses name.
+    """
+    stmt = insert(DataVersion).from_select(
+        ["scope", "version"],
+        select(cast(Household.id, Text), literal(1)).order_by(cast(Household.id, Text)),
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[DataVersion.scope],
+            set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+        )
+    )
+
+
+def cache_key(scope: str, path: str, params: Mapping[str, object]) -> str:
+    """sha256 of scope, path and parameters, independent of parameter order."""
+    normalized = json.dumps([scope, path, params], sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header names the ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class CacheBackend(Protocol):
+    """Storage of response bodies by key and data version."""
+
+    async def get(self, db: AsyncSession, key: str, version: int) -> bytes | None:
+        """Body stored for the key at exactly this version, if any."""
+        ...
+
+    async def put(self, db: AsyncSession, key: str, version: int, body: bytes) -> None:
+        """Store a body, replacing the key's entry for an older version."""
+        ...
+
+
+class MemoryCacheBackend:
+    """LRU of response bodies in this process."""
+
+    def __init__(self, capacity: int = 1000) -> None:
+        self.capacity = capacity
+        self._entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Responses held."""
+        return len(self._entries)
+
+    async def get(self, _db: AsyncSession, key: str, version: int) -> bytes | None:
+        """Body stored for the key at exactly this version, if any."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def put(self, _db: AsyncSession, key: str, version: int, body: bytes) -> None:
+        """Store a body, evicting the least recently used entry when full."""
+        self._entries[key] = (version, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+
+class DatabaseCacheBackend:
+    """Response bodies in the ``analytics_cache`` table, shared by all workers."""
+
+    async def get(self, db: AsyncSession, key: str, version: int) -> bytes | None:
+        """Body stored for the key at exactly this version, if any."""
+        result = await db.execute(
+            select(AnalyticsCacheEntry.body).where(
+                AnalyticsCacheEntry.key == key, AnalyticsCacheEntry.version == version
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def put(self, db: AsyncSession, key: str, version: int, body: bytes) -> None:
+        """Store a body; a slower request never overwrites a newer version."""
+        stmt = insert(AnalyticsCacheEntry).values(key=key, version=version, body=body)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[AnalyticsCacheEntry.key],
+                set_={
+                    "version": stmt.excluded.version,
+                    "body": stmt.excluded.body,
+                    "updated_at": func.now(),
+                },
+                where=AnalyticsCacheEntry.version <= stmt.excluded.version,
+            )
+        )
+
+
+@dataclass(frozen=True)
+class CacheLookup:
+    """Outcome of looking up one analytics request."""
+
+    key: str
+    version: int
+    etag: str
+    not_modified: bool  # The client already has this version
+    body: bytes | None  # Cached response, None on a miss
+
+
+class AnalyticsCache:
+    """Versioned analytics response cache with hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def lookup(
+        self,
+        db: AsyncSession,
+        household_id: uuid.UUID,
+        path: str,
+        params: Mapping[str, object],
+        if_none_match: str | None = None,
+    ) -> CacheLookup:
+        """
+        Resolve a request against the cache.
+
+        Args:
+            db: Session to read the data version (and database entries) with.
+            household_id: Household the response describes.
+            path: Endpoint path.
+            params: Validated query parameters.
+            if_none_match: The request's If-None-Match header.
+
+        Returns:
+            The ETag to send, and whether the client is current or the cached body.
+        """
+        scope = str(household_id)
+        key = cache_key(scope, path, params)
+        version = await read_data_version(db, scope)
+        etag = f'"{key[:16]}-{version}"'
+
+        if etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return CacheLookup(key, version, etag, not_modified=True, body=None)
+
+        body = await self.backend.get(db, key, version)
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return CacheLookup(key, version, etag, not_modified=False, body=body)
+
+    async def store(self, db: AsyncSession, lookup: CacheLookup, body: bytes) -> None:
+        """Cache a computed response under the version it was looked up at."""
+        await self.backend.put(db, lookup.key, lookup.version, body)
+
+    def stats(self) -> dict[str, int | str | None]:
+        """Counters and backend, for monitoring."""
+        backend = self.backend
+        return {
+            "backend": "memory" if isinstance(backend, MemoryCacheBackend) else "database",
+            "entries": len(backend) if isinstance(backend, MemoryCacheBackend) else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+def _backend(name: str) -> CacheBackend:
+    if name == "database":
+        return DatabaseCacheBackend()
+    return MemoryCacheBackend(capacity=settings.analytics_cache_size)
+
+
+analytics_cache = AnalyticsCache(_backend(settings.analytics_cache))
@@ -0,0 +1,118 @@
+"""Run blocking calls off the event loop with limits, timeouts and retries."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EXECUTOR_KINDS = {"thread", "process"}
+
+
+class ExecutorTimeoutError(Exception):
+    """Raised when a pooled call does not finish within the configured timeout."""
+
+
+def default_is_retryable(error: BaseException) -> bool:
+    """Retry timeouts and connection problems; everything else fails immediately."""
+    return isinstance(error, ExecutorTimeoutError | ConnectionError)
+
+
+class BoundedExecutor:
+    """
+    Runs synchronous calls in a thread or process pool.
+
+    At most ``max_concurrency`` calls run at once; further calls wait for a slot
+    without blocking the event loop. Each attempt is bounded by ``timeout`` and
+    retryable failures are retried with exponential backoff. A timed-out call
+    cannot be interrupted, so its worker stays busy until it returns; the pool
+    is sized to ``max_concurrency`` so abandoned calls still count against the
+    cap. ``name`` labels the pool's threads, log lines and timeout errors.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_concurrency: int = 4,
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+    ) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Unknown {name} executor: {kind}. Use one of {sorted(EXECUTOR_KINDS)}"
+            )
+        self.name = name
+        self.kind = kind
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def run(
+        self,
+        func: Callable[..., T],
+        *args: object,
+        is_retryable: Callable[[BaseException], bool] = default_is_retryable,
+    ) -> T:
+        """
+        Call ``func(*args)`` in the pool and return its result.
+
+        With a process pool, ``func`` and its arguments must be picklable.
+
+        Raises:
+            ExecutorTimeoutError: If the last attempt timed out.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._run_once(func, *args)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self.backoff * 2**attempt
+                attempt += 1
+                logger.warning(
+                    "%s attempt %d failed (%s), retrying in %.2fs", self.name, attempt, e, delay
+                )
+                await asyncio.sleep(delay)
+
+    async def _run_once(self, func: Callable[..., T], *args: object) -> T:
+        loop = asyncio.get_running_loop()
+        # A semaphore belongs to one event loop; tests and CLIs may run several
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        async with self._semaphore:
+            future = loop.run_in_executor(self._get_executor(), partial(func, *args))
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except TimeoutError as e:
+                raise ExecutorTimeoutError(f"{self.name} timed out after {self.timeout}s") from e
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the worker pool without waiting for abandoned calls."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+        self._loop = None
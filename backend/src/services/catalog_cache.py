@@ -0,0 +1,196 @@
+"""Process-wide cache of the category and ingredient catalog.
+
+Categories and ingredients are small and rarely change, but uploads and
+ingredient listing used to reload them on every request. The cache keeps one
+immutable snapshot per process, tagged with the ``catalog_version`` counter.
+
+Every write to the catalog bumps the counter in the same transaction
+(``CatalogCache.mark_changed``), so the change and the new version become visible
+together. The writing process drops its snapshot as soon as the transaction
+commits; other uvicorn workers notice the new version the next time they
+check it, at most ``catalog_cache_check_seconds`` later.
+"""
+
+import asyncio
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.db.models import CatalogVersion, Category, Ingredient
+from src.schemas.item import CategoryResponse
+from src.services.ingredient_matcher import IngredientIndex
+
+
+@dataclass
+class CachedIngredient:
+    """Detached ingredient snapshot; satisfies IngredientLike."""
+
+    id: uuid.UUID
+    name: str
+    canonical_name: str
+    default_unit: str
+    aliases: list[str]
+    normalized_aliases: tuple[str, ...]  # Lowercased and stripped, for matching
+    category_id: uuid.UUID | None
+    category: CategoryResponse | None
+    created_at: datetime
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """One consistent snapshot of the catalog tables."""
+
+    version: int
+    categories: dict[str, CategoryResponse]  # Lowercase name -> category, ordered by name
+    ingredients: list[CachedIngredient]  # Ordered by name
+    ingredients_by_id: dict[uuid.UUID, CachedIngredient]
+
+    @cached_property
+    def ingredient_index(self) -> IngredientIndex:
+        """Matching index over the ingredients, built on first use."""
+        return IngredientIndex(self.ingredients)
+
+
+async def read_catalog_version(db: AsyncSession) -> int:
+    """Current catalog version; 0 if the counter row is missing."""
+    result = await db.execute(select(CatalogVersion.version).where(CatalogVersion.id == 1))
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_catalog_version(db: AsyncSession) -> None:
+    """Bump the catalog version inside the caller's transaction."""
+    await db.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.id == 1)
+        .values(version=CatalogVersion.version + 1)
+    )
+
+
+async def load_catalog(db: AsyncSession, version: int) -> Catalog:
+    """Read categories and ingredients into a snapshot."""
+    category_rows = await db.execute(select(Category).order_by(Category.name))
+    categories = [CategoryResponse.model_validate(c) for c in category_rows.scalars().all()]
+    categories_by_id = {c.id: c for c in categories}
+
+    ingredient_rows = await db.execute(select(Ingredient).order_by(Ingredient.name))
+    ingredients = [
+        CachedIngredient(
+            id=i.id,
+            name=i.name,
+            canonical_name=i.canonical_name,
+            default_unit=i.default_unit,
+            aliases=list(i.aliases or []),
+            normalized_aliases=tuple(a.lower().strip() for a in i.aliases or []),
+            category_id=i.category_id,
+            category=categories_by_id.get(i.category_id) if i.category_id else None,
+            created_at=i.created_at,
+        )
+        for i in ingredient_rows.scalars().all()
+    ]
+
+    return Catalog(
+        version=version,
+        categories={c.name.lower(): c for c in categories},
+        ingredients=ingredients,
+        ingredients_by_id={i.id: i for i in ingredients},
+    )
+
+
+class CatalogCache:
+    """Versioned in-process catalog snapshot with hit/miss counters."""
+
+    def __init__(
+        self,
+        check_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+            check_interval: Seconds a snapshot is served before the database
+                version is checked again. 0 checks on every access.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.check_interval = check_interval
+        self._clock = clock
+        self._catalog: Catalog | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+
+    def _fresh(self) -> Catalog | None:
+        catalog = self._catalog
+        if catalog is None:
+            return None
+        if self.check_interval > 0 and self._clock() - self._checked_at < self.check_interval:
+            return catalog
+        return None
+
+    async def get(self, db: AsyncSession) -> Catalog:
+        """Return the catalog, reloading it only if the database version moved."""
+        if catalog := self._fresh():
+            self.hits += 1
+            return catalog
+
+        # One task per process checks or reloads; the rest wait for its result
+        async with self._lock:
+            if catalog := self._fresh():
+                self.hits += 1
+                return catalog
+
+            version = await read_catalog_version(db)
+            self.version_checks += 1
+            self._checked_at = self._clock()
+            catalog = self._catalog
+            if catalog is not None and catalog.version == version:
+                self.hits += 1
+                return catalog
+
+            self.misses += 1
+            catalog = await load_catalog(db, version)
+            self._catalog = catalog
+            return catalog
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next access reloads it."""
+        self._catalog = None
+
+    async def mark_changed(self, db: AsyncSession) -> None:
+        """
+        Record a catalog write made in the caller's transaction.
+
+        Bumps the shared version so other workers reload, and drops this
+        process's snapshot once the transaction commits.
+        """
+        await bump_catalog_version(db)
+        event.listen(db.sync_session, "after_commit", self._after_commit, once=True)
+
+    def _after_commit(self, _session: Session) -> None:
+        self.invalidate()
+
+    def stats(self) -> dict[str, int | bool | None]:
+        """Counters and snapshot size, for monitoring."""
+        catalog = self._catalog
+        return {
+            "loaded": catalog is not None,
+            "version": catalog.version if catalog else None,
+            "categories": len(catalog.categories) if catalog else 0,
+            "ingredients": len(catalog.ingredients) if catalog else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "version_checks": self.version_checks,
+        }
+
+
+catalog_cache = CatalogCache(check_interval=settings.catalog_cache_check_seconds)
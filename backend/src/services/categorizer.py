@@ -1,5 +1,9 @@
 """Item categorization based on Norwegian grocery keywords."""
 
+from collections.abc import Iterable
+
+from src.services.keyword_automaton import KeywordAutomaton
+
 CATEGORY_KEYWORDS: dict[str, list[str]] = {
     "Meieri": [
         "melk",
@@ -150,17 +154,39 @@ CATEGORY_KEYWORDS: dict[str, list[str]] = {
 }
 
 
+def _build_automaton() -> KeywordAutomaton:
+    # Category order in CATEGORY_KEYWORDS is the tie-break priority
+    return KeywordAutomaton(
+        (keyword.lower(), category, priority)
+        for priority, (category, keywords) in enumerate(CATEGORY_KEYWORDS.items())
+        for keyword in keywords
+    )
+
+
+_automaton = _build_automaton()
+
+
 def categorize_item(item_name: str) -> str | None:
     """
     Categorize an item based on keyword matching.
 
+    All keywords are found in one pass over the name. The longest matching
+    keyword decides the category, so "LEVERPOSTEI" is Kjøtt rather than Meieri
+    via "ost"; equally long matches go to the category listed first in
+    CATEGORY_KEYWORDS.
+
     Returns the category name or None if no match found.
     """
-    name_lower = item_name.lower()
+    match = _automaton.best_match(item_name.lower())
+    return match.label if match else None
 
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in name_lower:
-                return category
 
-    return None
+def categorize_many(item_names: Iterable[str]) -> list[str | None]:
+    """Categorize many items, matching each distinct name only once."""
+    seen: dict[str, str | None] = {}
+    results = []
+    for name in item_names:
+        if name not in seen:
+            seen[name] = categorize_item(name)
+        results.append(seen[name])
+    return results
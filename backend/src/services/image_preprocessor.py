@@ -0,0 +1,173 @@
+"""Normalize receipt photos before OCR and storage.
+
+Phone photos are large colour images, often rotated via EXIF and sometimes
+HEIC. Receipts only need legible grayscale text, so each upload is decoded,
+turned upright, downscaled to a resolution OCR engines read well, converted to
+grayscale with stretched contrast and re-encoded as a compact JPEG or WebP,
+together with a small thumbnail. Decoding and encoding are CPU-bound, so the
+work runs in a process pool.
+"""
+
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.config import settings
+from src.services.bounded_executor import BoundedExecutor
+
+# Pillow format name and file extension per output type
+OUTPUT_FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+
+# Share of darkest and lightest pixels ignored when stretching contrast
+AUTOCONTRAST_CUTOFF = 1
+
+
+class ImagePreprocessError(Exception):
+    """Raised when an image cannot be decoded or re-encoded."""
+
+
+@dataclass(frozen=True)
+class PreprocessOptions:
+    """How uploads are normalized; must stay picklable for the process pool."""
+
+    output_type: str = "jpeg"  # jpeg|webp
+    quality: int = 80
+    short_side: int = 1200  # Downscale so the shorter side is at most this
+    max_long_side: int = 4096  # ...and the longer side at most this
+    thumbnail_size: int = 320  # Bounding box of the thumbnail
+
+
+@dataclass(frozen=True)
+class PreprocessedImage:
+    """Result of preprocessing one image."""
+
+    size: int  # Bytes of the re-encoded image
+    width: int
+    height: int
+
+
+@cache
+def register_heif_opener() -> bool:
+    """Let Pillow decode HEIC/HEIF when the optional pillow-heif package is installed."""
+    try:
+        from pillow_heif import register_heif_opener as register  # noqa: PLC0415
+    except ImportError:
+        return False
+    register()
+    return True
+
+
+def scale_factor(width: int, height: int, options: PreprocessOptions) -> float:
+    """Downscale factor that fits both side limits; never enlarges."""
+    return min(
+        1.0,
+        options.short_side / min(width, height),
+        options.max_long_side / max(width, height),
+    )
+
+
+def _save(image: Image.Image, dest: Path, options: PreprocessOptions) -> None:
+    pil_format, _ = OUTPUT_FORMATS[options.output_type]
+    if pil_format == "JPEG":
+        image.save(dest, pil_format, quality=options.quality, optimize=True)
+    else:
+        image.save(dest, pil_format, quality=options.quality, method=4)
+
+
+def preprocess_image(
+    source: Path, dest: Path, thumbnail: Path, options: PreprocessOptions
+) -> PreprocessedImage:
+    """
+    Normalize the image at ``source`` into ``dest`` and write a thumbnail.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+
+    Raises:
+        ImagePreprocessError: If the image cannot be decoded, e.g. HEIC without
+            pillow-heif installed.
+    """
+    register_heif_opener()
+    try:
+        with Image.open(source) as original:
+            width, height = original.size
+            scale = scale_factor(width, height, options)
+            # JPEG can decode straight to grayscale at 1/2, 1/4 or 1/8 size
+            original.draft("L", (round(width * scale), round(height * scale)))
+            image = ImageOps.exif_transpose(original)
+            image = ImageOps.grayscale(image)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ImagePreprocessError(f"Cannot decode image: {e}") from e
+
+    scale = scale_factor(image.width, image.height, options)
+    if scale < 1:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    image = ImageOps.autocontrast(image, cutoff=AUTOCONTRAST_CUTOFF)
+
+    try:
+        _save(image, dest, options)
+        thumb = image.copy()
+        thumb.thumbnail((options.thumbnail_size, options.thumbnail_size))
+        _save(thumb, thumbnail, options)
+    except OSError as e:
+        raise ImagePreprocessError(f"Cannot encode image: {e}") from e
+
+    return PreprocessedImage(size=dest.stat().st_size, width=image.width, height=image.height)
+
+
+def _not_retryable(_error: BaseException) -> bool:
+    return False
+
+
+class ImagePreprocessor:
+    """Runs preprocess_image in a bounded worker pool."""
+
+    def __init__(self, options: PreprocessOptions, executor: BoundedExecutor) -> None:
+        if options.output_type not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown image output type: {options.output_type}. "
+                f"Use one of {sorted(OUTPUT_FORMATS)}"
+            )
+        self.options = options
+        self.executor = executor
+
+    @property
+    def image_type(self) -> str:
+        """Type of the images this preprocessor writes."""
+        return self.options.output_type
+
+    async def run(self, source: Path, dest: Path, thumbnail: Path) -> PreprocessedImage:
+        """
+        Preprocess ``source`` into ``dest`` and ``thumbnail`` off the event loop.
+
+        Raises:
+            ImagePreprocessError: If the image cannot be decoded or encoded.
+            ExecutorTimeoutError: If preprocessing took longer than the pool timeout.
+        """
+        return await self.executor.run(
+            preprocess_image, source, dest, thumbnail, self.options, is_retryable=_not_retryable
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        self.executor.shutdown()
+
+
+image_preprocessor = ImagePreprocessor(
+    PreprocessOptions(
+        output_type=settings.image_output_type,
+        quality=settings.image_quality,
+        short_side=settings.image_short_side,
+        max_long_side=settings.image_max_long_side,
+        thumbnail_size=settings.image_thumbnail_size,
+    ),
+    BoundedExecutor(
+        name="image preprocessing",
+        kind=settings.image_preprocess_executor,
+        max_concurrency=settings.image_preprocess_workers,
+        timeout=settings.image_preprocess_timeout_seconds,
+        max_retries=0,
+    ),
+)
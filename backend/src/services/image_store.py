@@ -0,0 +1,216 @@
+"""Streaming, content-addressed storage of uploaded receipt images."""
+
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+import aiofiles
+
+from src.services.bounded_executor import ExecutorTimeoutError
+from src.services.image_preprocessor import ImagePreprocessError, ImagePreprocessor
+
+logger = logging.getLogger(__name__)
+
+# Read uploads in small chunks so memory per request stays bounded
+CHUNK_SIZE = 64 * 1024
+
+# ISO-BMFF brands used by HEIC/HEIF photos from phones
+HEIF_BRANDS = {b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"mif1", b"msf1"}
+
+# File extension used in the store for each detected image type
+IMAGE_EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "heic": ".heic"}
+
+
+class InvalidImageError(ValueError):
+    """Raised when uploaded content is not a supported image format."""
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class ChunkReader(Protocol):
+    """Protocol for async byte sources such as FastAPI's UploadFile."""
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes."""
+        ...
+
+
+@dataclass
+class StoredImage:
+    """An image written to disk, with its content hash."""
+
+    path: Path
+    sha256: str
+    size: int
+    image_type: str  # jpeg|png|webp|heic
+    is_new: bool = True  # False when identical content was already stored
+    thumbnail_path: Path | None = None
+
+    def discard(self) -> None:
+        """Remove the stored files, unless an earlier upload owns them."""
+        if self.is_new:
+            self.path.unlink(missing_ok=True)
+            if self.thumbnail_path is not None:
+                self.thumbnail_path.unlink(missing_ok=True)
+
+
+def detect_image_type(header: bytes) -> str | None:
+    """
+    Identify an image format from its leading magic bytes.
+
+    Returns "jpeg", "png", "webp" or "heic", or None for anything else.
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[4:8] == b"ftyp" and header[8:12] in HEIF_BRANDS:
+        return "heic"
+    return None
+
+
+async def stream_to_disk(
+    source: ChunkReader,
+    dest: Path,
+    max_bytes: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> StoredImage:
+    """
+    Copy an upload to disk chunk by chunk, hashing it as it goes.
+
+    The first chunk is checked for image magic bytes before anything is written,
+    so non-images are rejected without reading the rest of the body. A partially
+    written file is removed if the size limit is exceeded or the copy fails.
+
+    Raises:
+        InvalidImageError: If the content is not a supported image.
+        UploadTooLargeError: If the content is larger than max_bytes.
+    """
+    chunk = await source.read(chunk_size)
+    image_type = detect_image_type(chunk)
+    if image_type is None:
+        raise InvalidImageError("File content is not a supported image")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(dest, "wb") as f:
+            while chunk:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"File exceeds maximum size of {max_bytes} bytes")
+                digest.update(chunk)
+                await f.write(chunk)
+                chunk = await source.read(chunk_size)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+    return StoredImage(path=dest, sha256=digest.hexdigest(), size=size, image_type=image_type)
+
+
+def content_path(upload_dir: Path, sha256: str, image_type: str) -> Path:
+    """Location of an image in the content-addressed store."""
+    return upload_dir / sha256[:2] / f"{sha256}{IMAGE_EXTENSIONS[image_type]}"
+
+
+def thumbnail_path(upload_dir: Path, sha256: str, image_type: str) -> Path:
+    """Location of an image's thumbnail in the content-addressed store."""
+    return upload_dir / sha256[:2] / f"{sha256}.thumb{IMAGE_EXTENSIONS[image_type]}"
+
+
+async def _store_preprocessed(
+    tmp_path: Path, stored: StoredImage, upload_dir: Path, preprocessor: ImagePreprocessor
+) -> StoredImage | None:
+    """
+    Replace a streamed upload with its preprocessed version and thumbnail.
+
+    Returns None, leaving the upload in place, if the image cannot be
+    preprocessed; the caller then stores the original.
+    """
+    image_type = preprocessor.image_type
+    target = content_path(upload_dir, stored.sha256, image_type)
+    thumbnail = thumbnail_path(upload_dir, stored.sha256, image_type)
+    if target.exists():
+        tmp_path.unlink()
+        return StoredImage(
+            path=target,
+            sha256=stored.sha256,
+            size=target.stat().st_size,
+            image_type=image_type,
+            is_new=False,
+            thumbnail_path=thumbnail if thumbnail.exists() else None,
+        )
+
+    # Written under temporary names so concurrent uploads never see partial files
+    target.parent.mkdir(exist_ok=True)
+    tmp_target = tmp_path.with_name(f"{tmp_path.name}{target.suffix}")
+    tmp_thumbnail = tmp_path.with_name(f"{tmp_path.name}.thumb{thumbnail.suffix}")
+    try:
+        result = await preprocessor.run(tmp_path, tmp_target, tmp_thumbnail)
+    except (ImagePreprocessError, ExecutorTimeoutError) as e:
+        logger.warning("Storing original image %s: %s", stored.sha256, e)
+        tmp_target.unlink(missing_ok=True)
+        tmp_thumbnail.unlink(missing_ok=True)
+        return None
+
+    tmp_thumbnail.replace(thumbnail)
+    tmp_target.replace(target)
+    tmp_path.unlink()
+    return StoredImage(
+        path=target,
+        sha256=stored.sha256,
+        size=result.size,
+        image_type=image_type,
+        thumbnail_path=thumbnail,
+    )
+
+
+async def store_content_addressed(
+    source: ChunkReader,
+    upload_dir: Path,
+    max_bytes: int,
+    preprocessor: ImagePreprocessor | None = None,
+) -> StoredImage:
+    """
+    Stream an upload into the store under a path derived from its SHA-256.
+
+    The content is written to a temporary file first, since the hash is only
+    known once the whole body has been read. If identical content is already
+    stored, the temporary file is discarded and the existing path is returned.
+
+    With a preprocessor, the normalized image and its thumbnail are stored
+    instead of the upload, still keyed by the hash of the uploaded bytes so
+    re-uploads are recognized. Images the preprocessor cannot decode are
+    stored as uploaded.
+    """
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = upload_dir / f".upload-{uuid.uuid4()}"
+    stored = await stream_to_disk(source, tmp_path, max_bytes=max_bytes)
+
+    if preprocessor is not None:
+        try:
+            processed = await _store_preprocessed(tmp_path, stored, upload_dir, preprocessor)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if processed is not None:
+            return processed
+
+    target = content_path(upload_dir, stored.sha256, stored.image_type)
+    if target.exists():
+        tmp_path.unlink()
+        stored.is_new = False
+    else:
+        target.parent.mkdir(exist_ok=True)
+        tmp_path.replace(target)
+
+    stored.path = target
+    return stored
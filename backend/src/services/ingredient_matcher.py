@@ -1,6 +1,16 @@
-"""Ingredient matching service for mapping receipt items to canonical ingredients."""
+"""Ingredient matching service for mapping receipt items to canonical ingredients.
+
+Matching a name against every ingredient is O(ingredients x aliases) with a
+pure-Python similarity ratio per comparison. ``IngredientIndex`` is built once
+per ingredient list and narrows each lookup to a handful of candidates: hash
+maps answer exact canonical and alias hits, and a character trigram inverted
+index finds the names that can contain, or be contained in, the normalized
+name, which is what a fuzzy match requires. Candidates are scored exactly as
+before, so results do not change.
+"""
 
 import re
+from collections.abc import Sequence
 from decimal import Decimal
 from difflib import SequenceMatcher
 from typing import Protocol
@@ -27,12 +37,102 @@ class MatchResult(BaseModel):
     method: str  # "exact" | "alias" | "fuzzy" | "llm" | "none"
 
 
+class IngredientIndex:
+    """Candidate lookup over one ingredient list."""
+
+    NGRAM_SIZE = 3
+
+    def __init__(self, ingredients: Sequence[IngredientLike]) -> None:
+        self.ingredients = ingredients
+        self._size = len(ingredients)
+        # First ingredient position per canonical name and per lowercased alias
+        self._exact: dict[str, int] = {}
+        self._alias: dict[str, int] = {}
+        # Matchable names: owning ingredient position and distinct n-gram count
+        self._names: list[str] = []
+        self._positions: list[int] = []
+        self._ngram_counts: list[int] = []
+        self._postings: dict[str, list[int]] = {}
+        self._short_names: list[int] = []  # Names with no n-grams, always candidates
+
+        for position, ingredient in enumerate(ingredients):
+            self._exact.setdefault(ingredient.canonical_name, position)
+            self._add_name(ingredient.canonical_name, position)
+            for alias in ingredient.aliases:
+                alias_lower = alias.lower()
+                self._alias.setdefault(alias_lower, position)
+                self._add_name(alias_lower, position)
+
+    def ngrams(self, text: str) -> set[str]:
+        """Distinct character n-grams of a name."""
+        size = self.NGRAM_SIZE
+        return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+    def _add_name(self, name: str, position: int) -> None:
+        name_id = len(self._names)
+        grams = self.ngrams(name)
+        self._names.append(name)
+        self._positions.append(position)
+        self._ngram_counts.append(len(grams))
+        if not grams:
+            self._short_names.append(name_id)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(name_id)
+
+    def covers(self, ingredients: Sequence[IngredientLike]) -> bool:
+        """Whether this index was built from ``ingredients`` as they are now."""
+        return ingredients is self.ingredients and len(ingredients) == self._size
+
+    def candidates(self, normalized_name: str, min_ratio: float) -> list[IngredientLike]:
+        """
+        Ingredients that can match a normalized name, in list order.
+
+        An exact canonical or alias hit outranks any fuzzy match, so it is the
+        only candidate. Otherwise a fuzzy match needs the name and a canonical
+        name or alias to contain one another, so every n-gram of the shorter
+        one occurs in the longer, and a similarity ratio above ``min_ratio``,
+        which bounds how much longer the longer one can be.
+        """
+        position = self._exact.get(normalized_name)
+        if position is None:
+            position = self._alias.get(normalized_name)
+        if position is not None:
+            return [self.ingredients[position]]
+
+        grams = self.ngrams(normalized_name)
+        if grams:
+            shared: dict[int, int] = {}
+            for gram in grams:
+                for name_id in self._postings.get(gram, ()):
+                    shared[name_id] = shared.get(name_id, 0) + 1
+            name_ids = [
+                name_id
+                for name_id, count in shared.items()
+                if count in (len(grams), self._ngram_counts[name_id])
+            ]
+            name_ids.extend(self._short_names)
+        else:
+            name_ids = list(range(len(self._names)))
+
+        # The ratio is at most 2 * shorter / (shorter + longer)
+        length = len(normalized_name)
+        positions = set()
+        for name_id in name_ids:
+            shorter, longer = sorted((length, len(self._names[name_id])))
+            if longer * min_ratio <= shorter * (2 - min_ratio):
+                positions.add(self._positions[name_id])
+        return [self.ingredients[position] for position in sorted(positions)]
+
+
 class IngredientMatcher:
     """Matches receipt item names to canonical ingredients."""
 
     # Minimum similarity ratio for fuzzy matching
     MIN_FUZZY_RATIO = 0.5
 
+    def __init__(self) -> None:
+        self._index: IngredientIndex | None = None
+
     # Norwegian brand prefixes to remove
     BRAND_PREFIXES = [
         "tine",
@@ -143,26 +243,38 @@ class IngredientMatcher:
 
         return None
 
+    def index_for(self, ingredients: Sequence[IngredientLike]) -> IngredientIndex:
+        """Index of ``ingredients``, reused while the same list is passed again."""
+        if self._index is None or not self._index.covers(ingredients):
+            self._index = IngredientIndex(ingredients)
+        return self._index
+
     async def match(
         self,
         raw_name: str,
-        ingredients: list[IngredientLike],
+        ingredients: Sequence[IngredientLike] | IngredientIndex,
     ) -> MatchResult | None:
         """
         Match a raw receipt item name to the best canonical ingredient.
 
         Args:
             raw_name: The raw name from the receipt (e.g., "TINE MELK 1L")
-            ingredients: List of Ingredient objects to match against
+            ingredients: List of Ingredient objects to match against, or an
+                IngredientIndex built from one
 
         Returns:
             Best MatchResult or None if no good match found
         """
-        normalized = self.normalize_name(raw_name)
+        if not isinstance(ingredients, IngredientIndex):
+            ingredients = self.index_for(ingredients)
+        return self.find_match(raw_name, ingredients)
 
+    def find_match(self, raw_name: str, index: IngredientIndex) -> MatchResult | None:
+        """Synchronous core of ``match``, for callers outside the event loop."""
+        normalized = self.normalize_name(raw_name)
         best_match: MatchResult | None = None
 
-        for ingredient in ingredients:
+        for ingredient in index.candidates(normalized, self.MIN_FUZZY_RATIO):
             match = self.match_against_ingredient(normalized, ingredient)
             if match and (best_match is None or match.confidence > best_match.confidence):
                 best_match = match
@@ -0,0 +1,71 @@
+"""Typo-tolerant ingredient search backed by a pg_trgm GIN index.
+
+Names, canonical names and aliases are folded into one lowercase search text
+by the ``ingredient_search_text()`` SQL function, which the
+``idx_ingredients_search_trgm`` expression index is built on. Matches are ranked
+by trigram word similarity, so "tomatt" finds "Tomat" and "lettm" finds the
+ingredient that has "lettmelk" as an alias.
+"""
+
+import uuid
+
+from sqlalchemy import ColumnElement, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.db.models import Ingredient
+
+
+def search_text() -> ColumnElement[str]:
+    """The indexed search expression; must match the index definition exactly."""
+    return func.ingredient_search_text(
+        Ingredient.name, Ingredient.canonical_name, Ingredient.aliases
+    )
+
+
+def search_query(
+    term: str,
+    category_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> Select[uuid.UUID]:
+    """Ingredient ids matching ``term``, best match first."""
+    term = term.lower().strip()
+    text = search_text()
+    query = (
+        select(Ingredient.id)
+        # text %> term is term <% text with the indexed expression on the left
+        .where(text.op("%>")(term))
+        .order_by(
+            func.word_similarity(term, text).desc(),
+            func.similarity(term, func.lower(Ingredient.name)).desc(),
+            Ingredient.name,
+        )
+        .offset(skip)
+        .limit(limit)
+    )
+    if category_id:
+        query = query.where(Ingredient.category_id == category_id)
+    return query
+
+
+async def search_ingredient_ids(
+    db: AsyncSession,
+    term: str,
+    category_id: uuid.UUID | None = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> list[uuid.UUID]:
+    """Run a ranked trigram search; returns ingredient ids, best match first."""
+    # %> compares against this setting; is_local limits it to the transaction
+    await db.execute(
+        select(
+            func.set_config(
+                "pg_trgm.word_similarity_threshold",
+                str(settings.ingredient_search_threshold),
+                True,
+            )
+        )
+    )
+    result = await db.execute(search_query(term, category_id, skip, limit))
+    return list(result.scalars().all())
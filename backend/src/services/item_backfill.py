@@ -0,0 +1,341 @@
+"""Resumable backfill of ingredient matches for historical receipt items.
+
+Items stored before matching was wired into receipt processing have no
+ingredient. The backfill streams them in primary key order through a
+server-side cursor, ``chunk_size`` rows at a time, so memory stays flat however
+many items there are. The distinct names of each chunk are matched in a
+process pool, and the results are written with one executemany UPDATE. The
+keyset position is saved in ``backfill_checkpoints`` in the same transaction
+as the updates, so an interrupted run resumes after the last committed chunk.
+
+Run it from the command line::
+
+    python -m src.services.item_backfill [--restart] [--chunk-size N] [--workers N]
+
+or start it in the API process with ``POST /api/admin/backfill/items``.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, cast
+
+from sqlalchemy import Row, Select, Table, bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.db.engine import async_session_factory
+from src.db.models import BackfillCheckpoint, Item
+from src.services.catalog_cache import catalog_cache
+from src.services.ingredient_matcher import IngredientIndex, IngredientMatcher
+
+logger = logging.getLogger(__name__)
+
+JOB = "item_ingredients"
+
+NameMatch = tuple[uuid.UUID, Decimal] | None  # Ingredient and confidence
+PendingRow = Row[uuid.UUID, str, str | None]  # Item id, raw name, canonical name
+
+
+class BackfillRunningError(Exception):
+    """Raised when a backfill is started while one is already running."""
+
+
+@dataclass
+class MatchTarget:
+    """Picklable slice of an ingredient, shipped to the pool processes."""
+
+    id: uuid.UUID
+    name: str
+    canonical_name: str
+    aliases: list[str]
+
+
+@dataclass
+class PoolState:
+    """Matcher and index of one pool process, built by ``init_worker``."""
+
+    matcher: IngredientMatcher | None = None
+    index: IngredientIndex | None = None
+
+
+_pool_state = PoolState()
+
+
+def init_worker(targets: Sequence[MatchTarget]) -> None:
+    """Build the matching index once per pool process."""
+    _pool_state.matcher = IngredientMatcher()
+    _pool_state.index = IngredientIndex(targets)
+
+
+def match_names(names: Sequence[str]) -> list[NameMatch]:
+    """Match names against the process's index; runs in the pool."""
+    matcher, index = _pool_state.matcher, _pool_state.index
+    if matcher is None or index is None:
+        raise RuntimeError("init_worker() has not run in this process")
+    results: list[NameMatch] = []
+    for name in names:
+        match = matcher.find_match(name, index)
+        results.append((match.ingredient_id, match.confidence) if match else None)
+    return results
+
+
+@dataclass
+class BackfillProgress:
+    """Counters of a backfill; totals include earlier, interrupted runs."""
+
+    processed: int = 0
+    matched: int = 0
+    run_items: int = 0  # Items handled by this run, for throughput
+    chunks: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def items_per_second(self) -> float:
+        """Throughput of this run."""
+        elapsed = time.monotonic() - self.started
+        return self.run_items / elapsed if elapsed > 0 else 0.0
+
+
+def pending_items_query(after: uuid.UUID | None) -> Select[uuid.UUID, str, str | None]:
+    """Unmatched items in primary key order, after the checkpoint."""
+    query = (
+        select(Item.id, Item.raw_name, Item.canonical_name)
+        .where(
+            Item.ingredient_id.is_(None),
+            Item.is_pant.is_(False),
+            Item.discount_amount == 0,  # Discounts are separate lines
+        )
+        .order_by(Item.id)
+    )
+    if after is not None:
+        query = query.where(Item.id > after)
+    return query
+
+
+async def load_checkpoint(db: AsyncSession, restart: bool = False) -> BackfillCheckpoint:
+    """
+    Get the checkpoint to continue from.
+
+    A completed run, or ``restart``, starts a new pass from the first item, which
+    also retries items left unmatched by an older catalog.
+    """
+    checkpoint = await db.get(BackfillCheckpoint, JOB, with_for_update=True)
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(job=JOB, processed=0, matched=0)
+        db.add(checkpoint)
+    elif restart or checkpoint.completed_at is not None:
+        checkpoint.last_id = None
+        checkpoint.processed = 0
+        checkpoint.matched = 0
+        checkpoint.started_at = datetime.now()
+        checkpoint.completed_at = None
+    await db.flush()
+    return checkpoint
+
+
+def update_values(
+    rows: Sequence[PendingRow], matches: dict[str, NameMatch]
+) -> list[dict[str, Any]]:
+    """Executemany parameters for the matched items of a chunk."""
+    values = []
+    for item_id, raw_name, canonical_name in rows:
+        match = matches.get(canonical_name or raw_name)
+        if match is not None:
+            ingredient_id, confidence = match
+            values.append({"item_id": item_id, "match_id": ingredient_id, "confidence": confidence})
+    return values
+
+
+async def write_chunk(
+    db: AsyncSession,
+    last_id: uuid.UUID,
+    values: list[dict[str, Any]],
+    progress: BackfillProgress,
+) -> None:
+    """Update matched items and move the checkpoint, in one transaction."""
+    if values:
+        # Core table: executemany UPDATE with a WHERE on more than the primary key
+        items = cast(Table, Item.__table__)
+        await db.execute(
+            update(items)
+            .where(items.c.id == bindparam("item_id"), items.c.ingredient_id.is_(None))
+            .values(
+                ingredient_id=bindparam("match_id"),
+                ingredient_confidence=bindparam("confidence"),
+            ),
+            values,
+        )
+    await db.execute(
+        update(BackfillCheckpoint)
+        .where(BackfillCheckpoint.job == JOB)
+        .values(
+            last_id=last_id,
+            processed=progress.processed,
+            matched=progress.matched,
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+class ItemBackfill:
+    """Runs the item backfill, from the CLI or as a task of the API process."""
+
+    def __init__(
+        self,
+        chunk_size: int = 5000,
+        workers: int = 2,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_factory,
+    ) -> None:
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.session_factory = session_factory
+        self.progress: BackfillProgress | None = None
+        self._task: asyncio.Task[BackfillProgress] | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a backfill task of this process is in flight."""
+        return self._task is not None and not self._task.done()
+
+    def start(self, restart: bool = False) -> None:
+        """
+        Run the backfill in the background of the current event loop.
+
+        Raises:
+            BackfillRunningError: If this process is already running one.
+        """
+        if self.running:
+            raise BackfillRunningError("Item backfill already running")
+        self._task = asyncio.create_task(self.run(restart))
+        self._task.add_done_callback(self._log_failure)
+
+    async def stop(self) -> None:
+        """Cancel a running backfill; it resumes from its checkpoint next time."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def run(self, restart: bool = False) -> BackfillProgress:
+        """
+        Match all unmatched items, resuming from the checkpoint.
+
+        Args:
+            restart: Start over from the first item even if a run was interrupted.
+
+        Returns:
+            Final counters.
+        """
+        async with self.session_factory() as db:
+            checkpoint = await load_checkpoint(db, restart)
+            after = checkpoint.last_id
+            self.progress = progress = BackfillProgress(
+                processed=checkpoint.processed, matched=checkpoint.matched
+            )
+            catalog = await catalog_cache.get(db)
+            await db.commit()
+            targets = [
+                MatchTarget(i.id, i.name, i.canonical_name, list(i.aliases))
+                for i in catalog.ingredients
+            ]
+
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=init_worker, initargs=(targets,)
+            )
+            try:
+                async with self.session_factory() as reader:
+                    result = await reader.stream(
+                        pending_items_query(after).execution_options(yield_per=self.chunk_size)
+                    )
+                    async for rows in result.partitions():
+                        await self._process_chunk(db, executor, rows, progress)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            await db.execute(
+                update(BackfillCheckpoint)
+                .where(BackfillCheckpoint.job == JOB)
+                .values(completed_at=func.now(), updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        logger.info(
+            "Item backfill complete: %d items, %d matched, %.0f items/s",
+            progress.processed,
+            progress.matched,
+            progress.items_per_second,
+        )
+        return progress
+
+    async def _process_chunk(
+        self,
+        db: AsyncSession,
+        executor: Executor,
+        rows: Sequence[PendingRow],
+        progress: BackfillProgress,
+    ) -> None:
+        names = list(dict.fromkeys(canonical or raw for _, raw, canonical in rows))
+        matches = await self._match(executor, names)
+        values = update_values(rows, matches)
+
+        progress.processed += len(rows)
+        progress.matched += len(values)
+        progress.run_items += len(rows)
+        progress.chunks += 1
+        await write_chunk(db, rows[-1][0], values, progress)
+        logger.info(
+            "Item backfill: %d items, %d matched, %.0f items/s",
+            progress.processed,
+            progress.matched,
+            progress.items_per_second,
+        )
+
+    async def _match(self, executor: Executor, names: list[str]) -> dict[str, NameMatch]:
+        """Match distinct names, split evenly across the pool."""
+        loop = asyncio.get_running_loop()
+        size = -(-len(names) // self.workers)  # Ceiling division
+        slices = [names[i : i + size] for i in range(0, len(names), size)]
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, match_names, part) for part in slices)
+        )
+        return {
+            name: match
+            for part, part_results in zip(slices, results, strict=True)
+            for name, match in zip(part, part_results, strict=True)
+        }
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task[BackfillProgress]) -> None:
+        if not task.cancelled() and (error := task.exception()):
+            logger.error("Item backfill failed", exc_info=error)
+
+
+item_backfill = ItemBackfill(
+    chunk_size=settings.item_backfill_chunk_size,
+    workers=settings.item_backfill_workers,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match historical receipt items to ingredients")
+    parser.add_argument("--restart", action="store_true", help="ignore an interrupted run")
+    parser.add_argument("--chunk-size", type=int, default=settings.item_backfill_chunk_size)
+    parser.add_argument("--workers", type=int, default=settings.item_backfill_workers)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    backfill = ItemBackfill(chunk_size=args.chunk_size, workers=args.workers)
+    asyncio.run(backfill.run(restart=args.restart))
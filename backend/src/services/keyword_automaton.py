@@ -0,0 +1,93 @@
+"""Aho-Corasick automaton for finding many keywords in a string in one pass."""
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """A keyword found in the searched text."""
+
+    start: int
+    keyword: str
+    label: str
+    priority: int  # Lower wins ties between equally long matches
+
+
+class KeywordAutomaton:
+    """
+    Multi-pattern substring matcher built once from labelled keywords.
+
+    Searching costs O(len(text) + matches) regardless of how many keywords are
+    loaded, unlike testing each keyword with ``in``.
+    """
+
+    def __init__(self, keywords: Iterable[tuple[str, str, int]]) -> None:
+        """
+        Compile the automaton.
+
+        Args:
+            keywords: (keyword, label, priority) triples. Keywords are matched
+                case-sensitively, so callers should lowercase both sides.
+        """
+        # State 0 is the root; each state has a goto table, a failure link and
+        # the keywords that end there (including those reached via failure links).
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[tuple[str, str, int]]] = [[]]
+
+        for keyword, label, priority in keywords:
+            if keyword:
+                self._add(keyword, label, priority)
+        self._link()
+
+    def _add(self, keyword: str, label: str, priority: int) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((keyword, label, priority))
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child].extend(self._output[self._fail[child]])
+
+    def find_all(self, text: str) -> Iterator[KeywordMatch]:
+        """Yield every keyword occurrence in text, including overlapping ones."""
+        goto = self._goto
+        fail = self._fail
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, label, priority in self._output[state]:
+                yield KeywordMatch(end - len(keyword), keyword, label, priority)
+
+    def best_match(self, text: str) -> KeywordMatch | None:
+        """
+        Pick one match deterministically.
+
+        The longest keyword wins; ties go to the lowest priority value, then to
+        the leftmost occurrence.
+        """
+        return min(
+            self.find_all(text),
+            key=lambda m: (-len(m.keyword), m.priority, m.start),
+            default=None,
+        )
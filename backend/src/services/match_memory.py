@@ -0,0 +1,392 @@
+"""Learned raw item name -> ingredient matches, persisted and cached per process.
+
+The same raw strings ("TINE LETTMELK 1L", "Q MELK") recur across thousands of
+receipts. Each name is matched by IngredientMatcher once; the result is stored
+in ``ingredient_match_memory`` and later lookups read it back instead of
+matching again. User corrections are stored per household and override the
+global row for that household.
+
+An in-process LRU sits in front of the table, so repeat names resolve without a
+query. Entries expire after ``match_memory_ttl_seconds``, which bounds how long
+another worker's correction can go unnoticed. Matcher results are tied to the
+catalog version they were computed against and are re-learned when the catalog
+changes; corrections never go stale.
+
+Each served row's ``hit_count`` is incremented, batched in memory and written
+every ``match_memory_flush_seconds``, to show how much traffic memory serves.
+"""
+
+import time
+import uuid
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, cast
+
+from sqlalchemy import ColumnElement, Table, bindparam, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.db.models import IngredientMatchMemory
+from src.services.catalog_cache import Catalog
+from src.services.ingredient_matcher import IngredientMatcher, MatchResult
+
+USER_METHOD = "user"
+
+_COLUMNS = (
+    IngredientMatchMemory.id,
+    IngredientMatchMemory.raw_key,
+    IngredientMatchMemory.household_id,
+    IngredientMatchMemory.ingredient_id,
+    IngredientMatchMemory.confidence,
+    IngredientMatchMemory.method,
+    IngredientMatchMemory.catalog_version,
+)
+
+
+def memory_key(raw_name: str) -> str:
+    """Key a raw receipt name is remembered under: uppercased, single-spaced."""
+    return " ".join(raw_name.upper().split())
+
+
+@dataclass(frozen=True)
+class MemoryEntry:
+    """A resolved name; ``ingredient_id`` None means nothing matched."""
+
+    row_id: uuid.UUID | None  # Memory row that served it, for hit counting
+    ingredient_id: uuid.UUID | None
+    confidence: Decimal
+    method: str
+    catalog_version: int | None  # None for corrections, which never go stale
+
+    def is_current(self, catalog: Catalog) -> bool:
+        """Whether the entry still holds for this catalog snapshot."""
+        return self.catalog_version is None or self.catalog_version == catalog.version
+
+
+NO_MATCH_CONFIDENCE = Decimal("0")
+
+
+async def load_remembered(
+    db: AsyncSession, keys: Iterable[str], household_id: uuid.UUID | None
+) -> dict[str, MemoryEntry]:
+    """Read stored matches for ``keys``, preferring the household's corrections."""
+    household_filter: ColumnElement[bool] = IngredientMatchMemory.household_id.is_(None)
+    if household_id is not None:
+        household_filter = or_(household_filter, IngredientMatchMemory.household_id == household_id)
+    result = await db.execute(
+        select(*_COLUMNS).where(IngredientMatchMemory.raw_key.in_(list(keys)), household_filter)
+    )
+
+    found: dict[str, MemoryEntry] = {}
+    for row in result.all():
+        if row.household_id is not None or row.raw_key not in found:
+            found[row.raw_key] = MemoryEntry(
+                row_id=row.id,
+                ingredient_id=row.ingredient_id,
+                confidence=row.confidence,
+                method=row.method,
+                catalog_version=row.catalog_version,
+            )
+    return found
+
+
+async def store_learned(
+    db: AsyncSession, matches: dict[str, MatchResult], catalog_version: int
+) -> dict[str, uuid.UUID]:
+    """
+    Upsert global matcher results; returns the row id per stored key.
+
+    Rows are written in key order so concurrent writers lock them in the same
+    order. Global corrections are left alone.
+    """
+    if not matches:
+        return {}
+
+    table = IngredientMatchMemory
+    stmt = insert(table).values(
+        [
+            {
+                "id": uuid.uuid4(),
+                "raw_key": key,
+                "ingredient_id": match.ingredient_id,
+                "confidence": match.confidence,
+                "method": match.method,
+                "catalog_version": catalog_version,
+            }
+            for key, match in sorted(matches.items())
+        ]
+    )
+    upsert = stmt.on_conflict_do_update(
+        index_elements=[table.raw_key],
+        index_where=table.household_id.is_(None),
+        set_={
+            "ingredient_id": stmt.excluded.ingredient_id,
+            "confidence": stmt.excluded.confidence,
+            "method": stmt.excluded.method,
+            "catalog_version": stmt.excluded.catalog_version,
+            "updated_at": func.now(),
+        },
+        where=table.method != USER_METHOD,
+    ).returning(table.raw_key, table.id)
+    result = await db.execute(upsert)
+    return {row.raw_key: row.id for row in result.all()}
+
+
+async def store_correction(
+    db: AsyncSession, key: str, ingredient_id: uuid.UUID, household_id: uuid.UUID | None
+) -> None:
+    """Upsert a user correction, for one household or globally."""
+    table = IngredientMatchMemory
+    stmt = insert(table).values(
+        id=uuid.uuid4(),
+        raw_key=key,
+        household_id=household_id,
+        ingredient_id=ingredient_id,
+        confidence=Decimal("1.0"),
+        method=USER_METHOD,
+        catalog_version=None,
+    )
+    if household_id is None:
+        target: dict[str, Any] = {
+            "index_elements": [table.raw_key],
+            "index_where": table.household_id.is_(None),
+        }
+    else:
+        target = {
+            "index_elements": [table.household_id, table.raw_key],
+            "index_where": table.household_id.isnot(None),
+        }
+    await db.execute(
+        stmt.on_conflict_do_update(
+            **target,
+            set_={
+                "ingredient_id": ingredient_id,
+                "confidence": Decimal("1.0"),
+                "method": USER_METHOD,
+                "catalog_version": None,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+async def memory_totals(db: AsyncSession) -> dict[str, int]:
+    """Stored rows, corrections among them, and hits served over all time."""
+    table = IngredientMatchMemory
+    result = await db.execute(
+        select(
+            func.count(),
+            func.count().filter(table.method == USER_METHOD),
+            func.coalesce(func.sum(table.hit_count), 0),
+        )
+    )
+    entries, corrections, hits = result.one()
+    return {"entries": entries, "corrections": corrections, "total_hits": int(hits)}
+
+
+class MatchMemory:
+    """Learned matches with an in-process LRU front and batched hit counting."""
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        ttl: float = 300.0,
+        flush_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Create an empty memory.
+
+        Args:
+            capacity: Names kept in the LRU per process.
+            ttl: Seconds an LRU entry is trusted before it is read again.
+            flush_interval: Seconds between hit count writes.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.matcher = IngredientMatcher()
+        self._clock = clock
+        self._entries: OrderedDict[tuple[uuid.UUID | None, str], tuple[float, MemoryEntry]] = (
+            OrderedDict()
+        )
+        self._pending_hits: Counter[uuid.UUID] = Counter()
+        self._flushed_at = clock()
+        self.cache_hits = 0
+        self.db_hits = 0
+        self.learned = 0
+        self.unmatched = 0
+
+    def _get(self, cache_key: tuple[uuid.UUID | None, str], catalog: Catalog) -> MemoryEntry | None:
+        cached = self._entries.get(cache_key)
+        if cached is None:
+            return None
+        expires_at, entry = cached
+        if expires_at <= self._clock() or not entry.is_current(catalog):
+            del self._entries[cache_key]
+            return None
+        self._entries.move_to_end(cache_key)
+        return entry
+
+    def _put(self, cache_key: tuple[uuid.UUID | None, str], entry: MemoryEntry) -> None:
+        self._entries[cache_key] = (self._clock() + self.ttl, entry)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    async def match_many(
+        self,
+        db: AsyncSession,
+        names: Iterable[str],
+        catalog: Catalog,
+        household_id: uuid.UUID | None = None,
+    ) -> dict[str, MatchResult | None]:
+        """
+        Resolve raw names to ingredients: LRU, then stored matches, then the matcher.
+
+        Names the matcher resolves are stored for next time, in the caller's
+        transaction.
+        """
+        names = list(names)
+        names_by_key: dict[str, str] = {}
+        for name in names:
+            names_by_key.setdefault(memory_key(name), name)
+
+        served: dict[str, MemoryEntry] = {}
+        for key in names_by_key:
+            if entry := self._get((household_id, key), catalog):
+                served[key] = entry
+                self.cache_hits += 1
+
+        missing = [key for key in names_by_key if key not in served]
+        if missing:
+            stored = await load_remembered(db, missing, household_id)
+            for key, entry in stored.items():
+                if entry.is_current(catalog):
+                    served[key] = entry
+                    self.db_hits += 1
+                    self._put((household_id, key), entry)
+
+        for entry in served.values():
+            if entry.row_id is not None:
+                self._pending_hits[entry.row_id] += 1
+        if self._clock() - self._flushed_at >= self.flush_interval:
+            await self.flush_hits(db)
+
+        unknown = {key: name for key, name in names_by_key.items() if key not in served}
+        entries = served | await self._learn(db, unknown, catalog, household_id)
+        return {name: self._to_result(entries[memory_key(name)], catalog) for name in names}
+
+    async def _learn(
+        self,
+        db: AsyncSession,
+        names_by_key: dict[str, str],
+        catalog: Catalog,
+        household_id: uuid.UUID | None,
+    ) -> dict[str, MemoryEntry]:
+        if not names_by_key:
+            return {}
+        matches: dict[str, MatchResult] = {}
+        entries: dict[str, MemoryEntry] = {}
+        for key, name in names_by_key.items():
+            match = await self.matcher.match(name, catalog.ingredient_index)
+            if match is None:
+                # Remembered in this process only, until the TTL or catalog moves on
+                self.unmatched += 1
+                entries[key] = MemoryEntry(
+                    row_id=None,
+                    ingredient_id=None,
+                    confidence=NO_MATCH_CONFIDENCE,
+                    method="none",
+                    catalog_version=catalog.version,
+                )
+            else:
+                matches[key] = match
+
+        row_ids = await store_learned(db, matches, catalog.version)
+        self.learned += len(matches)
+        for key, match in matches.items():
+            entries[key] = MemoryEntry(
+                row_id=row_ids.get(key),
+                ingredient_id=match.ingredient_id,
+                confidence=match.confidence,
+                method=match.method,
+                catalog_version=catalog.version,
+            )
+        for key, entry in entries.items():
+            self._put((household_id, key), entry)
+        return entries
+
+    def _to_result(self, entry: MemoryEntry, catalog: Catalog) -> MatchResult | None:
+        if entry.ingredient_id is None:
+            return None
+        # Rows of deleted ingredients are gone too, but the LRU may still hold them
+        ingredient = catalog.ingredients_by_id.get(entry.ingredient_id)
+        if ingredient is None:
+            return None
+        return MatchResult(
+            ingredient_id=ingredient.id,
+            ingredient_name=ingredient.name,
+            confidence=entry.confidence,
+            method=entry.method,
+        )
+
+    async def remember(
+        self,
+        db: AsyncSession,
+        raw_name: str,
+        ingredient_id: uuid.UUID,
+        household_id: uuid.UUID,
+    ) -> None:
+        """Store a household's user correction."""
+        key = memory_key(raw_name)
+        await store_correction(db, key, ingredient_id, household_id)
+        self._entries.pop((household_id, key), None)
+
+    async def remember_global(
+        self, db: AsyncSession, raw_name: str, ingredient_id: uuid.UUID
+    ) -> str:
+        """Store a correction for every household; returns the memory key."""
+        key = memory_key(raw_name)
+        await store_correction(db, key, ingredient_id, None)
+        # A global correction applies to every household without an override
+        for cache_key in [k for k in self._entries if k[1] == key]:
+            del self._entries[cache_key]
+        return key
+
+    async def flush_hits(self, db: AsyncSession) -> None:
+        """Write pending hit counts with one executemany UPDATE."""
+        pending, self._pending_hits = self._pending_hits, Counter()
+        self._flushed_at = self._clock()
+        if not pending:
+            return
+        # Core table: ORM bulk UPDATE would not take the increment expression
+        table = cast(Table, IngredientMatchMemory.__table__)
+        await db.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(hit_count=table.c.hit_count + bindparam("hits")),
+            [{"row_id": row_id, "hits": hits} for row_id, hits in sorted(pending.items())],
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Counters of this process, for monitoring."""
+        return {
+            "cached": len(self._entries),
+            "cache_hits": self.cache_hits,
+            "db_hits": self.db_hits,
+            "learned": self.learned,
+            "unmatched": self.unmatched,
+            "pending_hits": sum(self._pending_hits.values()),
+        }
+
+
+match_memory = MatchMemory(
+    capacity=settings.match_memory_size,
+    ttl=settings.match_memory_ttl_seconds,
+    flush_interval=settings.match_memory_flush_seconds,
+)
@@ -51,7 +51,8 @@ class MealPlanService:
         Consumes from oldest lots first based on purchase_date.
 
         Args:
-            lots: List of inventory lots with quantity, unit_cost, purchase_date
+            lots: List of inventory lots with quantity, unit_cost (per unit of
+                quantity), purchase_date
             required_quantity: Amount needed
 
         Returns:
@@ -71,10 +72,7 @@ class MealPlanService:
             available = lot["quantity"]
             take = min(available, remaining)
 
-            # Calculate unit price (cost per single unit of quantity)
-            unit_price = lot["unit_cost"] / lot["quantity"] if lot["quantity"] > 0 else Decimal("0")
-
-            cost = take * unit_price
+            cost = take * lot["unit_cost"]
             total_cost += cost
 
             consumed.append(
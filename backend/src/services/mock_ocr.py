@@ -8,6 +8,8 @@ from src.services.ocr import OCRService
 class MockOCRService(OCRService):
     """Mock OCR service with Norwegian receipt fixtures."""
 
+    engine = "mock"
+
     FIXTURES = [
         {
             "merchant": "REMA 1000",
@@ -6,6 +6,10 @@ from typing import Any
 class OCRService(ABC):
     """Abstract base class for OCR services."""
 
+    # Identify cached results; bump engine_version when output for the same image changes
+    engine: str = "unknown"
+    engine_version: str = "1"
+
     @abstractmethod
     async def extract_text(self, image_path: Path) -> dict[str, Any]:
         """
@@ -0,0 +1,17 @@
+"""Run blocking OCR engine calls off the event loop with limits, timeouts and retries."""
+
+from src.config import settings
+from src.services.bounded_executor import BoundedExecutor, ExecutorTimeoutError
+
+# OCR names kept for the OCR services and their callers
+OCRExecutor = BoundedExecutor
+OCRTimeoutError = ExecutorTimeoutError
+
+ocr_executor = OCRExecutor(
+    name="OCR",
+    kind=settings.ocr_executor,
+    max_concurrency=settings.ocr_max_concurrency,
+    timeout=settings.ocr_timeout_seconds,
+    max_retries=settings.ocr_max_retries,
+    backoff=settings.ocr_retry_backoff_seconds,
+)
@@ -59,12 +59,44 @@ MERCHANTS = [
 ]
 
 
+PAYMENT_KEYWORDS = ["VISA", "MASTERCARD", "VIPPS", "KONTANT", "BETALT"]
+
+# Compiled once at import; parse_lines classifies each line with one scan of
+# LINE_KEYWORD_PATTERN over the upper-cased line plus one PRICE_PATTERN search.
+# The lookahead reports every keyword occurrence, even overlapping ones.
+ABBREVIATION_PATTERN = re.compile(r"\b(" + "|".join(map(re.escape, ABBREVIATIONS)) + r")\b")
+_LINE_KEYWORDS = [*MERCHANTS, *PAYMENT_KEYWORDS, "TOTAL", "PANT", "RABATT"]
+LINE_KEYWORD_PATTERN = re.compile(
+    # Cheap first-character check so most positions fail before the alternation
+    f"(?=[{re.escape(''.join(sorted({kw[0] for kw in _LINE_KEYWORDS})))}\\d])"
+    "(?=(?:"
+    f"(?P<merchant>{'|'.join(map(re.escape, MERCHANTS))})"
+    f"|(?P<payment>{'|'.join(PAYMENT_KEYWORDS)})"
+    r"|(?P<total>TOTAL)|(?P<pant>PANT)|(?P<discount>RABATT)"
+    r"|(?P<date>\d{1,2}[./]\d{1,2}[./]\d{2,4})"
+    "))"
+)
+PRICE_PATTERN = re.compile(r"(-?\d+[,.]?\d*)\s*(NOK|kr)?$", re.IGNORECASE)
+PANT_QUANTITY_PATTERN = re.compile(r"PANT.*?(\d+)\s*[xX]\s*(\d+[,.]?\d*)", re.IGNORECASE)
+CURRENCY_SUFFIX_PATTERN = re.compile(r"(NOK|kr)$", re.IGNORECASE)
+
+_MERCHANT_ORDER = {merchant: i for i, merchant in enumerate(MERCHANTS)}
+
+
+@dataclass
+class LineClass:
+    """What a single OCR line contains; one line can be several kinds at once."""
+
+    merchant: str | None = None
+    date: str | None = None
+    is_payment: bool = False
+    is_total: bool = False
+    item: ParsedItem | None = None
+
+
 def normalize_name(name: str) -> str:
     """Normalize item name by expanding abbreviations."""
-    result = name.upper().strip()
-    for abbr, full in ABBREVIATIONS.items():
-        result = re.sub(rf"\b{abbr}\b", full, result)
-    return result
+    return ABBREVIATION_PATTERN.sub(lambda m: ABBREVIATIONS[m.group(1)], name.upper().strip())
 
 
 def parse_price(price_str: str) -> Decimal:
@@ -72,7 +104,7 @@ def parse_price(price_str: str) -> Decimal:
     # Handle Norwegian comma as decimal separator
     cleaned = price_str.replace(" ", "").replace(",", ".")
     # Remove NOK/kr suffix
-    cleaned = re.sub(r"(NOK|kr)$", "", cleaned, flags=re.IGNORECASE)
+    cleaned = CURRENCY_SUFFIX_PATTERN.sub("", cleaned)
     try:
         return Decimal(cleaned).quantize(Decimal("0.01"))
     except Exception:
@@ -148,6 +180,77 @@ def parse_fixture_data(raw: dict[str, Any]) -> ParsedReceipt:
     )
 
 
+def classify_line(line: str) -> LineClass:
+    """Classify a stripped, non-empty OCR line in one keyword scan."""
+    result = LineClass()
+    merchants = []
+    pant_ends = []
+    discount_ends = []
+
+    upper = line.upper()
+    for match in LINE_KEYWORD_PATTERN.finditer(upper):
+        kind = match.lastgroup
+        value = match.group(kind) if kind else ""
+        if kind == "merchant":
+            merchants.append(value)
+        elif kind == "date" and result.date is None:
+            result.date = value
+        elif kind == "payment":
+            result.is_payment = True
+        elif kind == "total":
+            result.is_total = True
+        elif kind == "pant":
+            pant_ends.append(match.start() + len(value))
+        elif kind == "discount":
+            discount_ends.append(match.start() + len(value))
+
+    # Earlier entries in MERCHANTS win when a line names several merchants
+    if merchants:
+        result.merchant = min(merchants, key=_MERCHANT_ORDER.__getitem__)
+
+    price_match = None if result.is_total else PRICE_PATTERN.search(line)
+    if price_match:
+        name = line[: price_match.start()]
+        # Keyword offsets are in the upper-cased line, which can be longer
+        name_end = len(name.upper())
+        result.item = _parse_item(
+            name=name.strip(),
+            price=parse_price(price_match.group(1)),
+            is_pant=any(end <= name_end for end in pant_ends),
+            has_discount_word=any(end <= name_end for end in discount_ends),
+            pant_match=PANT_QUANTITY_PATTERN.search(line) if pant_ends else None,
+        )
+
+    return result
+
+
+def _parse_item(
+    name: str,
+    price: Decimal,
+    is_pant: bool,
+    has_discount_word: bool,
+    pant_match: re.Match[str] | None,
+) -> ParsedItem | None:
+    if not name or price == Decimal("0"):
+        return None
+
+    is_discount = price < 0 or has_discount_word
+
+    # Parse pant quantity
+    quantity = Decimal(pant_match.group(1)) if pant_match else Decimal("1")
+
+    return ParsedItem(
+        raw_name=name,
+        canonical_name=normalize_name(name) if not is_pant and not is_discount else None,
+        quantity=quantity,
+        unit=None,
+        unit_price=abs(price) / quantity if quantity else None,
+        total_price=abs(price),
+        is_pant=is_pant,
+        discount_amount=abs(price) if is_discount else Decimal("0"),
+    )
+
+
 def parse_lines(lines: list[str]) -> ParsedReceipt:
     """Parse OCR text lines into receipt data."""
     merchant_name = "Unknown"
@@ -156,69 +259,35 @@ def parse_lines(lines: list[str]) -> ParsedReceipt:
     payment_method = None
     items: list[ParsedItem] = []
 
-    # Patterns
-    price_pattern = re.compile(r"(-?\d+[,.]?\d*)\s*(NOK|kr)?$", re.IGNORECASE)
-    date_pattern = re.compile(r"(\d{1,2}[./]\d{1,2}[./]\d{2,4})")
-    pant_pattern = re.compile(r"PANT.*?(\d+)\s*[xX]\s*(\d+[,.]?\d*)", re.IGNORECASE)
-
     for i, raw_line in enumerate(lines):
         line = raw_line.strip()
         if not line:
             continue
 
-        # Check for merchant
-        for merchant in MERCHANTS:
-            if merchant.lower() in line.lower():
-                merchant_name = merchant
-                # Next non-empty line might be location
-                if i + 1 < len(lines) and lines[i + 1].strip():
-                    store_location = lines[i + 1].strip()
-                break
-
-        # Check for date
-        date_match = date_pattern.search(line)
-        if date_match:
-            purchase_date = parse_date(date_match.group(1))
-
-        # Check for payment method
-        if any(kw in line.upper() for kw in ["VISA", "MASTERCARD", "VIPPS", "KONTANT", "BETALT"]):
-            payment_method = line.strip()
-
-        # Check for item with price
-        price_match = price_pattern.search(line)
-        if price_match and "TOTAL" not in line.upper():
-            price = parse_price(price_match.group(1))
-            name = line[: price_match.start()].strip()
-
-            if name and price != Decimal("0"):
-                is_pant = "PANT" in name.upper()
-                is_discount = price < 0 or "RABATT" in name.upper()
-
-                # Parse pant quantity
-                quantity = Decimal("1")
-                pant_match = pant_pattern.search(line)
-                if pant_match:
-                    quantity = Decimal(pant_match.group(1))
-
-                canonical = None
-                if not is_pant and not is_discount:
-                    canonical = normalize_name(name)
-                items.append(
-                    ParsedItem(
-                        raw_name=name,
-                        canonical_name=canonical,
-                        quantity=quantity,
-                        unit=None,
-                        unit_price=abs(price) / quantity if quantity else None,
-                        total_price=abs(price),
-                        is_pant=is_pant,
-                        discount_amount=abs(price) if is_discount else Decimal("0"),
-                    )
-                )
+        classified = classify_line(line)
+
+        if classified.merchant:
+            merchant_name = classified.merchant
+            # Next non-empty line might be location
+            if i + 1 < len(lines) and lines[i + 1].strip():
+                store_location = lines[i + 1].strip()
+
+        if classified.date:
+            purchase_date = parse_date(classified.date)
+
+        if classified.is_payment:
+            payment_method = line
+
+        if classified.item:
+            items.append(classified.item)
 
     # Calculate total from items
     total = sum(
-        (item.total_price if not item.discount_amount else -item.discount_amount) for item in items
+        (
+            (item.total_price if not item.discount_amount else -item.discount_amount)
+            for item in items
+        ),
+        Decimal("0"),
     )
 
     return ParsedReceipt(
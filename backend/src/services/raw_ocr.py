@@ -0,0 +1,68 @@
+"""Compressed storage of raw OCR output, kept apart from the receipts table.
+
+Raw OCR responses are tens of KB per receipt but only needed for debugging and
+reprocessing, so they are stored as zlib-compressed JSON rather than in a column
+every receipt scan would read past. The OCR cache entry of a receipt's image is
+the only copy; receipts saved before that keep theirs in ``receipt_ocr``.
+"""
+
+import json
+import uuid
+import zlib
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import OCRCacheEntry, Receipt, ReceiptOCR
+
+ENCODING = "zlib+json"
+
+# zlib's default; higher levels save little on OCR JSON and cost much more CPU
+COMPRESSION_LEVEL = 6
+
+
+def compress_ocr(result: dict[str, Any]) -> tuple[bytes, int]:
+    """Serialize and compress an OCR result; returns the data and its raw size."""
+    raw = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode()
+    return zlib.compress(raw, COMPRESSION_LEVEL), len(raw)
+
+
+def compressed_ocr(result: dict[str, Any]) -> dict[str, Any]:
+    """The encoding, data and raw_size column values for an OCR result."""
+    data, raw_size = compress_ocr(result)
+    return {"encoding": ENCODING, "data": data, "raw_size": raw_size}
+
+
+def decompress_ocr_json(encoding: str, data: bytes) -> bytes:
+    """Return the stored OCR result as JSON bytes."""
+    if encoding != ENCODING:
+        raise ValueError(f"Unknown raw OCR encoding: {encoding}")
+    return zlib.decompress(data)
+
+
+def load_ocr_json(encoding: str, data: bytes) -> dict[str, Any]:
+    """Return the stored OCR result."""
+    result: dict[str, Any] = json.loads(decompress_ocr_json(encoding, data))
+    return result
+
+
+async def load_raw_ocr_json(db: AsyncSession, receipt_id: uuid.UUID) -> bytes | None:
+    """Fetch a receipt's raw OCR output as JSON bytes, or None if none was stored."""
+    # Newest engine version first, should an image have been read more than once
+    result = await db.execute(
+        select(OCRCacheEntry.encoding, OCRCacheEntry.data)
+        .join(Receipt, Receipt.image_sha256 == OCRCacheEntry.image_sha256)
+        .where(Receipt.id == receipt_id)
+        .order_by(OCRCacheEntry.created_at.desc())
+        .limit(1)
+    )
+    row = result.one_or_none()
+    if row is None:
+        result = await db.execute(
+            select(ReceiptOCR.encoding, ReceiptOCR.data).where(ReceiptOCR.receipt_id == receipt_id)
+        )
+        row = result.one_or_none()
+    if row is None:
+        return None
+    return decompress_ocr_json(row.encoding, row.data)
@@ -0,0 +1,282 @@
+"""Receipt ingestion pipeline: OCR result -> parsed receipt -> database rows."""
+
+import uuid
+from collections.abc import Collection, Sequence
+from typing import Any
+
+from sqlalchemy import Row, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.db.engine import async_session_factory
+from src.db.models import Item, OCRCacheEntry, Receipt
+from src.schemas.item import CategoryResponse, ItemResponse
+from src.schemas.receipt import ReceiptResponse
+from src.services.analytics_cache import mark_data_changed
+from src.services.catalog_cache import catalog_cache
+from src.services.categorizer import categorize_many
+from src.services.image_store import StoredImage
+from src.services.ocr import OCRService
+from src.services.parser import ParsedReceipt, parse_ocr_result
+from src.services.raw_ocr import compressed_ocr, load_ocr_json
+from src.services.spend_rollup import record_receipts
+
+
+async def load_category_map(db: AsyncSession) -> dict[str, CategoryResponse]:
+    """Map lowercase category names to categories, from the catalog cache."""
+    catalog = await catalog_cache.get(db)
+    return catalog.categories
+
+
+async def find_receipts_by_image(
+    db: AsyncSession, image_hashes: Collection[str]
+) -> dict[str, uuid.UUID]:
+    """Map image hashes to the earliest receipt already created from each image."""
+    if not image_hashes:
+        return {}
+
+    result = await db.execute(
+        select(Receipt.image_sha256, Receipt.id)
+        .where(Receipt.image_sha256.in_(image_hashes))
+        .order_by(Receipt.created_at)
+    )
+    found: dict[str, uuid.UUID] = {}
+    for row in result.all():
+        found.setdefault(row.image_sha256, row.id)
+    return found
+
+
+async def load_cached_ocr(
+    db: AsyncSession, ocr_service: OCRService, image_hashes: Collection[str]
+) -> dict[str, dict[str, Any]]:
+    """Fetch cached extract_text results for this OCR engine and version."""
+    if not image_hashes:
+        return {}
+
+    result = await db.execute(
+        select(OCRCacheEntry.image_sha256, OCRCacheEntry.encoding, OCRCacheEntry.data).where(
+            OCRCacheEntry.image_sha256.in_(image_hashes),
+            OCRCacheEntry.engine == ocr_service.engine,
+            OCRCacheEntry.engine_version == ocr_service.engine_version,
+        )
+    )
+    return {row.image_sha256: load_ocr_json(row.encoding, row.data) for row in result.all()}
+
+
+async def cache_ocr_results(
+    db: AsyncSession, ocr_service: OCRService, results: dict[str, dict[str, Any]]
+) -> None:
+    """
+    Store extract_text results compressed, keeping any entry another request wrote first.
+
+    This is the only copy of a new receipt's raw OCR output; it is found again
+    through the receipt's ``image_sha256``.
+    """
+    if not results:
+        return
+
+    stmt = (
+        insert(OCRCacheEntry)
+        .values(
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "image_sha256": image_sha256,
+                    "engine": ocr_service.engine,
+                    "engine_version": ocr_service.engine_version,
+                    **compressed_ocr(result),
+                }
+                for image_sha256, result in results.items()
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["image_sha256", "engine", "engine_version"])
+    )
+    await db.execute(stmt)
+
+
+ReceiptRows = tuple[dict[str, Any], list[dict[str, Any]]]
+
+# Item columns returned by the bulk insert, enough to build ItemResponse
+_ITEM_COLUMNS = [
+    Item.category_id,
+    *(getattr(Item, name) for name in ItemResponse.model_fields if name != "category"),
+]
+
+
+def build_receipt_rows(
+    parsed: ParsedReceipt,
+    image: StoredImage,
+    categories: dict[str, CategoryResponse],
+) -> ReceiptRows:
+    """Build insert values for a receipt and its categorized items."""
+    receipt = {
+        "id": uuid.uuid4(),
+        "merchant_name": parsed.merchant_name,
+        "store_location": parsed.store_location,
+        "purchase_date": parsed.purchase_date,
+        "total_amount": parsed.total_amount,
+        "currency": parsed.currency,
+        "payment_method": parsed.payment_method,
+        "image_path": str(image.path),
+        "image_sha256": image.sha256,
+        "thumbnail_path": str(image.thumbnail_path) if image.thumbnail_path else None,
+    }
+
+    items = []
+    category_names = categorize_many(item.raw_name for item in parsed.items)
+    for item_data, category_name in zip(parsed.items, category_names, strict=True):
+        category = categories.get(category_name.lower()) if category_name else None
+
+        items.append(
+            {
+                "id": uuid.uuid4(),
+                "receipt_id": receipt["id"],
+                "purchase_date": receipt["purchase_date"],
+                "raw_name": item_data.raw_name,
+                "canonical_name": item_data.canonical_name,
+                "quantity": item_data.quantity,
+                "unit": item_data.unit,
+                "unit_price": item_data.unit_price,
+                "total_price": item_data.total_price,
+                "category_id": category.id if category else None,
+                "is_pant": item_data.is_pant,
+                "discount_amount": item_data.discount_amount,
+            }
+        )
+
+    return receipt, items
+
+
+async def insert_receipts(
+    db: AsyncSession,
+    rows: list[ReceiptRows],
+    categories: dict[str, CategoryResponse],
+) -> list[ReceiptResponse]:
+    """
+    Insert receipts and their items with one multi-row INSERT ... RETURNING each.
+
+    Responses are built from the returned rows and the category map, so no
+    reload query is needed. Bypasses the ORM unit of work; the caller owns the
+    transaction.
+
+    A receipt whose image already has a receipt, committed by a concurrent
+    upload since the caller looked, is not inserted; its response is the
+    existing receipt instead, so compare response and row ids to spot it.
+    """
+    if not rows:
+        return []
+
+    receipt_result = await db.execute(
+        insert(Receipt)
+        .on_conflict_do_nothing(
+            index_elements=[Receipt.image_sha256],
+            index_where=Receipt.image_sha256.isnot(None),
+        )
+        .returning(Receipt.id, Receipt.created_at, Receipt.updated_at),
+        [receipt for receipt, _ in rows],
+    )
+    created = {row.id: row for row in receipt_result.all()}
+    inserted = [(receipt, items) for receipt, items in rows if receipt["id"] in created]
+    raced = await find_receipts_by_image(
+        db, [receipt["image_sha256"] for receipt, _ in rows if receipt["id"] not in created]
+    )
+
+    all_items = [item for _, items in inserted for item in items]
+    item_rows: Sequence[Row[Any]] = []
+    if all_items:
+        item_result = await db.execute(
+            insert(Item).returning(*_ITEM_COLUMNS, sort_by_parameter_order=True),
+            all_items,
+        )
+        item_rows = item_result.all()
+    await record_receipts(db, [receipt["id"] for receipt, _ in inserted])
+    await mark_data_changed(db, *(receipt.get("household_id") for receipt, _ in inserted))
+
+    categories_by_id = {c.id: c for c in categories.values()}
+    items_by_receipt: dict[uuid.UUID, list[ItemResponse]] = {}
+    for row in item_rows:
+        item = dict(row._mapping)
+        category = categories_by_id.get(item["category_id"])
+        items_by_receipt.setdefault(item["receipt_id"], []).append(
+            ItemResponse.model_validate({**item, "category": category})
+        )
+
+    responses = []
+    for receipt, _ in rows:
+        if receipt["id"] not in created:
+            existing = await load_receipt(db, raced[receipt["image_sha256"]])
+            responses.append(ReceiptResponse.model_validate(existing))
+            continue
+        responses.append(
+            ReceiptResponse.model_validate(
+                {
+                    **receipt,
+                    "created_at": created[receipt["id"]].created_at,
+                    "updated_at": created[receipt["id"]].updated_at,
+                    "items": items_by_receipt.get(receipt["id"], []),
+                }
+            )
+        )
+    return responses
+
+
+async def save_receipt(
+    db: AsyncSession,
+    parsed: ParsedReceipt,
+    image: StoredImage,
+) -> ReceiptResponse:
+    """
+    Insert a parsed receipt and its categorized items.
+
+    The transaction is left open; the caller commits.
+    """
+    categories = await load_category_map(db)
+    rows = build_receipt_rows(parsed, image, categories)
+    [receipt] = await insert_receipts(db, [rows], categories)
+    return receipt
+
+
+async def load_receipt(db: AsyncSession, receipt_id: uuid.UUID) -> Receipt:
+    """Load a receipt with its items and their categories."""
+    query = (
+        select(Receipt)
+        .options(selectinload(Receipt.items).selectinload(Item.category))
+        .where(Receipt.id == receipt_id)
+    )
+    result = await db.execute(query)
+    return result.scalar_one()
+
+
+async def process_receipt_image(image: StoredImage, ocr_service: OCRService) -> uuid.UUID:
+    """
+    Run OCR, parse and persist a stored receipt image.
+
+    Used by background workers, which have no request-scoped session. Images that
+    already have a receipt resolve to it without OCR, and cached OCR results are
+    reused. No connection is held while OCR runs. A newly stored image is removed
+    if OCR fails so abandoned uploads do not accumulate.
+    """
+    async with async_session_factory() as db:
+        existing = await find_receipts_by_image(db, [image.sha256])
+        if image.sha256 in existing:
+            return existing[image.sha256]
+        cached = await load_cached_ocr(db, ocr_service, [image.sha256])
+
+    ocr_result = cached.get(image.sha256)
+    is_fresh = ocr_result is None
+    if ocr_result is None:
+        try:
+            ocr_result = await ocr_service.extract_text(image.path)
+        except Exception:
+            image.discard()
+            raise
+
+    parsed = parse_ocr_result(ocr_result)
+
+    async with async_session_factory() as db:
+        if is_fresh:
+            await cache_ocr_results(db, ocr_service, {image.sha256: ocr_result})
+        receipt = await save_receipt(db, parsed, image)
+        await db.commit()
+        return receipt.id
@@ -0,0 +1,310 @@
+"""Receipt-to-inventory pipeline: receipt items -> matched ingredients -> inventory lots.
+
+Receipts are processed in batches. The distinct item names of a batch are
+resolved in one pass through the learned match memory in front of the cached
+ingredient catalog, package sizes are read from the item names ("TINE MELK 1L",
+"4X0.5L") and converted to canonical units, and the resulting lots, their "add"
+events and the item links are written with one multi-row statement each, in the
+caller's transaction.
+"""
+
+import re
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import InventoryEvent, InventoryLot, Item, Receipt
+from src.schemas.inventory import ReceiptInventoryResult
+from src.schemas.item import CategoryResponse
+from src.services.analytics_cache import mark_data_changed
+from src.services.catalog_cache import Catalog, catalog_cache
+from src.services.ingredient_matcher import MatchResult
+from src.services.match_memory import match_memory
+from src.services.unit_converter import UnitConverter
+
+# Package size in an item name, optionally a multipack: "500G", "1,5L", "4X0.5L", "6STK"
+SIZE_PATTERN = re.compile(
+    r"(?<![\w.,])(?:(\d+)\s*[xX]\s*)?(\d+(?:[.,]\d+)?)\s*(kg|hg|g|l|dl|cl|ml|stk|pk)\b",
+    re.IGNORECASE,
+)
+
+# Storage location by lowercase category name; anything else goes to the pantry
+LOCATION_BY_CATEGORY = {
+    "meieri": "fridge",
+    "kjøtt": "fridge",
+    "fisk": "fridge",
+    "frossen": "freezer",
+}
+
+UNIT_COST_STEP = Decimal("0.000001")  # Scale of inventory_lots.unit_cost
+
+
+@dataclass
+class PendingItem:
+    """Item columns the pipeline needs."""
+
+    id: uuid.UUID
+    receipt_id: uuid.UUID
+    raw_name: str
+    canonical_name: str | None
+    quantity: Decimal | None
+    unit: str | None
+    total_price: Decimal
+    discount_amount: Decimal
+    category_id: uuid.UUID | None
+    is_pant: bool
+    skip_inventory: bool
+    inventory_lot_id: uuid.UUID | None
+
+    @property
+    def match_name(self) -> str:
+        """Name matched against the ingredient catalog."""
+        return self.canonical_name or self.raw_name
+
+
+@dataclass
+class PendingReceipt:
+    """A receipt waiting to be turned into inventory."""
+
+    id: uuid.UUID
+    household_id: uuid.UUID
+    purchase_date: datetime
+    currency: str
+    items: list[PendingItem] = field(default_factory=list)
+
+
+@dataclass
+class InventoryRows:
+    """Insert and update values for one batch."""
+
+    lots: list[dict[str, Any]] = field(default_factory=list)
+    events: list[dict[str, Any]] = field(default_factory=list)
+    items: list[dict[str, Any]] = field(default_factory=list)  # Bulk UPDATE by primary key
+
+
+def extract_size(name: str) -> tuple[Decimal, str] | None:
+    """
+    Read the package size from an item name.
+
+    The last size in the name wins, since sizes are printed after the product
+    name. Multipacks multiply out: "4X0.5L" is 2 l.
+
+    Returns:
+        Quantity and unit as printed, or None if the name has no size.
+    """
+    matches = SIZE_PATTERN.findall(name)
+    if not matches:
+        return None
+    count, amount, unit = matches[-1]
+    size = Decimal(amount.replace(",", "."))
+    if count:
+        size *= Decimal(count)
+    if size <= 0:
+        return None
+    return size, unit.lower()
+
+
+def item_quantity(item: PendingItem, converter: UnitConverter) -> tuple[Decimal, str]:
+    """
+    Canonical quantity bought for one item line.
+
+    An explicit unit on the item (weighed goods) wins; otherwise the package
+    size in the name is multiplied by the number of packages; otherwise the
+    line counts as that many pieces.
+    """
+    count = item.quantity if item.quantity and item.quantity > 0 else Decimal("1")
+    if item.unit:
+        quantity, unit = converter.to_canonical(count, item.unit)
+        if converter.is_canonical(unit):
+            return quantity, unit
+
+    size = extract_size(item.raw_name)
+    if size:
+        quantity, unit = converter.to_canonical(*size)
+        return quantity * count, unit
+
+    return count, "pcs"
+
+
+def is_stock_item(item: PendingItem) -> bool:
+    """Whether an item line describes goods that go into inventory."""
+    return (
+        not item.is_pant
+        and not item.skip_inventory
+        and item.inventory_lot_id is None
+        and item.discount_amount == 0  # Discounts are separate lines
+        and item.total_price > 0
+    )
+
+
+def location_for(category: CategoryResponse | None) -> str:
+    """Default storage location for goods of a category."""
+    if category is None:
+        return "pantry"
+    return LOCATION_BY_CATEGORY.get(category.name.lower(), "pantry")
+
+
+def build_inventory_rows(
+    receipts: Sequence[PendingReceipt],
+    matches: dict[str, MatchResult | None],
+    catalog: Catalog,
+    converter: UnitConverter,
+) -> InventoryRows:
+    """Build lot, event and item update values for matched stock items."""
+    categories_by_id = {c.id: c for c in catalog.categories.values()}
+    rows = InventoryRows()
+
+    for receipt in receipts:
+        for item in receipt.items:
+            match = matches.get(item.match_name) if is_stock_item(item) else None
+            if match is None:
+                continue
+
+            ingredient = catalog.ingredients_by_id.get(match.ingredient_id)
+            category = ingredient.category if ingredient else None
+            if category is None and item.category_id:
+                category = categories_by_id.get(item.category_id)
+            quantity, unit = item_quantity(item, converter)
+            lot_id = uuid.uuid4()
+
+            rows.lots.append(
+                {
+                    "id": lot_id,
+                    "household_id": receipt.household_id,
+                    "ingredient_id": match.ingredient_id,
+                    "quantity": quantity,
+                    "unit": unit,
+                    "location": location_for(category),
+                    "purchase_date": receipt.purchase_date,
+                    # Per canonical unit, so usually a fraction of a cent per g or ml
+                    "unit_cost": (item.total_price / quantity).quantize(
+                        UNIT_COST_STEP, ROUND_HALF_UP
+                    ),
+                    "total_cost": item.total_price,
+                    "currency": receipt.currency,
+                    "confidence": match.confidence,
+                    "source_type": "receipt",
+                    "source_id": receipt.id,
+                }
+            )
+            rows.events.append(
+                {
+                    "id": uuid.uuid4(),
+                    "lot_id": lot_id,
+                    "event_type": "add",
+                    "quantity_delta": quantity,
+                    "unit": unit,
+                    "reason": "receipt",
+                }
+            )
+            rows.items.append(
+                {
+                    "id": item.id,
+                    "ingredient_id": match.ingredient_id,
+                    "ingredient_confidence": match.confidence,
+                    "inventory_lot_id": lot_id,
+                }
+            )
+
+    return rows
+
+
+async def load_pending_receipts(
+    db: AsyncSession,
+    household_id: uuid.UUID,
+    receipt_ids: Sequence[uuid.UUID] | None = None,
+    limit: int | None = None,
+) -> list[PendingReceipt]:
+    """
+    Lock a household's pending receipts and load their items.
+
+    Rows are locked with FOR UPDATE SKIP LOCKED, so concurrent runs over the same
+    backlog split it instead of creating duplicate lots.
+    """
+    query = (
+        select(Receipt.id, Receipt.household_id, Receipt.purchase_date, Receipt.currency)
+        .where(Receipt.household_id == household_id, Receipt.inventory_status == "pending")
+        .order_by(Receipt.purchase_date, Receipt.id)
+        .with_for_update(skip_locked=True)
+    )
+    if receipt_ids is not None:
+        query = query.where(Receipt.id.in_(receipt_ids))
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
+    receipts = {row.id: PendingReceipt(**row._mapping) for row in result.all()}
+    if not receipts:
+        return []
+
+    item_result = await db.execute(
+        select(*(getattr(Item, name) for name in PendingItem.__dataclass_fields__))
+        .where(Item.receipt_id.in_(receipts))
+        .order_by(Item.receipt_id, Item.id)
+    )
+    for row in item_result.all():
+        receipts[row.receipt_id].items.append(PendingItem(**row._mapping))
+
+    return list(receipts.values())
+
+
+async def write_inventory_rows(
+    db: AsyncSession, receipt_ids: Sequence[uuid.UUID], rows: InventoryRows
+) -> None:
+    """Insert lots and events, link items and mark the receipts reviewed."""
+    if rows.lots:
+        await db.execute(insert(InventoryLot), rows.lots)
+        await db.execute(insert(InventoryEvent), rows.events)
+        await db.execute(update(Item), rows.items)
+    await db.execute(
+        update(Receipt)
+        .where(Receipt.id.in_(receipt_ids))
+        .values(inventory_status="reviewed")
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def ingest_receipts(
+    db: AsyncSession,
+    household_id: uuid.UUID,
+    receipt_ids: Sequence[uuid.UUID] | None = None,
+    limit: int | None = None,
+) -> ReceiptInventoryResult:
+    """
+    Turn a household's pending receipts into inventory lots.
+
+    Args:
+        db: Session; the transaction is left open for the caller to commit.
+        household_id: Household that owns the receipts and the new lots.
+        receipt_ids: Only process these receipts; all pending ones if None.
+        limit: Process at most this many receipts, oldest first.
+
+    Returns:
+        Counts of processed receipts, items and created lots.
+    """
+    receipts = await load_pending_receipts(db, household_id, receipt_ids, limit)
+    if not receipts:
+        return ReceiptInventoryResult(receipts=0, items=0, lots_created=0, unmatched_items=0)
+
+    catalog = await catalog_cache.get(db)
+    stock_items = [item for receipt in receipts for item in receipt.items if is_stock_item(item)]
+    matches = await match_memory.match_many(
+        db, (item.match_name for item in stock_items), catalog, household_id
+    )
+    rows = build_inventory_rows(receipts, matches, catalog, UnitConverter())
+    await write_inventory_rows(db, [r.id for r in receipts], rows)
+    if rows.lots:
+        await mark_data_changed(db, household_id)
+
+    return ReceiptInventoryResult(
+        receipts=len(receipts),
+        items=sum(len(r.items) for r in receipts),
+        lots_created=len(rows.lots),
+        unmatched_items=len(stock_items) - len(rows.lots),
+    )
@@ -0,0 +1,126 @@
+"""In-process job queue for asynchronous receipt OCR processing."""
+
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from src.config import settings
+from src.services.image_store import StoredImage
+from src.services.ocr import OCRService
+from src.services.receipt_ingestion import process_receipt_image
+
+logger = logging.getLogger(__name__)
+
+ReceiptProcessor = Callable[[StoredImage, OCRService], Awaitable[uuid.UUID]]
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another pending job."""
+
+
+@dataclass
+class ReceiptJob:
+    """State of a queued receipt processing job."""
+
+    id: uuid.UUID
+    image: StoredImage
+    ocr_service: OCRService
+    status: str = "queued"  # queued|processing|completed|failed
+    receipt_id: uuid.UUID | None = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+
+
+class ReceiptJobQueue:
+    """
+    Bounded worker pool that processes stored receipt images off the request path.
+
+    Job state is kept in memory and is local to the worker process; finished jobs
+    are evicted oldest-first once more than ``max_finished`` have accumulated.
+    """
+
+    def __init__(
+        self,
+        processor: ReceiptProcessor,
+        workers: int = 2,
+        max_pending: int = 100,
+        max_finished: int = 1000,
+    ) -> None:
+        self.processor = processor
+        self.workers = workers
+        self.max_finished = max_finished
+        self._queue: asyncio.Queue[ReceiptJob] = asyncio.Queue(maxsize=max_pending)
+        self._jobs: OrderedDict[uuid.UUID, ReceiptJob] = OrderedDict()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def submit(self, image: StoredImage, ocr_service: OCRService) -> ReceiptJob:
+        """
+        Queue a stored image for processing.
+
+        Raises:
+            QueueFullError: If ``max_pending`` jobs are already waiting.
+        """
+        self._ensure_started()
+        job = ReceiptJob(id=uuid.uuid4(), image=image, ocr_service=ocr_service)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull as e:
+            raise QueueFullError("Receipt processing queue is full") from e
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: uuid.UUID) -> ReceiptJob | None:
+        """Look up a job by ID."""
+        return self._jobs.get(job_id)
+
+    async def join(self) -> None:
+        """Wait until every queued job has finished."""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+    def _ensure_started(self) -> None:
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "processing"
+            try:
+                job.receipt_id = await self.processor(job.image, job.ocr_service)
+                job.status = "completed"
+            except Exception as e:
+                logger.exception("Receipt job %s failed", job.id)
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.now()
+                self._queue.task_done()
+                self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+receipt_job_queue = ReceiptJobQueue(
+    processor=process_receipt_image,
+    workers=settings.ocr_workers,
+    max_pending=settings.ocr_queue_size,
+)
@@ -1,46 +1,81 @@
-"""Restock predictor service."""
+"""Restock predictor service.
 
+Usage rates are exponentially weighted averages of daily consumption over a
+lookback window, so recent use counts more than use weeks ago. They are
+computed with NumPy for every ingredient of any number of households at once:
+consume events are fetched as flat arrays of group, age and quantity, and the
+per-ingredient sums are ``np.bincount`` over the group index.
+"""
+
+import uuid
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Any
 
+import numpy as np
+from numpy.typing import NDArray
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.db.models import Ingredient, InventoryEvent, InventoryLot
+from src.schemas.analytics import RestockPrediction
+
+MIN_WINDOW_DAYS = 7.0  # Usage seen on fewer days is spread over a week
+US_PER_DAY = 86_400_000_000
+
 
 class RestockPredictor:
     """Predict ingredient restock needs."""
 
-    def calculate_average_daily_usage(self, consumption_events: list[dict[str, Any]]) -> Decimal:
-        """Calculate average daily usage from consumption events.
+    def __init__(
+        self,
+        lookback_days: int = 30,
+        half_life_days: float = 7.0,
+        restock_buffer_days: int = 3,
+    ) -> None:
+        self.lookback_days = lookback_days
+        self.half_life_days = half_life_days
+        self.restock_buffer_days = restock_buffer_days
+
+    def daily_usage(
+        self,
+        groups: NDArray[np.intp],
+        ages_days: NDArray[np.float64],
+        consumed: NDArray[np.float64],
+        group_count: int,
+    ) -> NDArray[np.float64]:
+        """Exponentially weighted average daily usage of each group.
+
+        An event ``age`` days old weighs ``0.5 ** (age / half_life_days)``.
+        The weighted consumption is divided by the weight of the days it was
+        observed over: from the group's oldest event in the lookback window
+        (at least ``MIN_WINDOW_DAYS``) until now. Steady use of ``u`` a day
+        gives ``u`` whatever the half-life.
 
         Args:
-            consumption_events: List of events with quantity_delta and created_at
+            groups: Group index of each event, in ``range(group_count)``
+            ages_days: Age of each event in days
+            consumed: Quantity each event consumed (positive)
+            group_count: Number of groups
 
         Returns:
-            Average daily consumption (positive value)
+            Daily usage per group; 0 for groups without events
         """
-        if not consumption_events:
-            return Decimal("0")
-
-        # Sum total consumption (negative deltas)
-        total_consumed = sum(
-            abs(Decimal(str(e["quantity_delta"])))
-            for e in consumption_events
-            if Decimal(str(e["quantity_delta"])) < 0
-        )
-
-        if total_consumed == Decimal("0"):
-            return Decimal("0")
-
-        # Calculate time span
-        dates = [e["created_at"] for e in consumption_events]
-        if len(dates) == 1:
-            # Single event, assume 7 day period
-            days = 7
-        else:
-            min_date = min(dates)
-            max_date = max(dates)
-            days = max((max_date - min_date).days, 1)
-
-        return total_consumed / Decimal(str(days))
+        in_window = ages_days <= self.lookback_days
+        groups, ages_days, consumed = groups[in_window], ages_days[in_window], consumed[in_window]
+
+        weights = np.exp2(-ages_days / self.half_life_days)
+        weighted = np.bincount(groups, weights=consumed * weights, minlength=group_count)
+        oldest = np.zeros(group_count)
+        np.maximum.at(oldest, groups, ages_days)
+        window = np.clip(oldest, MIN_WINDOW_DAYS, self.lookback_days)
+        # Integral of the weights over the window
+        decay = np.log(2) / self.half_life_days
+        exposure = -np.expm1(-window * decay) / decay
+        usage: NDArray[np.float64] = weighted / exposure
+        return usage
 
     def predict_runout(
         self,
@@ -83,3 +118,113 @@ class RestockPredictor:
             "predicted_runout_date": runout_date,
             "recommended_restock_date": restock_date,
         }
+
+    async def predict(
+        self,
+        db: AsyncSession,
+        household_ids: Sequence[uuid.UUID] | None,
+        now: datetime,
+    ) -> dict[uuid.UUID, list[RestockPrediction]]:
+        """Predict restocks for every ingredient in stock, in one batch.
+
+        Args:
+            db: Database session
+            household_ids: Households to predict for; None for all
+            now: Moment to predict from
+
+        Returns:
+            Predictions per household with stock, soonest runout first
+        """
+        stock_query = (
+            select(
+                InventoryLot.household_id,
+                InventoryLot.ingredient_id,
+                Ingredient.name,
+                func.sum(InventoryLot.quantity).label("total_quantity"),
+                InventoryLot.unit,
+            )
+            .join(Ingredient, InventoryLot.ingredient_id == Ingredient.id)
+            .where(InventoryLot.quantity > 0)
+            .group_by(
+                InventoryLot.household_id,
+                InventoryLot.ingredient_id,
+                Ingredient.name,
+                InventoryLot.unit,
+            )
+        )
+        if household_ids is not None:
+            stock_query = stock_query.where(InventoryLot.household_id.in_(household_ids))
+        stock = (await db.execute(stock_query)).all()
+        if not stock:
+            return {}
+
+        # Usage is per household and ingredient, across units
+        group_of: dict[tuple[uuid.UUID, uuid.UUID], int] = {}
+        for row in stock:
+            group_of.setdefault((row.household_id, row.ingredient_id), len(group_of))
+
+        events_query = (
+            select(
+                InventoryLot.household_id,
+                InventoryLot.ingredient_id,
+                InventoryEvent.created_at,
+                cast(-InventoryEvent.quantity_delta, Float).label("consumed"),
+            )
+            .join(InventoryLot, InventoryEvent.lot_id == InventoryLot.id)
+            .where(
+                InventoryEvent.event_type == "consume",
+                InventoryEvent.quantity_delta < 0,
+                InventoryEvent.created_at >= now - timedelta(days=self.lookback_days),
+            )
+        )
+        if household_ids is not None:
+            events_query = events_query.where(InventoryLot.household_id.in_(household_ids))
+        events = (await db.execute(events_query)).all()
+
+        groups = np.fromiter(
+            (group_of.get((e.household_id, e.ingredient_id), -1) for e in events),
+            dtype=np.intp,
+            count=len(events),
+        )
+        created = np.array([e.created_at for e in events], dtype="datetime64[us]")
+        ages_us = np.datetime64(now, "us").astype(np.int64) - created.astype(np.int64)
+        ages_days = ages_us / US_PER_DAY
+        consumed = np.fromiter((e.consumed for e in events), dtype=np.float64, count=len(events))
+        in_stock = groups >= 0
+        usage = self.daily_usage(
+            groups[in_stock], ages_days[in_stock], consumed[in_stock], len(group_of)
+        )
+
+        predictions: dict[uuid.UUID, list[RestockPrediction]] = {}
+        for row in stock:
+            rate = usage[group_of[(row.household_id, row.ingredient_id)]]
+            quantity = Decimal(str(row.total_quantity))
+            runout = self.predict_runout(
+                current_quantity=quantity,
+                average_daily_usage=Decimal(repr(float(rate))),
+                from_date=now,
+                restock_buffer_days=self.restock_buffer_days,
+            )
+            predictions.setdefault(row.household_id, []).append(
+                RestockPrediction(
+                    ingredient_id=row.ingredient_id,
+                    ingredient_name=row.name,
+                    current_quantity=quantity,
+                    unit=row.unit,
+                    average_daily_usage=Decimal(f"{rate:.3f}"),
+                    **runout,
+                )
+            )
+
+        for household_predictions in predictions.values():
+            # Soonest first, None at end
+            household_predictions.sort(
+                key=lambda p: (p.days_until_empty is None, p.days_until_empty or 0)
+            )
+        return predictions
+
+
+restock_predictor = RestockPredictor(
+    lookback_days=settings.restock_lookback_days,
+    half_life_days=settings.restock_usage_half_life_days,
+)
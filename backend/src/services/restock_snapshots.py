@@ -0,0 +1,201 @@
+"""Precomputed restock predictions, one snapshot row per household.
+
+Predictions depend on every consume event in the lookback window, so they are
+computed off the request path and stored in ``restock_snapshots``; reading
+them is a primary key lookup. RestockSnapshotRefresher recomputes every
+household in one batch each ``restock_refresh_interval_seconds``, and single
+households on request, e.g. after cooking consumed a batch of lots.
+
+The refresher runs in each API process, so with several workers each one
+recomputes all snapshots every interval; the upserts are idempotent.
+"""
+
+import asyncio
+import contextlib
+import logging
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.db.engine import async_session_factory
+from src.db.models import Household, RestockSnapshot
+from src.schemas.analytics import RestockPredictionsResponse
+from src.services.restock_predictor import RestockPredictor, restock_predictor
+
+logger = logging.getLogger(__name__)
+
+UPSERT_CHUNK_SIZE = 1000  # Snapshot rows per INSERT, well under the bind parameter limit
+
+
+async def load_snapshot(
+    db: AsyncSession, household_id: uuid.UUID
+) -> RestockPredictionsResponse | None:
+    """Read a household's latest snapshot; None if none was computed yet."""
+    result = await db.execute(
+        select(RestockSnapshot).where(RestockSnapshot.household_id == household_id)
+    )
+    snapshot = result.scalar_one_or_none()
+    if snapshot is None:
+        return None
+    return RestockPredictionsResponse(
+        predictions=snapshot.predictions,
+        household_id=household_id,
+        generated_at=snapshot.generated_at,
+    )
+
+
+async def store_snapshots(
+    db: AsyncSession,
+    predictor: RestockPredictor,
+    household_ids: Sequence[uuid.UUID] | None,
+    now: datetime,
+) -> dict[uuid.UUID, RestockPredictionsResponse]:
+    """
+    Compute and upsert snapshots in the caller's transaction.
+
+    Args:
+        db: Database session
+        predictor: Predictor to compute with
+        household_ids: Households to refresh; None for all
+        now: Moment to predict from
+
+    Returns:
+        The stored snapshots; households without stock get empty ones.
+    """
+    predictions = await predictor.predict(db, household_ids, now)
+    if household_ids is None:
+        household_ids = (await db.execute(select(Household.id))).scalars().all()
+
+    snapshots = {
+        household_id: RestockPredictionsResponse(
+            predictions=predictions.get(household_id, []),
+            household_id=household_id,
+            generated_at=now,
+        )
+        for household_id in household_ids
+    }
+    rows = [
+        {
+            "household_id": snapshot.household_id,
+            "predictions": snapshot.model_dump(mode="json")["predictions"],
+            "generated_at": now,
+        }
+        for snapshot in snapshots.values()
+    ]
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = insert(RestockSnapshot).values(rows[start : start + UPSERT_CHUNK_SIZE])
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[RestockSnapshot.household_id],
+                set_={
+                    "predictions": stmt.excluded.predictions,
+                    "generated_at": stmt.excluded.generated_at,
+                },
+            )
+        )
+    return snapshots
+
+
+class RestockSnapshotRefresher:
+    """Background task keeping restock snapshots fresh."""
+
+    def __init__(
+        self,
+        predictor: RestockPredictor,
+        interval_seconds: float = 3600,
+        session_factory: async_sessionmaker[AsyncSession] = async_session_factory,
+    ) -> None:
+        self.predictor = predictor
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self._pending: set[uuid.UUID] = set()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the refresher task of this process is in flight."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Run the refresher in the background, starting with a full refresh."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the refresher task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def request(self, household_id: uuid.UUID) -> None:
+        """Refresh a household's snapshot soon; call after its writes are committed."""
+        self._pending.add(household_id)
+        self._wake.set()
+        self.start()
+
+    def request_after_commit(self, db: AsyncSession, household_id: uuid.UUID) -> None:
+        """
+        Refresh a household's snapshot once the caller's transaction commits.
+
+        The refresher reads on a session of its own, so it must not run before
+        the writes it should see are committed; nothing is requested on rollback.
+        """
+
+        def after_commit(_session: Session) -> None:
+            self.request(household_id)
+
+        event.listen(db.sync_session, "after_commit", after_commit, once=True)
+
+    async def refresh(self, household_ids: Sequence[uuid.UUID] | None = None) -> int:
+        """
+        Recompute and commit snapshots.
+
+        Args:
+            household_ids: Households to refresh; None for all
+
+        Returns:
+            Number of snapshots stored.
+        """
+        async with self.session_factory() as db:
+            snapshots = await store_snapshots(db, self.predictor, household_ids, datetime.now())
+            await db.commit()
+        return len(snapshots)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_full = loop.time()
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), max(0.0, next_full - loop.time()))
+            self._wake.clear()
+
+            household_ids: list[uuid.UUID] | None
+            if loop.time() >= next_full:
+                household_ids = None  # Covers anything pending too
+                next_full = loop.time() + self.interval_seconds
+            elif self._pending:
+                household_ids = list(self._pending)
+            else:
+                continue
+            self._pending.clear()
+
+            try:
+                count = await self.refresh(household_ids)
+                logger.info("Refreshed %d restock snapshots", count)
+            except Exception:
+                logger.exception("Restock snapshot refresh failed")
+
+
+restock_refresher = RestockSnapshotRefresher(
+    predictor=restock_predictor,
+    interval_seconds=settings.restock_refresh_interval_seconds,
+)
@@ -0,0 +1,261 @@
+"""Daily spend rollup behind the spending analytics.
+
+``daily_spend`` holds receipt and item counts and totals per household, day,
+merchant and category. It is kept in step with ``receipts`` in the writing
+transaction: new receipts are added with one INSERT ... ON CONFLICT DO UPDATE
+computed from the stored rows, and deleted or moved receipts are subtracted the
+same way before the change and pruned after it.
+
+Analytics read whole days from the rollup. A range that starts or ends mid-day
+adds the partial days at its edges computed from the receipts themselves, so
+results match a scan of the raw tables for any range.
+"""
+
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    DateTime,
+    Select,
+    SQLColumnExpression,
+    Subquery,
+    and_,
+    cast,
+    delete,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import UUID, Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import DailySpend, Item, Receipt
+
+KEY_COLUMNS = ("household_id", "day", "merchant", "category_id")
+MEASURE_COLUMNS = ("receipt_count", "receipt_total", "item_count", "item_total")
+PURCHASE_COLUMNS = ("first_purchase_at", "last_purchase_at")
+COLUMNS = KEY_COLUMNS + MEASURE_COLUMNS + PURCHASE_COLUMNS
+
+SpendKey = tuple[uuid.UUID | None, Any, str]  # Household, day, merchant
+
+
+def merchant_key(merchant_name: SQLColumnExpression[str]) -> ColumnElement[str]:
+    """Merchant as grouped by the analytics: trimmed and uppercased."""
+    return func.upper(func.trim(merchant_name))
+
+
+def spend_source(*criteria: ColumnElement[bool]) -> Select[Any]:
+    """
+    Rollup rows computed from the receipts matching ``criteria``.
+
+    One row per key, in the column order of ``COLUMNS``.
+    """
+    day = cast(Receipt.purchase_date, Date)
+    merchant = merchant_key(Receipt.merchant_name)
+    receipts = select(
+        Receipt.household_id,
+        day.label("day"),
+        merchant.label("merchant"),
+        cast(null(), UUID(as_uuid=True)).label("category_id"),
+        literal(1).label("receipt_count"),
+        Receipt.total_amount.label("receipt_total"),
+        literal(0).label("item_count"),
+        literal(0).label("item_total"),
+        Receipt.purchase_date.label("first_purchase_at"),
+        Receipt.purchase_date.label("last_purchase_at"),
+    ).where(*criteria)
+    items = (
+        select(
+            Receipt.household_id,
+            day,
+            merchant,
+            Item.category_id,
+            literal(0),
+            literal(0),
+            literal(1),
+            Item.total_price,
+            cast(null(), DateTime),
+            cast(null(), DateTime),
+        )
+        .join(Receipt, Item.receipt_id == Receipt.id)
+        .where(*criteria)
+    )
+    facts = union_all(receipts, items).subquery("facts")
+    keys = [facts.c[name] for name in KEY_COLUMNS]
+    return select(
+        *keys,
+        *(func.sum(facts.c[name]).label(name) for name in MEASURE_COLUMNS),
+        func.min(facts.c.first_purchase_at).label("first_purchase_at"),
+        func.max(facts.c.last_purchase_at).label("last_purchase_at"),
+    ).group_by(*keys)
+
+
+def _upsert(source: Select[Any], sign: int) -> Insert:
+    """Add (sign 1) or subtract (sign -1) source rows to the rollup."""
+    rows = source.subquery("source")
+    keys = [rows.c[name] for name in KEY_COLUMNS]
+    values = select(
+        func.gen_random_uuid(),
+        *keys,
+        *(rows.c[name] * sign for name in MEASURE_COLUMNS),
+        *(rows.c[name] for name in PURCHASE_COLUMNS),
+    ).order_by(*keys)  # Rows are locked in key order, so concurrent writers don't deadlock
+    stmt = insert(DailySpend).from_select(["id", *COLUMNS], values)
+    table = DailySpend.__table__.c
+    set_: dict[str, Any] = {name: table[name] + stmt.excluded[name] for name in MEASURE_COLUMNS}
+    if sign > 0:
+        set_["first_purchase_at"] = func.least(
+            table.first_purchase_at, stmt.excluded.first_purchase_at
+        )
+        set_["last_purchase_at"] = func.greatest(
+            table.last_purchase_at, stmt.excluded.last_purchase_at
+        )
+    return stmt.on_conflict_do_update(
+        index_elements=[table[name] for name in KEY_COLUMNS], set_=set_
+    )
+
+
+async def record_receipts(db: AsyncSession, receipt_ids: Sequence[uuid.UUID]) -> None:
+    """Add stored receipts and their items to the rollup."""
+    if receipt_ids:
+        await db.execute(_upsert(spend_source(Receipt.id.in_(receipt_ids)), 1))
+
+
+async def retract_receipts(db: AsyncSession, receipt_ids: Sequence[uuid.UUID]) -> list[SpendKey]:
+    """
+    Subtract receipts from the rollup before they are deleted or moved.
+
+    Returns:
+        The affected keys, to pass to ``prune_rollup`` once the change is flushed.
+    """
+    if not receipt_ids:
+        return []
+    result = await db.execute(
+        select(
+            Receipt.household_id,
+            cast(Receipt.purchase_date, Date),
+            merchant_key(Receipt.merchant_name),
+        )
+        .where(Receipt.id.in_(receipt_ids))
+        .distinct()
+    )
+    keys: list[SpendKey] = [(household, day, merchant) for household, day, merchant in result.all()]
+    await db.execute(_upsert(spend_source(Receipt.id.in_(receipt_ids)), -1))
+    return keys
+
+
+async def prune_rollup(db: AsyncSession, keys: Sequence[SpendKey]) -> None:
+    """Drop emptied rows and recompute purchase times of the given keys."""
+    if not keys:
+        return
+    matches_key = or_(
+        *(
+            and_(
+                DailySpend.household_id.is_not_distinct_from(household_id),
+                DailySpend.day == day,
+                DailySpend.merchant == merchant,
+            )
+            for household_id, day, merchant in keys
+        )
+    )
+    await db.execute(
+        delete(DailySpend)
+        .where(matches_key, DailySpend.receipt_count <= 0, DailySpend.item_count <= 0)
+        .execution_options(synchronize_session=False)
+    )
+
+    same_key = and_(
+        Receipt.household_id.is_not_distinct_from(DailySpend.household_id),
+        Receipt.purchase_date >= DailySpend.day,
+        Receipt.purchase_date < DailySpend.day + timedelta(days=1),
+        merchant_key(Receipt.merchant_name) == DailySpend.merchant,
+    )
+    await db.execute(
+        update(DailySpend)
+        .where(matches_key, DailySpend.category_id.is_(None))
+        .values(
+            first_purchase_at=select(func.min(Receipt.purchase_date))
+            .where(same_key)
+            .scalar_subquery(),
+            last_purchase_at=select(func.max(Receipt.purchase_date))
+            .where(same_key)
+            .scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rebuild_rollup(db: AsyncSession, household_id: uuid.UUID) -> None:
+    """Recompute a household's rollup rows, after bulk changes to its receipts."""
+    await db.execute(
+        delete(DailySpend)
+        .where(DailySpend.household_id == household_id)
+        .execution_options(synchronize_session=False)
+    )
+    rows = spend_source(Receipt.household_id == household_id).subquery("source")
+    await db.execute(
+        insert(DailySpend).from_select(
+            ["id", *COLUMNS], select(func.gen_random_uuid(), *(rows.c[name] for name in COLUMNS))
+        )
+    )
+
+
+def spend_facts(
+    start: datetime | None, end: datetime | None, household_id: uuid.UUID | None = None
+) -> Subquery:
+    """
+    Rollup rows for purchases in [start, end], as a subquery with ``COLUMNS``.
+
+    Whole days come from the rollup; partial days at the edges of the range are
+    computed from the receipts. ``household_id`` None means all receipts.
+    """
+    first_day = None
+    if start is not None:
+        first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    last_day = None
+    if end is not None:
+        last_day = end.date() if end.time() == time.max else end.date() - timedelta(days=1)
+
+    receipt_filter = [] if household_id is None else [Receipt.household_id == household_id]
+    if first_day is not None and last_day is not None and first_day > last_day:
+        # Shorter than a whole day
+        return spend_source(
+            *receipt_filter, Receipt.purchase_date >= start, Receipt.purchase_date <= end
+        ).subquery("spend")
+
+    rollup = select(*(DailySpend.__table__.c[name] for name in COLUMNS))
+    if household_id is not None:
+        rollup = rollup.where(DailySpend.household_id == household_id)
+    if first_day is not None:
+        rollup = rollup.where(DailySpend.day >= first_day)
+    if last_day is not None:
+        rollup = rollup.where(DailySpend.day <= last_day)
+
+    parts = [rollup]
+    if start is not None and start.time() != time.min:
+        next_midnight = datetime.combine(start.date() + timedelta(days=1), time.min)
+        parts.append(
+            spend_source(
+                *receipt_filter,
+                Receipt.purchase_date >= start,
+                Receipt.purchase_date < next_midnight,
+            )
+        )
+    if end is not None and end.time() != time.max:
+        midnight = datetime.combine(end.date(), time.min)
+        parts.append(
+            spend_source(
+                *receipt_filter, Receipt.purchase_date >= midnight, Receipt.purchase_date <= end
+            )
+        )
+    if len(parts) == 1:
+        return rollup.subquery("spend")
+    return union_all(*parts).subquery("spend")
@@ -1,27 +1,79 @@
+from functools import cache
 from pathlib import Path
 from typing import Any
 
+from src.services.bounded_executor import default_is_retryable
 from src.services.ocr import OCRService
+from src.services.ocr_executor import OCRExecutor, ocr_executor
+
+# Textract error codes worth retrying; anything else (bad image, auth) fails immediately
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "InternalServerError",
+}
+
+
+def is_retryable_textract_error(error: BaseException) -> bool:
+    """Retry timeouts, connection errors and Textract throttling or server errors."""
+    if default_is_retryable(error):
+        return True
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in RETRYABLE_ERROR_CODES
+
+
+@cache
+def process_client() -> object:
+    """The Textract client of this process, created on first use."""
+    # Lazy import to avoid dependency when using mock
+    try:
+        import boto3
+
+        return boto3.client("textract")
+    except ImportError:
+        raise ImportError("boto3 is required for Textract. Install with: uv add boto3")
 
 
 class TextractOCRService(OCRService):
-    """AWS Textract OCR service implementation."""
+    """
+    AWS Textract OCR service implementation.
 
-    def __init__(self):
-        # Lazy import to avoid dependency when using mock
-        try:
-            import boto3
+    The boto3 client is synchronous, so file reads and API calls run in the OCR
+    executor instead of on the event loop. Services without an injected client
+    share one per process; process pool workers keep theirs between calls.
+    """
 
-            self.client = boto3.client("textract")
-        except ImportError:
-            raise ImportError("boto3 is required for Textract. Install with: uv add boto3")
+    engine = "textract"
+    engine_version = "detect_document_text-1"
+
+    def __init__(self, client: object | None = None, executor: OCRExecutor | None = None):
+        self._client = client if client is not None else process_client()
+        self.executor = executor or ocr_executor
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Drop the client and executor, which can't be pickled for a process pool."""
+        return {}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore in a process pool worker, which uses its process client."""
+        self._client = None
+        self.executor = ocr_executor
 
     async def extract_text(self, image_path: Path) -> dict[str, Any]:
         """Extract text using AWS Textract."""
+        return await self.executor.run(
+            self._detect_text, image_path, is_retryable=is_retryable_textract_error
+        )
+
+    def _detect_text(self, image_path: Path) -> dict[str, Any]:
+        """Blocking Textract call; runs in an executor worker."""
+        # Each call unpickles a fresh copy in a process pool worker
+        client: Any = self._client if self._client is not None else process_client()
+
         with open(image_path, "rb") as f:
             image_bytes = f.read()
 
-        response = self.client.detect_document_text(Document={"Bytes": image_bytes})
+        response = client.detect_document_text(Document={"Bytes": image_bytes})
 
         lines = []
         blocks = []
@@ -1,7 +1,40 @@
 # backend/tests/conftest.py
-"""Pytest configuration and fixtures."""
+"""Pytest configuration, fixtures and shared test helpers."""
+
+import uuid
+from datetime import datetime
 
 import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.schemas.item import CategoryResponse
+from src.services.catalog_cache import CachedIngredient
+
+
+def compiled(stmt, literal_binds=False):
+    """Render a statement as PostgreSQL SQL, optionally with values inlined."""
+    compile_kwargs = {"literal_binds": True} if literal_binds else {}
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs=compile_kwargs))
+
+
+def cached_ingredient(
+    name,
+    aliases=(),
+    category: CategoryResponse | None = None,
+    category_id: uuid.UUID | None = None,
+):
+    """Catalog ingredient snapshot, as the catalog cache holds them."""
+    return CachedIngredient(
+        id=uuid.uuid4(),
+        name=name,
+        canonical_name=name.lower(),
+        default_unit="g",
+        aliases=list(aliases),
+        normalized_aliases=tuple(a.lower() for a in aliases),
+        category_id=category.id if category else category_id,
+        category=category,
+        created_at=datetime(2025, 1, 1),
+    )
 
 
 @pytest.fixture
@@ -0,0 +1,248 @@
+"""Tests for the per-household analytics response cache."""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_analytics_cache, get_db
+from src.main import app
+from src.services.analytics_cache import (
+    AnalyticsCache,
+    DatabaseCacheBackend,
+    MemoryCacheBackend,
+    cache_key,
+    etag_matches,
+    mark_all_data_changed,
+    mark_data_changed,
+)
+from tests.conftest import compiled
+
+HOUSEHOLD = uuid.uuid4()
+
+
+class TestCacheKey:
+    def test_independent_of_parameter_order(self):
+        first = cache_key("all", "/api/analytics/summary", {"start_date": 1, "end_date": 2})
+        second = cache_key("all", "/api/analytics/summary", {"end_date": 2, "start_date": 1})
+
+        assert first == second
+
+    def test_differs_by_scope_and_params(self):
+        params = {"start_date": datetime(2026, 1, 1)}
+        key = cache_key("all", "/api/analytics/summary", params)
+
+        assert key != cache_key(str(HOUSEHOLD), "/api/analytics/summary", params)
+        assert key != cache_key("all", "/api/analytics/summary", {"start_date": None})
+
+
+class TestEtagMatches:
+    @pytest.mark.parametrize("header", ['"abc-3"', 'W/"abc-3"', '"xyz-1", "abc-3"', "*"])
+    def test_matches(self, header):
+        assert etag_matches(header, '"abc-3"')
+
+    @pytest.mark.parametrize("header", [None, "", '"abc-2"'])
+    def test_no_match(self, header):
+        assert not etag_matches(header, '"abc-3"')
+
+
+class TestMemoryCacheBackend:
+    @pytest.mark.asyncio
+    async def test_serves_only_the_stored_version(self):
+        backend = MemoryCacheBackend()
+        await backend.put(None, "key", 3, b"{}")
+
+        assert await backend.get(None, "key", 3) == b"{}"
+        assert await backend.get(None, "key", 4) is None
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        backend = MemoryCacheBackend(capacity=2)
+        await backend.put(None, "a", 1, b"a")
+        await backend.put(None, "b", 1, b"b")
+        await backend.get(None, "a", 1)
+        await backend.put(None, "c", 1, b"c")
+
+        assert len(backend) == 2
+        assert await backend.get(None, "b", 1) is None
+        assert await backend.get(None, "a", 1) == b"a"
+
+
+class TestDatabaseStatements:
+    @pytest.mark.asyncio
+    async def test_bumps_written_households_in_key_order(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+        other = uuid.uuid4()
+
+        await mark_data_changed(db, HOUSEHOLD, None, other, HOUSEHOLD)
+
+        stmt = db.execute.await_args.args[0]
+        scopes = [v for k, v in stmt.compile().params.items() if k.startswith("scope")]
+        assert scopes == sorted([str(HOUSEHOLD), str(other)])
+        assert "SET version = (data_versions.version + " in compiled(stmt)
+
+    @pytest.mark.asyncio
+    async def test_household_write_leaves_all_row_alone(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        await mark_data_changed(db, HOUSEHOLD)
+
+        stmt = db.execute.await_args.args[0]
+        scopes = [v for k, v in stmt.compile().params.items() if k.startswith("scope")]
+        assert scopes == [str(HOUSEHOLD)]
+
+    @pytest.mark.asyncio
+    async def test_write_without_household_bumps_nothing(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        await mark_data_changed(db, None, None)
+
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_catalog_write_bumps_every_household(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        await mark_all_data_changed(db)
+
+        sql = compiled(db.execute.await_args.args[0])
+        assert sql.startswith("INSERT INTO data_versions (scope, version, updated_at) SELECT")
+        assert "FROM households ORDER BY" in sql
+        assert "ON CONFLICT (scope) DO UPDATE" in sql
+
+    @pytest.mark.asyncio
+    async def test_database_backend_never_downgrades(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        await DatabaseCacheBackend().put(db, "key", 3, b"{}")
+
+        sql = compiled(db.execute.await_args.args[0])
+        assert "ON CONFLICT (key) DO UPDATE" in sql
+        assert "WHERE analytics_cache.version <= excluded.version" in sql
+
+
+class TestCachedEndpoints:
+    def setup_method(self):
+        self.cache = AnalyticsCache(MemoryCacheBackend())
+        row = MagicMock(
+            total_receipts=2,
+            total_spent=Decimal("300.00"),
+            total_items=9,
+            period_start=datetime(2026, 1, 2, 10),
+            period_end=datetime(2026, 1, 20, 18),
+        )
+        self.db = MagicMock()
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"one.return_value": row}))
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_analytics_cache] = lambda: self.cache
+        self.client = TestClient(app)
+        self.version = patch(
+            "src.services.analytics_cache.read_data_version", AsyncMock(return_value=3)
+        )
+        self.read_version = self.version.start()
+
+    def teardown_method(self):
+        self.version.stop()
+        app.dependency_overrides.clear()
+
+    def get_summary(self, headers=None, start="2026-01-01T00:00:00", household=HOUSEHOLD):
+        params = {"start_date": start}
+        if household is not None:
+            params["household_id"] = str(household)
+        return self.client.get("/api/analytics/summary", params=params, headers=headers)
+
+    def test_second_request_served_from_cache(self):
+        first = self.get_summary()
+        second = self.get_summary()
+
+        assert first.status_code == second.status_code == 200
+        assert second.content == first.content
+        assert first.json()["total_items"] == 9
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.headers["cache-control"] == "private, no-cache"
+        self.db.execute.assert_awaited_once()  # The summary query ran once
+        assert self.read_version.await_args.args[1] == str(HOUSEHOLD)
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+    def test_request_across_households_is_not_cached(self):
+        first = self.get_summary(household=None)
+        second = self.get_summary(household=None)
+
+        assert first.status_code == second.status_code == 200
+        assert "etag" not in first.headers
+        assert self.db.execute.await_count == 2
+        self.read_version.assert_not_awaited()
+
+    def test_matching_etag_gets_304(self):
+        etag = self.get_summary().headers["etag"]
+
+        response = self.get_summary(headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert self.cache.not_modified == 1
+
+    def test_new_data_version_recomputes(self):
+        etag = self.get_summary().headers["etag"]
+        self.read_version.return_value = 4
+
+        response = self.get_summary(headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert self.db.execute.await_count == 2
+
+    def test_normalized_parameters_share_entry(self):
+        self.get_summary(start="2026-01-01T00:00:00")
+        self.get_summary(start="2026-01-01")
+
+        assert self.cache.hits == 1
+
+    def test_household_endpoint_uses_household_version(self):
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": []}))
+
+        response = self.client.get(
+            "/api/analytics/spend-trend",
+            params={
+                "household_id": str(HOUSEHOLD),
+                "start_date": "2026-01-01",
+                "end_date": "2026-03-31",
+            },
+        )
+
+        assert response.status_code == 200
+        assert self.read_version.await_args.args[1] == str(HOUSEHOLD)
+
+    def test_disabled_cache_computes_every_time(self):
+        app.dependency_overrides[get_analytics_cache] = lambda: None
+
+        response = self.get_summary()
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        self.read_version.assert_not_awaited()
+
+    def test_admin_stats(self):
+        self.get_summary()
+        with patch("src.api.deps.settings") as mock_settings:
+            mock_settings.admin_api_key = "key"
+            response = self.client.get("/api/admin/analytics-cache", headers={"X-Admin-Key": "key"})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "enabled": True,
+            "backend": "memory",
+            "entries": 1,
+            "hits": 0,
+            "misses": 1,
+            "not_modified": 0,
+        }
@@ -0,0 +1,187 @@
+"""Tests for the single-call analytics dashboard."""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.analytics import count_unassigned_receipts
+from src.api.deps import get_analytics_cache, get_db, get_session_factory
+from src.main import app
+from src.services.analytics_cache import AnalyticsCache, MemoryCacheBackend
+from tests.conftest import compiled
+
+HOUSEHOLD = uuid.uuid4()
+PARAMS = {
+    "household_id": str(HOUSEHOLD),
+    "start_date": "2026-01-01T00:00:00",
+    "end_date": "2026-01-31T23:59:59",
+}
+
+
+class FakeSessions:
+    """Session factory handing out a fresh empty-result session per call."""
+
+    def __init__(self):
+        self.opened = 0
+        self.active = 0
+        self.peak = 0
+        self.committed = 0
+
+    @asynccontextmanager
+    async def __call__(self):
+        self.opened += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            yield self.session()
+        finally:
+            self.active -= 1
+
+    def session(self):
+        row = MagicMock(
+            total_receipts=0,
+            total_spent=0,
+            total_items=0,
+            period_start=None,
+            period_end=None,
+            total=0,
+            count=0,
+            servings=0,
+        )
+        result = MagicMock(
+            **{
+                "one.return_value": row,
+                "all.return_value": [],
+                "scalars.return_value.all.return_value": [],
+                # No restock snapshot yet, then the household lookup
+                "scalar_one_or_none.side_effect": [None, HOUSEHOLD],
+                "scalar_one.return_value": 3,  # Unassigned receipts
+            }
+        )
+
+        async def execute(_stmt):
+            await asyncio.sleep(0)  # Let the other widgets run
+            return result
+
+        async def commit():
+            self.committed += 1
+
+        session = MagicMock()
+        session.execute = execute
+        session.commit = commit
+        return session
+
+
+class TestDashboard:
+    def setup_method(self):
+        self.sessions = FakeSessions()
+        self.db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_session_factory] = lambda: self.sessions
+        app.dependency_overrides[get_analytics_cache] = lambda: None
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_widgets_run_concurrently_on_own_sessions(self):
+        with patch("src.api.analytics.settings") as mock_settings:
+            mock_settings.analytics_dashboard_concurrency = 3
+            response = self.client.get("/api/analytics/dashboard", params=PARAMS)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert set(body) == {
+            "summary",
+            "by_category",
+            "top_items",
+            "by_store",
+            "spend_trend",
+            "cost_per_meal",
+            "waste",
+            "restock",
+            "unassigned_receipts",
+            "errors",
+        }
+        assert body["errors"] == {}
+        assert body["unassigned_receipts"] == 3
+        assert body["spend_trend"]["granularity"] == "weekly"
+        assert body["restock"]["household_id"] == str(HOUSEHOLD)
+        assert self.sessions.opened == 9
+        assert self.sessions.peak == 3
+        assert self.sessions.committed == 9  # Keeps the cold-start restock snapshot
+
+    def test_validates_widget_parameters(self):
+        response = self.client.get(
+            "/api/analytics/dashboard", params={**PARAMS, "top_items_limit": 100}
+        )
+
+        assert response.status_code == 422
+        assert self.sessions.opened == 0
+
+    def test_cached_widgets_only_recompute_restock(self):
+        cache = AnalyticsCache(MemoryCacheBackend())
+        app.dependency_overrides[get_analytics_cache] = lambda: cache
+
+        with patch(
+            "src.services.analytics_cache.read_data_version", AsyncMock(return_value=2)
+        ) as read_version:
+            first = self.client.get("/api/analytics/dashboard", params=PARAMS)
+            opened = self.sessions.opened
+            second = self.client.get("/api/analytics/dashboard", params=PARAMS)
+
+        assert first.status_code == second.status_code == 200
+        assert second.json()["summary"] == first.json()["summary"]
+        assert self.sessions.opened - opened == 2  # Restock and unassigned receipts only
+        assert second.json()["unassigned_receipts"] == 3
+        assert read_version.await_args.args[1] == str(HOUSEHOLD)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_receipt_widgets_cover_the_household(self):
+        summary = AsyncMock(side_effect=RuntimeError("boom"))
+        with patch("src.api.analytics.get_summary", summary):
+            self.client.get("/api/analytics/dashboard", params=PARAMS)
+
+        assert summary.await_args.kwargs["household_id"] == HOUSEHOLD
+        assert summary.await_args.kwargs["start_date"].day == 1
+
+    def test_failing_widget_is_reported_and_not_cached(self):
+        cache = AnalyticsCache(MemoryCacheBackend())
+        app.dependency_overrides[get_analytics_cache] = lambda: cache
+
+        with (
+            patch("src.api.analytics.get_by_store", AsyncMock(side_effect=RuntimeError("boom"))),
+            patch("src.services.analytics_cache.read_data_version", AsyncMock(return_value=2)),
+        ):
+            first = self.client.get("/api/analytics/dashboard", params=PARAMS)
+            second = self.client.get("/api/analytics/dashboard", params=PARAMS)
+
+        assert first.status_code == 200
+        body = first.json()
+        assert body["by_store"] is None
+        assert body["errors"] == {"by_store": "Failed to compute"}
+        assert body["summary"]["total_receipts"] == 0
+        assert body["restock"]["household_id"] == str(HOUSEHOLD)
+        assert second.json()["errors"] == {"by_store": "Failed to compute"}
+        assert (cache.hits, cache.misses) == (0, 2)
+
+
+class TestUnassignedReceipts:
+    @pytest.mark.asyncio
+    async def test_counts_receipts_without_household_in_period(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(**{"scalar_one.return_value": 4}))
+
+        count = await count_unassigned_receipts(
+            db, datetime(2026, 1, 1), datetime(2026, 1, 31, 23, 59, 59)
+        )
+
+        assert count == 4
+        sql = compiled(db.execute.await_args.args[0])
+        assert "receipts.household_id IS NULL" in sql
+        assert "receipts.purchase_date >= " in sql
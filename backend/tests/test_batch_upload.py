@@ -0,0 +1,210 @@
+"""Tests for the batch receipt upload endpoint."""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_db, get_ocr_service
+from src.main import app
+from src.services.mock_ocr import MockOCRService
+
+
+def jpeg(tag):
+    """Distinct JPEG-looking content for each tag."""
+    return b"\xff\xd8\xff\xe0" + tag.encode()
+
+
+class TrackingOCRService(MockOCRService):
+    """Mock OCR that records peak concurrency and fails for chosen content."""
+
+    def __init__(self, fail_contents=()):
+        self.fail_contents = set(fail_contents)
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def extract_text(self, image_path):
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if image_path.read_bytes() in self.fail_contents:
+                raise RuntimeError("unreadable")
+            return await super().extract_text(image_path)
+        finally:
+            self.running -= 1
+
+
+class TestBatchUpload:
+    """Tests for POST /api/receipts/upload/batch."""
+
+    def setup_method(self):
+        self.db = MagicMock()
+        self.db.commit = AsyncMock()
+        self.existing = {}
+        self.cached = {}
+        self.raced = {}
+        app.dependency_overrides[get_db] = self.override_get_db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def override_get_db(self):
+        return self.db
+
+    def post_batch(self, tmp_path, ocr, files, concurrency=4):
+        app.dependency_overrides[get_ocr_service] = lambda: ocr
+        with (
+            patch("src.api.upload.settings") as mock_settings,
+            patch("src.api.upload.load_category_map", new_callable=AsyncMock) as mock_categories,
+            patch("src.api.upload.find_receipts_by_image", new_callable=AsyncMock) as mock_find,
+            patch("src.api.upload.load_cached_ocr", new_callable=AsyncMock) as mock_cached,
+            patch("src.api.upload.cache_ocr_results", new_callable=AsyncMock) as mock_cache,
+            patch("src.api.upload.insert_receipts", new_callable=AsyncMock) as mock_insert,
+        ):
+            mock_settings.upload_dir = str(tmp_path)
+            mock_settings.max_upload_bytes = 1024
+            mock_settings.batch_upload_concurrency = concurrency
+            mock_settings.batch_upload_max_files = 10
+            mock_categories.return_value = {}
+            mock_find.side_effect = lambda _db, hashes: {
+                h: r for h, r in self.existing.items() if h in hashes
+            }
+            mock_cached.side_effect = lambda _db, _ocr, hashes: {
+                h: r for h, r in self.cached.items() if h in hashes
+            }
+            mock_insert.side_effect = lambda _db, rows, _categories: [
+                MagicMock(id=self.raced.get(receipt["image_sha256"], receipt["id"]))
+                for receipt, _ in rows
+            ]
+            response = self.client.post("/api/receipts/upload/batch", files=files)
+            assert mock_categories.await_count == 1
+            self.cache_writes = mock_cache.await_args_list
+            self.inserts = mock_insert.await_args_list
+        return response
+
+    def test_reports_per_file_results(self, tmp_path):
+        """Each file gets its own success or failure entry, in request order."""
+        ocr = TrackingOCRService(fail_contents={jpeg("bad")})
+        files = [
+            ("files", ("a.jpg", jpeg("a"), "image/jpeg")),
+            ("files", ("b.txt", jpeg("b"), "text/plain")),
+            ("files", ("c.jpg", jpeg("bad"), "image/jpeg")),
+        ]
+
+        response = self.post_batch(tmp_path, ocr, files)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["filename"] for r in data["results"]] == ["a.jpg", "b.txt", "c.jpg"]
+        assert data["results"][0]["success"] is True
+        assert data["results"][0]["receipt_id"] is not None
+        assert data["results"][1]["success"] is False
+        assert data["results"][1]["error"].startswith("File type not allowed")
+        assert data["results"][2]["error"] == "OCR processing failed: unreadable"
+        assert data["succeeded"] == 1
+        assert data["failed"] == 2
+        # Only the successful image is kept on disk
+        assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+    def test_inserts_batch_in_one_bulk_insert(self, tmp_path):
+        """All receipts of the batch are inserted together."""
+        ocr = TrackingOCRService()
+        files = [("files", (f"{i}.jpg", jpeg(str(i)), "image/jpeg")) for i in range(3)]
+
+        response = self.post_batch(tmp_path, ocr, files)
+
+        assert response.status_code == 200
+        assert len(self.inserts) == 1
+        rows = self.inserts[0].args[1]
+        assert [receipt["id"] for receipt, _ in rows] == [
+            uuid.UUID(r["receipt_id"]) for r in response.json()["results"]
+        ]
+
+    def test_ocr_concurrency_is_bounded(self, tmp_path):
+        """No more than batch_upload_concurrency images are OCR'd at once."""
+        ocr = TrackingOCRService()
+        files = [("files", (f"{i}.jpg", jpeg(str(i)), "image/jpeg")) for i in range(8)]
+
+        response = self.post_batch(tmp_path, ocr, files, concurrency=2)
+
+        assert response.status_code == 200
+        assert ocr.calls == 8
+        assert ocr.peak == 2
+
+    def test_duplicate_images_in_batch_share_one_receipt(self, tmp_path):
+        """Identical images are stored and OCR'd once and link to the same receipt."""
+        ocr = TrackingOCRService()
+        files = [("files", (f"{i}.jpg", jpeg("same"), "image/jpeg")) for i in range(3)]
+
+        response = self.post_batch(tmp_path, ocr, files)
+
+        results = response.json()["results"]
+        assert ocr.calls == 1
+        assert len(self.inserts[0].args[1]) == 1
+        assert len({r["receipt_id"] for r in results}) == 1
+        assert [r["duplicate"] for r in results] == [False, True, True]
+        assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+    def test_image_with_existing_receipt_skips_ocr(self, tmp_path):
+        """Re-uploaded images link to their existing receipt without OCR."""
+        ocr = TrackingOCRService()
+        content = jpeg("old")
+        first = self.post_batch(tmp_path, ocr, [("files", ("a.jpg", content, "image/jpeg"))])
+        sha = next(p for p in tmp_path.rglob("*") if p.is_file()).stem
+        receipt_id = uuid.UUID(first.json()["results"][0]["receipt_id"])
+        self.existing[sha] = receipt_id
+
+        response = self.post_batch(tmp_path, ocr, [("files", ("b.jpg", content, "image/jpeg"))])
+
+        result = response.json()["results"][0]
+        assert ocr.calls == 1
+        assert result["duplicate"] is True
+        assert result["receipt_id"] == str(receipt_id)
+
+    def test_concurrent_upload_of_same_image_links_to_its_receipt(self, tmp_path):
+        """An image whose receipt a concurrent upload inserted first is a duplicate."""
+        ocr = TrackingOCRService()
+        content = jpeg("raced")
+        self.post_batch(tmp_path, ocr, [("files", ("a.jpg", content, "image/jpeg"))])
+        sha = next(p for p in tmp_path.rglob("*") if p.is_file()).stem
+        winner = uuid.uuid4()
+        self.raced[sha] = winner
+
+        response = self.post_batch(tmp_path, ocr, [("files", ("b.jpg", content, "image/jpeg"))])
+
+        result = response.json()["results"][0]
+        assert result["success"] is True
+        assert result["duplicate"] is True
+        assert result["receipt_id"] == str(winner)
+
+    def test_cached_ocr_result_skips_ocr(self, tmp_path):
+        """Cached OCR results are used instead of calling the engine."""
+        ocr = TrackingOCRService()
+        content = jpeg("cached")
+        self.post_batch(tmp_path, ocr, [("files", ("a.jpg", content, "image/jpeg"))])
+        cached_result = self.cache_writes[0].args[2]
+        self.cached.update(cached_result)
+
+        response = self.post_batch(tmp_path, ocr, [("files", ("b.jpg", content, "image/jpeg"))])
+
+        assert response.json()["results"][0]["success"] is True
+        assert ocr.calls == 1
+
+    def test_rejects_too_many_files(self, tmp_path):
+        """Batches larger than batch_upload_max_files are rejected up front."""
+        ocr = TrackingOCRService()
+        files = [("files", (f"{i}.jpg", jpeg(str(i)), "image/jpeg")) for i in range(11)]
+
+        app.dependency_overrides[get_ocr_service] = lambda: ocr
+        with patch("src.api.upload.settings") as mock_settings:
+            mock_settings.upload_dir = str(tmp_path)
+            mock_settings.batch_upload_max_files = 10
+            response = self.client.post("/api/receipts/upload/batch", files=files)
+
+        assert response.status_code == 400
+        assert ocr.calls == 0
@@ -0,0 +1,63 @@
+"""Tests for the benchmark harness (not the benchmarks themselves)."""
+
+from benchmarks.corpus import build_corpus
+from benchmarks.run import BenchmarkResult, compare, main
+
+
+def result(normalized=100.0, peak_kib=50.0, ops=10):
+    return BenchmarkResult(
+        name="parse_lines", ops=ops, ops_per_sec=1.0, normalized=normalized, peak_kib=peak_kib
+    )
+
+
+class TestCorpus:
+    def test_same_seed_gives_same_corpus(self):
+        first = build_corpus(receipts=5, seed=1)
+        second = build_corpus(receipts=5, seed=1)
+
+        assert first.receipt_lines == second.receipt_lines
+        assert first.item_names == second.item_names
+
+    def test_builds_every_part(self):
+        corpus = build_corpus(receipts=5, seed=1)
+
+        assert len(corpus.line_results) == 5
+        assert len(corpus.fixture_results) == 5
+        assert corpus.ingredients
+
+
+class TestCompare:
+    baseline = {"parse_lines": {"ops": 10, "normalized": 100.0, "peak_kib": 50.0}}
+
+    def test_within_tolerance(self):
+        assert compare([result(normalized=80.0, peak_kib=60.0)], self.baseline, 0.25) == []
+
+    def test_slower_throughput_regresses(self):
+        regressions = compare([result(normalized=70.0)], self.baseline, 0.25)
+
+        assert len(regressions) == 1
+        assert "throughput" in regressions[0]
+
+    def test_higher_memory_regresses(self):
+        regressions = compare([result(peak_kib=70.0)], self.baseline, 0.25)
+
+        assert "peak memory" in regressions[0]
+
+    def test_small_memory_growth_is_ignored(self):
+        baseline = {"parse_lines": {"ops": 10, "normalized": 100.0, "peak_kib": 1.0}}
+
+        assert compare([result(peak_kib=4.5)], baseline, 0.25) == []
+        assert "peak memory" in compare([result(peak_kib=5.5)], baseline, 0.25)[0]
+
+    def test_different_corpus_is_not_compared(self):
+        assert compare([result(normalized=1.0, ops=99)], self.baseline, 0.25) == []
+
+
+def test_main_records_and_checks_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--receipts", "3", "--repeat", "1", "--only", "parse_lines"]
+    args += ["--baseline", str(baseline)]
+
+    assert main([*args, "--update-baseline"]) == 0
+    assert baseline.exists()
+    assert main([*args, "--tolerance", "0.9"]) == 0
@@ -0,0 +1,220 @@
+"""Tests for the process-wide category and ingredient catalog cache."""
+
+import asyncio
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.api.deps import get_catalog_cache, get_db
+from src.main import app
+from src.schemas.item import CategoryResponse
+from src.services.catalog_cache import (
+    Catalog,
+    CatalogCache,
+    load_catalog,
+)
+from tests.conftest import cached_ingredient
+
+
+def make_catalog(version=1, ingredients=()):
+    meieri = CategoryResponse(id=uuid.uuid4(), name="Meieri", icon=None, color=None)
+    ingredients = list(ingredients)
+    return Catalog(
+        version=version,
+        categories={"meieri": meieri},
+        ingredients=ingredients,
+        ingredients_by_id={i.id: i for i in ingredients},
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCatalogCache:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.cache = CatalogCache(check_interval=5, clock=self.clock)
+        self.db = MagicMock()
+        self.version = 1
+        self.loads = 0
+
+    async def read_version(self, _db):
+        return self.version
+
+    async def load(self, _db, version):
+        self.loads += 1
+        await asyncio.sleep(0)
+        return make_catalog(version)
+
+    def patched(self):
+        return (
+            patch("src.services.catalog_cache.read_catalog_version", self.read_version),
+            patch("src.services.catalog_cache.load_catalog", self.load),
+        )
+
+    @pytest.mark.asyncio
+    async def test_serves_snapshot_until_check_interval(self):
+        read, load = self.patched()
+        with read, load:
+            first = await self.cache.get(self.db)
+            self.clock.now += 4
+            second = await self.cache.get(self.db)
+
+        assert second is first
+        assert self.cache.stats()["hits"] == 1
+        assert self.cache.stats()["misses"] == 1
+        assert self.cache.stats()["version_checks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reloads_only_when_version_moves(self):
+        read, load = self.patched()
+        with read, load:
+            first = await self.cache.get(self.db)
+            self.clock.now += 5
+            assert await self.cache.get(self.db) is first
+
+            self.version = 2  # Another worker changed the catalog
+            self.clock.now += 5
+            reloaded = await self.cache.get(self.db)
+
+        assert reloaded.version == 2
+        assert self.loads == 2
+        assert self.cache.stats()["version_checks"] == 3
+
+    @pytest.mark.asyncio
+    async def test_zero_interval_checks_every_access(self):
+        self.cache.check_interval = 0
+        read, load = self.patched()
+        with read, load:
+            for _ in range(3):
+                await self.cache.get(self.db)
+
+        assert self.cache.stats()["version_checks"] == 3
+        assert self.loads == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self):
+        read, load = self.patched()
+        with read, load:
+            catalogs = await asyncio.gather(*(self.cache.get(self.db) for _ in range(5)))
+
+        assert self.loads == 1
+        assert all(c is catalogs[0] for c in catalogs)
+
+    @pytest.mark.asyncio
+    async def test_mark_changed_invalidates_after_commit(self):
+        read, load = self.patched()
+        session = Session()
+        self.db.sync_session = session
+        with read, load, patch("src.services.catalog_cache.bump_catalog_version") as bump:
+            await self.cache.get(self.db)
+            await self.cache.mark_changed(self.db)
+
+            bump.assert_awaited_once_with(self.db)
+            assert self.cache.stats()["loaded"] is True  # Not committed yet
+
+            session.dispatch.after_commit(session)
+            assert self.cache.stats()["loaded"] is False
+
+            await self.cache.get(self.db)
+
+        assert self.loads == 2
+
+
+class TestLoadCatalog:
+    @pytest.mark.asyncio
+    async def test_builds_snapshot(self):
+        meieri = MagicMock(id=uuid.uuid4(), icon=None, color=None)
+        meieri.name = "Meieri"
+        melk = MagicMock(
+            id=uuid.uuid4(),
+            canonical_name="melk",
+            default_unit="ml",
+            aliases=[" Lettmelk", "MILK"],
+            category_id=meieri.id,
+            created_at=datetime(2025, 1, 1),
+        )
+        melk.name = "Melk"
+        db = MagicMock()
+        db.execute = AsyncMock(
+            side_effect=[
+                MagicMock(**{"scalars.return_value.all.return_value": [meieri]}),
+                MagicMock(**{"scalars.return_value.all.return_value": [melk]}),
+            ]
+        )
+
+        catalog = await load_catalog(db, 7)
+
+        assert catalog.version == 7
+        assert catalog.categories["meieri"].id == meieri.id
+        [ingredient] = catalog.ingredients
+        assert ingredient.normalized_aliases == ("lettmelk", "milk")
+        assert ingredient.category.name == "Meieri"
+        assert catalog.ingredients_by_id[melk.id] is ingredient
+
+
+class TestCatalogEndpoints:
+    def setup_method(self):
+        self.meieri_id = uuid.uuid4()
+        self.catalog = make_catalog(
+            ingredients=[
+                cached_ingredient("Egg"),
+                cached_ingredient("Melk", category_id=self.meieri_id),
+                cached_ingredient("Lettmelk", category_id=self.meieri_id),
+            ]
+        )
+        self.cache = MagicMock()
+        self.cache.get = AsyncMock(return_value=self.catalog)
+        self.cache.stats.return_value = {
+            "loaded": True,
+            "version": 1,
+            "categories": 1,
+            "ingredients": 3,
+            "hits": 10,
+            "misses": 1,
+            "version_checks": 2,
+        }
+        self.db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_catalog_cache] = lambda: self.cache
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_lists_ingredients_from_cache(self):
+        response = self.client.get("/api/ingredients", params={"search": "MELK"})
+
+        assert response.status_code == 200
+        assert [i["name"] for i in response.json()] == ["Melk", "Lettmelk"]
+        assert "normalized_aliases" not in response.json()[0]
+
+    def test_filters_and_paginates(self):
+        response = self.client.get(
+            "/api/ingredients",
+            params={"category_id": str(self.meieri_id), "skip": 1, "limit": 5},
+        )
+
+        assert [i["name"] for i in response.json()] == ["Lettmelk"]
+
+    def test_lists_categories_from_cache(self):
+        response = self.client.get("/api/categories")
+
+        assert [c["name"] for c in response.json()] == ["Meieri"]
+
+    def test_admin_stats(self):
+        with patch("src.api.deps.settings") as mock_settings:
+            mock_settings.admin_api_key = "key"
+            response = self.client.get("/api/admin/catalog-cache", headers={"X-Admin-Key": "key"})
+
+        assert response.status_code == 200
+        assert response.json()["hits"] == 10
@@ -0,0 +1,61 @@
+"""Tests for keyword-based item categorization."""
+
+from src.services.categorizer import CATEGORY_KEYWORDS, categorize_item, categorize_many
+from src.services.keyword_automaton import KeywordAutomaton
+from src.services.mock_ocr import MockOCRService
+
+
+class TestKeywordAutomaton:
+    def test_finds_overlapping_keywords(self):
+        automaton = KeywordAutomaton(
+            (word, word.upper(), i) for i, word in enumerate(["he", "she", "his", "hers"])
+        )
+
+        found = {(m.start, m.keyword) for m in automaton.find_all("ushers")}
+
+        assert found == {(1, "she"), (2, "he"), (2, "hers")}
+
+    def test_matches_naive_substring_search(self):
+        """Every keyword occurrence is reported, as with checking each keyword with `in`."""
+        automaton = KeywordAutomaton(
+            (kw, category, 0) for category, kws in CATEGORY_KEYWORDS.items() for kw in kws
+        )
+        names = [
+            name.lower() for fixture in MockOCRService.FIXTURES for name, _ in fixture["items"]
+        ]
+
+        for name in names:
+            found = {m.keyword for m in automaton.find_all(name)}
+            expected = {kw for kws in CATEGORY_KEYWORDS.values() for kw in kws if kw in name}
+            assert found == expected, name
+
+    def test_best_match_prefers_longest_then_priority(self):
+        automaton = KeywordAutomaton([("ost", "A", 0), ("postei", "B", 1), ("pos", "C", 0)])
+
+        assert automaton.best_match("leverpostei").label == "B"
+        assert automaton.best_match("xyz") is None
+
+    def test_best_match_breaks_length_ties_by_priority(self):
+        automaton = KeywordAutomaton([("abc", "late", 2), ("bcd", "early", 1)])
+
+        assert automaton.best_match("abcd").label == "early"
+
+
+class TestCategorizeItem:
+    def test_categorizes_by_keyword(self):
+        assert categorize_item("MELK LETT 1L") == "Meieri"
+        assert categorize_item("NORDFJORD BACON 400G") == "Kjøtt"
+        assert categorize_item("COOP COLA 1.5L") == "Drikke"
+
+    def test_longest_keyword_wins(self):
+        # "ost" is inside "leverpostei", but the longer keyword decides
+        assert categorize_item("LEVERPOSTEI GILDE") == "Kjøtt"
+        assert categorize_item("KNEKKEBRØD") == "Brød"
+
+    def test_no_match(self):
+        assert categorize_item("XYZ 123") is None
+
+    def test_categorize_many_matches_single_calls(self):
+        names = ["MELK LETT 1L", "XYZ", "BANANER 1KG", "MELK LETT 1L"]
+
+        assert categorize_many(names) == [categorize_item(n) for n in names]
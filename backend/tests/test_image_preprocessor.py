@@ -0,0 +1,185 @@
+"""Tests for receipt image preprocessing."""
+
+import io
+import time
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from src.services.bounded_executor import BoundedExecutor
+from src.services.image_preprocessor import (
+    ImagePreprocessError,
+    ImagePreprocessor,
+    PreprocessOptions,
+    preprocess_image,
+    scale_factor,
+)
+from src.services.image_store import store_content_addressed
+
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF"
+
+# EXIF tag and value for "rotate 90 degrees clockwise to display"
+ORIENTATION_TAG = 0x0112
+ROTATE_90 = 6
+
+
+class ChunkSource:
+    def __init__(self, data):
+        self.buffer = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self.buffer.read(size)
+
+
+def photo(width, height, fmt="JPEG", orientation=None):
+    """Colour photo with a dark band near the top, optionally rotated via EXIF."""
+    image = Image.new("RGB", (width, height), (200, 180, 150))
+    image.paste((20, 20, 20), (0, 0, width, height // 10))
+    exif = Image.Exif()
+    if orientation:
+        exif[ORIENTATION_TAG] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, exif=exif)
+    return buffer.getvalue()
+
+
+def thread_preprocessor(**options):
+    return ImagePreprocessor(
+        PreprocessOptions(**options),
+        BoundedExecutor(name="preprocess", kind="thread", max_concurrency=2, max_retries=0),
+    )
+
+
+class TestScaleFactor:
+    def test_fits_short_side(self):
+        options = PreprocessOptions(short_side=1000, max_long_side=4000)
+
+        assert scale_factor(3000, 2000, options) == 0.5
+
+    def test_long_receipts_are_bounded_by_long_side(self):
+        options = PreprocessOptions(short_side=1000, max_long_side=4000)
+
+        assert scale_factor(1000, 8000, options) == 0.5
+
+    def test_never_enlarges(self):
+        assert scale_factor(400, 600, PreprocessOptions()) == 1.0
+
+
+class TestPreprocessImage:
+    def test_normalizes_photo(self, tmp_path):
+        source = tmp_path / "in.jpg"
+        source.write_bytes(photo(3000, 2000, orientation=ROTATE_90))
+        dest = tmp_path / "out.jpg"
+        thumbnail = tmp_path / "thumb.jpg"
+
+        result = preprocess_image(source, dest, thumbnail, PreprocessOptions(short_side=1000))
+
+        with Image.open(dest) as out:
+            assert out.format == "JPEG"
+            assert out.mode == "L"
+            # Turned upright: the landscape photo becomes portrait
+            assert out.size == (1000, 1500) == (result.width, result.height)
+            # Contrast is stretched to the full range
+            assert out.getextrema() == (0, 255)
+        with Image.open(thumbnail) as thumb:
+            assert max(thumb.size) == 320
+        assert result.size == dest.stat().st_size
+        assert result.size < source.stat().st_size
+
+    def test_png_to_webp(self, tmp_path):
+        source = tmp_path / "in.png"
+        source.write_bytes(photo(800, 1200, fmt="PNG"))
+        dest = tmp_path / "out.webp"
+
+        preprocess_image(source, dest, tmp_path / "t.webp", PreprocessOptions(output_type="webp"))
+
+        with Image.open(dest) as out:
+            assert out.format == "WEBP"
+            assert out.size == (800, 1200)
+
+    def test_undecodable_image(self, tmp_path):
+        source = tmp_path / "in.jpg"
+        source.write_bytes(JPEG_HEADER + b"not really a jpeg")
+
+        with pytest.raises(ImagePreprocessError):
+            preprocess_image(source, tmp_path / "o.jpg", tmp_path / "t.jpg", PreprocessOptions())
+
+    def test_rejects_unknown_output_type(self):
+        with pytest.raises(ValueError, match="Unknown image output type"):
+            thread_preprocessor(output_type="gif")
+
+
+class TestStorePreprocessed:
+    @pytest.mark.asyncio
+    async def test_stores_normalized_image_and_thumbnail(self, tmp_path):
+        data = photo(2400, 3200)
+        preprocessor = thread_preprocessor(output_type="webp")
+
+        stored = await store_content_addressed(
+            ChunkSource(data), tmp_path, max_bytes=len(data), preprocessor=preprocessor
+        )
+
+        assert stored.path.suffix == ".webp"
+        assert stored.image_type == "webp"
+        assert stored.thumbnail_path.name == f"{stored.sha256}.thumb.webp"
+        assert stored.size == stored.path.stat().st_size < len(data)
+        assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == sorted(
+            [stored.path.name, stored.thumbnail_path.name]
+        )
+
+    @pytest.mark.asyncio
+    async def test_reupload_reuses_preprocessed_files(self, tmp_path):
+        data = photo(1600, 2000)
+        preprocessor = thread_preprocessor()
+        first = await store_content_addressed(
+            ChunkSource(data), tmp_path, max_bytes=len(data), preprocessor=preprocessor
+        )
+
+        second = await store_content_addressed(
+            ChunkSource(data), tmp_path, max_bytes=len(data), preprocessor=preprocessor
+        )
+
+        assert second.is_new is False
+        assert (second.path, second.thumbnail_path) == (first.path, first.thumbnail_path)
+        assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 2
+
+    @pytest.mark.asyncio
+    async def test_undecodable_upload_is_stored_as_is(self, tmp_path):
+        data = JPEG_HEADER + b"x" * 100
+
+        stored = await store_content_addressed(
+            ChunkSource(data), tmp_path, max_bytes=1000, preprocessor=thread_preprocessor()
+        )
+
+        assert stored.path.read_bytes() == data
+        assert stored.thumbnail_path is None
+        assert [p for p in tmp_path.rglob("*") if p.is_file()] == [stored.path]
+
+    @pytest.mark.asyncio
+    async def test_preprocessing_timeout_stores_original(self, tmp_path, caplog):
+        data = photo(600, 900)
+        preprocessor = ImagePreprocessor(
+            PreprocessOptions(),
+            BoundedExecutor(name="image preprocessing", timeout=0.01, max_retries=0),
+        )
+
+        with patch("src.services.image_preprocessor.preprocess_image", lambda *_: time.sleep(0.2)):
+            stored = await store_content_addressed(
+                ChunkSource(data), tmp_path, max_bytes=len(data), preprocessor=preprocessor
+            )
+
+        assert stored.path.read_bytes() == data
+        assert "image preprocessing timed out" in caplog.text
+        assert "OCR" not in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_discard_removes_thumbnail(self, tmp_path):
+        data = photo(600, 900)
+        stored = await store_content_addressed(
+            ChunkSource(data), tmp_path, max_bytes=len(data), preprocessor=thread_preprocessor()
+        )
+
+        stored.discard()
+
+        assert not any(p.is_file() for p in tmp_path.rglob("*"))
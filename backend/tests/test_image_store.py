@@ -0,0 +1,110 @@
+"""Tests for streaming image storage."""
+
+import hashlib
+import io
+
+import pytest
+
+from src.services.image_store import (
+    InvalidImageError,
+    UploadTooLargeError,
+    detect_image_type,
+    store_content_addressed,
+    stream_to_disk,
+)
+
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF"
+
+
+class ChunkSource:
+    """Async byte source that records how much has been read."""
+
+    def __init__(self, data):
+        self.buffer = io.BytesIO(data)
+        self.bytes_read = 0
+
+    async def read(self, size=-1):
+        chunk = self.buffer.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class TestDetectImageType:
+    def test_jpeg(self):
+        assert detect_image_type(JPEG_HEADER) == "jpeg"
+
+    def test_png(self):
+        assert detect_image_type(b"\x89PNG\r\n\x1a\n\x00\x00") == "png"
+
+    def test_webp(self):
+        assert detect_image_type(b"RIFF\x24\x00\x00\x00WEBPVP8 ") == "webp"
+
+    def test_heic(self):
+        assert detect_image_type(b"\x00\x00\x00\x18ftypheic\x00\x00") == "heic"
+
+    def test_mp4_is_not_heic(self):
+        assert detect_image_type(b"\x00\x00\x00\x18ftypisom\x00\x00") is None
+
+    def test_text_is_rejected(self):
+        assert detect_image_type(b"hello world, not an image") is None
+
+
+class TestStreamToDisk:
+    @pytest.mark.asyncio
+    async def test_writes_file_and_hashes_content(self, tmp_path):
+        data = JPEG_HEADER + b"x" * 1000
+        dest = tmp_path / "a.jpg"
+
+        stored = await stream_to_disk(ChunkSource(data), dest, max_bytes=10_000, chunk_size=64)
+
+        assert dest.read_bytes() == data
+        assert stored.sha256 == hashlib.sha256(data).hexdigest()
+        assert stored.size == len(data)
+        assert stored.image_type == "jpeg"
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_image_after_first_chunk(self, tmp_path):
+        source = ChunkSource(b"%PDF-1.7" + b"x" * 10_000)
+        dest = tmp_path / "a.jpg"
+
+        with pytest.raises(InvalidImageError):
+            await stream_to_disk(source, dest, max_bytes=100_000, chunk_size=64)
+
+        assert source.bytes_read == 64
+        assert not dest.exists()
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_upload_and_removes_partial_file(self, tmp_path):
+        source = ChunkSource(JPEG_HEADER + b"x" * 10_000)
+        dest = tmp_path / "a.jpg"
+
+        with pytest.raises(UploadTooLargeError):
+            await stream_to_disk(source, dest, max_bytes=1000, chunk_size=256)
+
+        # Reading stops at the first chunk past the limit
+        assert source.bytes_read <= 1000 + 256
+        assert not dest.exists()
+
+
+class TestStoreContentAddressed:
+    @pytest.mark.asyncio
+    async def test_stores_under_hash_path(self, tmp_path):
+        data = JPEG_HEADER + b"receipt"
+        sha = hashlib.sha256(data).hexdigest()
+
+        stored = await store_content_addressed(ChunkSource(data), tmp_path, max_bytes=10_000)
+
+        assert stored.path == tmp_path / sha[:2] / f"{sha}.jpg"
+        assert stored.path.read_bytes() == data
+        assert stored.is_new is True
+
+    @pytest.mark.asyncio
+    async def test_identical_content_reuses_existing_file(self, tmp_path):
+        data = JPEG_HEADER + b"receipt"
+
+        first = await store_content_addressed(ChunkSource(data), tmp_path, max_bytes=10_000)
+        second = await store_content_addressed(ChunkSource(data), tmp_path, max_bytes=10_000)
+
+        assert second.path == first.path
+        assert second.is_new is False
+        assert [p for p in tmp_path.rglob("*") if p.is_file()] == [first.path]
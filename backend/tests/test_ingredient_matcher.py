@@ -5,7 +5,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from src.services.ingredient_matcher import IngredientMatcher
+from src.services.ingredient_matcher import IngredientIndex, IngredientMatcher
 
 
 class TestIngredientMatcher:
@@ -86,3 +86,74 @@ class TestIngredientMatcher:
         result = await self.matcher.match("TINE MELK 1L", [ingredient1])
         assert result is not None
         assert result.method == "exact"
+
+
+def ingredient(name, canonical_name=None, aliases=()):
+    item = MagicMock()
+    item.id = uuid.uuid4()
+    item.name = name
+    item.canonical_name = canonical_name or name.lower()
+    item.aliases = list(aliases)
+    return item
+
+
+class TestIngredientIndex:
+    def setup_method(self):
+        self.melk = ingredient("Melk", aliases=["Lettmelk", "milk"])
+        self.kylling = ingredient("Kyllingfilet", aliases=["kylling"])
+        self.laks = ingredient("Laks")
+        self.te = ingredient("Te")
+        self.ingredients = [self.melk, self.kylling, self.laks, self.te]
+        self.index = IngredientIndex(self.ingredients)
+
+    def test_exact_and_alias_hits_are_sole_candidates(self):
+        assert self.index.candidates("melk", 0.5) == [self.melk]
+        assert self.index.candidates("lettmelk", 0.5) == [self.melk]
+
+    def test_fuzzy_candidates_contain_or_are_contained(self):
+        assert self.index.candidates("kyllingbryst", 0.5) == [self.kylling]
+        assert self.index.candidates("rokt laks", 0.5) == [self.laks]
+        assert self.index.candidates("sjokolade", 0.5) == []
+
+    def test_short_names_are_always_considered(self):
+        assert self.index.candidates("tea", 0.5) == [self.te]
+        assert self.index.candidates("la", 0.5) == [self.melk, self.laks, self.te]
+
+    def test_length_bound_drops_hopeless_candidates(self):
+        assert self.index.candidates("laks med dill og sitron", 0.5) == []
+
+    @pytest.mark.asyncio
+    async def test_same_results_as_full_scan(self):
+        matcher = IngredientMatcher()
+        names = ["TINE LETTMELK 1L", "KYLLING 400G", "ROKT LAKS", "GRONN TE", "TEA", "LA", ""]
+
+        for name in names:
+            normalized = matcher.normalize_name(name)
+            expected = None
+            for item in self.ingredients:
+                match = matcher.match_against_ingredient(normalized, item)
+                if match and (expected is None or match.confidence > expected.confidence):
+                    expected = match
+            if expected and expected.confidence < Decimal("0.6"):
+                expected = None
+
+            assert await matcher.match(name, self.ingredients) == expected
+
+    @pytest.mark.asyncio
+    async def test_index_is_reused_until_list_changes(self):
+        matcher = IngredientMatcher()
+        await matcher.match("melk", self.ingredients)
+        index = matcher.index_for(self.ingredients)
+
+        assert matcher.index_for(self.ingredients) is index
+
+        self.ingredients.append(ingredient("Egg"))
+        assert matcher.index_for(self.ingredients) is not index
+        assert (await matcher.match("egg", self.ingredients)).method == "exact"
+
+    @pytest.mark.asyncio
+    async def test_accepts_prebuilt_index(self):
+        result = await IngredientMatcher().match("TINE LETTMELK 1L", self.index)
+
+        assert result.ingredient_id == self.melk.id
+        assert result.method == "alias"
@@ -0,0 +1,94 @@
+"""Tests for trigram ingredient search."""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_catalog_cache, get_db
+from src.main import app
+from src.services.catalog_cache import Catalog
+from src.services.ingredient_search import search_ingredient_ids, search_query
+from tests.conftest import cached_ingredient, compiled
+
+
+class TestSearchQuery:
+    def test_uses_indexed_expression(self):
+        sql = compiled(search_query(" Tomatt "), literal_binds=True)
+
+        expression = (
+            "ingredient_search_text(ingredients.name, ingredients.canonical_name, "
+            "ingredients.aliases)"
+        )
+        assert f"WHERE {expression} %%> 'tomatt'" in sql
+        assert f"ORDER BY word_similarity('tomatt', {expression}) DESC" in sql
+
+    def test_category_and_paging(self):
+        category_id = uuid.uuid4()
+
+        sql = compiled(search_query("melk", category_id, skip=10, limit=5), literal_binds=True)
+
+        assert f"ingredients.category_id = '{category_id}'" in sql
+        assert "LIMIT 5 OFFSET 10" in sql
+
+    @pytest.mark.asyncio
+    async def test_sets_threshold_for_transaction(self):
+        ids = [uuid.uuid4(), uuid.uuid4()]
+        db = MagicMock()
+        db.execute = AsyncMock(
+            side_effect=[MagicMock(), MagicMock(**{"scalars.return_value.all.return_value": ids})]
+        )
+
+        with patch("src.services.ingredient_search.settings") as mock_settings:
+            mock_settings.ingredient_search_threshold = 0.4
+            result = await search_ingredient_ids(db, "melk")
+
+        threshold = compiled(db.execute.await_args_list[0].args[0], literal_binds=True)
+        assert "set_config('pg_trgm.word_similarity_threshold', '0.4', true)" in threshold
+        assert result == ids
+
+
+class TestIngredientSearchEndpoint:
+    def setup_method(self):
+        self.melk = cached_ingredient("Melk", ["lettmelk"])
+        self.tomat = cached_ingredient("Tomat")
+        ingredients = [self.melk, self.tomat]
+        self.catalog = Catalog(
+            version=1,
+            categories={},
+            ingredients=ingredients,
+            ingredients_by_id={i.id: i for i in ingredients},
+        )
+        self.cache = MagicMock()
+        self.cache.get = AsyncMock(return_value=self.catalog)
+        self.db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_catalog_cache] = lambda: self.cache
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_fuzzy_mode_keeps_rank_order(self):
+        ranked = [self.tomat.id, uuid.uuid4(), self.melk.id]  # Middle one not yet cached
+        with patch(
+            "src.api.ingredients.search_ingredient_ids", AsyncMock(return_value=ranked)
+        ) as search:
+            response = self.client.get(
+                "/api/ingredients", params={"search": "tomatt", "mode": "fuzzy", "limit": 3}
+            )
+
+        assert response.status_code == 200
+        assert [i["name"] for i in response.json()] == ["Tomat", "Melk"]
+        search.assert_awaited_once_with(self.db, "tomatt", None, 0, 3)
+
+    def test_contains_mode_matches_aliases(self):
+        response = self.client.get("/api/ingredients", params={"search": "lettm"})
+
+        assert [i["name"] for i in response.json()] == ["Melk"]
+
+    def test_rejects_unknown_mode(self):
+        response = self.client.get("/api/ingredients", params={"search": "x", "mode": "regex"})
+
+        assert response.status_code == 422
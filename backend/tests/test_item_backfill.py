@@ -0,0 +1,251 @@
+"""Tests for the resumable item ingredient backfill."""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_db, get_item_backfill
+from src.db.models import BackfillCheckpoint
+from src.main import app
+from src.services.catalog_cache import Catalog
+from src.services.item_backfill import (
+    BackfillProgress,
+    BackfillRunningError,
+    ItemBackfill,
+    MatchTarget,
+    PoolState,
+    init_worker,
+    load_checkpoint,
+    match_names,
+    pending_items_query,
+    update_values,
+    write_chunk,
+)
+from tests.conftest import cached_ingredient, compiled
+
+
+class FakeSessionContext:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, *_exc):
+        return False
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def partitions(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class TestMatchNames:
+    def setup_method(self):
+        self.melk = MatchTarget(uuid.uuid4(), "Melk", "melk", ["lettmelk"])
+
+    def test_matches_in_worker(self):
+        with patch("src.services.item_backfill._pool_state", PoolState()):
+            init_worker([self.melk])
+            results = match_names(["TINE LETTMELK 1L", "DOPAPIR"])
+
+        assert results == [(self.melk.id, Decimal("0.95")), None]
+
+    def test_requires_init(self):
+        with (
+            patch("src.services.item_backfill._pool_state", PoolState()),
+            pytest.raises(RuntimeError),
+        ):
+            match_names(["MELK"])
+
+
+class TestQueries:
+    def test_pending_items_after_checkpoint(self):
+        sql = compiled(pending_items_query(uuid.uuid4()))
+
+        assert "items.ingredient_id IS NULL" in sql
+        assert "items.id > %(id_1)s::UUID" in sql
+        assert sql.endswith("ORDER BY items.id")
+
+    def test_first_pass_has_no_cursor(self):
+        assert "items.id >" not in compiled(pending_items_query(None))
+
+    def test_update_values_for_matched_rows(self):
+        melk, item_ids = uuid.uuid4(), [uuid.uuid4() for _ in range(3)]
+        rows = [
+            (item_ids[0], "Q MELK 1L", "Melk"),
+            (item_ids[1], "TINE MELK", None),
+            (item_ids[2], "DOPAPIR", None),
+        ]
+        matches = {"Melk": (melk, Decimal("1.0")), "TINE MELK": (melk, Decimal("0.9"))}
+
+        values = update_values(rows, matches)
+
+        assert values == [
+            {"item_id": item_ids[0], "match_id": melk, "confidence": Decimal("1.0")},
+            {"item_id": item_ids[1], "match_id": melk, "confidence": Decimal("0.9")},
+        ]
+
+
+class TestCheckpoint:
+    def setup_method(self):
+        self.db = MagicMock()
+        self.db.flush = AsyncMock()
+        self.db.execute = AsyncMock()
+        self.db.commit = AsyncMock()
+        self.checkpoint = BackfillCheckpoint(
+            job="item_ingredients", last_id=uuid.uuid4(), processed=5000, matched=4100
+        )
+
+    @pytest.mark.asyncio
+    async def test_resumes_interrupted_run(self):
+        self.db.get = AsyncMock(return_value=self.checkpoint)
+
+        checkpoint = await load_checkpoint(self.db)
+
+        assert checkpoint.processed == 5000
+        assert checkpoint.last_id is not None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("restart", [True, False])
+    async def test_new_pass(self, restart):
+        if not restart:
+            self.checkpoint.completed_at = datetime(2026, 1, 1)
+        self.db.get = AsyncMock(return_value=self.checkpoint)
+
+        checkpoint = await load_checkpoint(self.db, restart=restart)
+
+        assert (checkpoint.last_id, checkpoint.processed, checkpoint.completed_at) == (
+            None,
+            0,
+            None,
+        )
+
+    @pytest.mark.asyncio
+    async def test_writes_chunk_and_checkpoint_together(self):
+        last_id = uuid.uuid4()
+        values = [{"item_id": last_id, "match_id": uuid.uuid4(), "confidence": Decimal("1.0")}]
+
+        await write_chunk(self.db, last_id, values, BackfillProgress(processed=10, matched=7))
+
+        (items_update, params), (checkpoint_update,) = [
+            c.args for c in self.db.execute.await_args_list
+        ]
+        sql = compiled(items_update)
+        assert "SET ingredient_id=%(match_id)s::UUID" in sql
+        assert "items.ingredient_id IS NULL" in sql  # Never overwrites a correction
+        assert params == values
+        assert checkpoint_update.table.name == "backfill_checkpoints"
+        self.db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unmatched_chunk_only_moves_checkpoint(self):
+        await write_chunk(self.db, uuid.uuid4(), [], BackfillProgress())
+
+        [(stmt,)] = [c.args for c in self.db.execute.await_args_list]
+        assert stmt.table.name == "backfill_checkpoints"
+
+
+class TestItemBackfillRun:
+    @pytest.mark.asyncio
+    async def test_streams_chunks_and_checkpoints(self):
+        melk = cached_ingredient("Melk", ["lettmelk"])
+        catalog = Catalog(
+            version=1, categories={}, ingredients=[melk], ingredients_by_id={melk.id: melk}
+        )
+        ids = sorted(uuid.uuid4() for _ in range(3))
+        chunks = [
+            [(ids[0], "TINE LETTMELK 1L", None), (ids[1], "DOPAPIR", None)],
+            [(ids[2], "Q MELK", "melk")],
+        ]
+        db = MagicMock()
+        db.get = AsyncMock(return_value=None)
+        db.flush = AsyncMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        reader = MagicMock()
+        reader.stream = AsyncMock(return_value=FakeStream(chunks))
+        factory = MagicMock(side_effect=[FakeSessionContext(db), FakeSessionContext(reader)])
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value=catalog)
+        backfill = ItemBackfill(chunk_size=2, workers=2, session_factory=factory)
+
+        with (
+            patch("src.services.item_backfill.ProcessPoolExecutor", ThreadPoolExecutor),
+            patch("src.services.item_backfill.catalog_cache", cache),
+            patch("src.services.item_backfill._pool_state", PoolState()),
+        ):
+            progress = await backfill.run()
+
+        assert (progress.processed, progress.matched, progress.chunks) == (3, 2, 2)
+        stream_query = reader.stream.await_args.args[0]
+        assert stream_query.get_execution_options()["yield_per"] == 2
+        checkpoints = [
+            c.args[0].compile().params
+            for c in db.execute.await_args_list
+            if len(c.args) == 1 and "last_id" in c.args[0].compile().params
+        ]
+        assert [(p["last_id"], p["processed"]) for p in checkpoints] == [(ids[1], 2), (ids[2], 3)]
+        assert "completed_at" in compiled(db.execute.await_args.args[0])
+
+
+class TestItemBackfillEndpoints:
+    def setup_method(self):
+        self.db = MagicMock()
+        self.checkpoint = BackfillCheckpoint(
+            job="item_ingredients",
+            last_id=uuid.uuid4(),
+            processed=20000,
+            matched=15000,
+            started_at=datetime(2026, 10, 1, 12),
+            updated_at=datetime(2026, 10, 1, 12, 5),
+            completed_at=None,
+        )
+        self.db.get = AsyncMock(return_value=self.checkpoint)
+        self.backfill = MagicMock(running=True, progress=BackfillProgress(run_items=0))
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_item_backfill] = lambda: self.backfill
+        self.client = TestClient(app)
+        self.settings = patch("src.api.deps.settings")
+        self.settings.start().admin_api_key = "key"
+
+    def teardown_method(self):
+        self.settings.stop()
+        app.dependency_overrides.clear()
+
+    def test_start(self):
+        response = self.client.post(
+            "/api/admin/backfill/items", params={"restart": "true"}, headers={"X-Admin-Key": "key"}
+        )
+
+        assert response.status_code == 202
+        self.backfill.start.assert_called_once_with(restart=True)
+        assert response.json()["running"] is True
+
+    def test_already_running(self):
+        self.backfill.start.side_effect = BackfillRunningError("Item backfill already running")
+
+        response = self.client.post("/api/admin/backfill/items", headers={"X-Admin-Key": "key"})
+
+        assert response.status_code == 409
+        assert response.json()["detail"] == "Item backfill already running"
+
+    def test_status(self):
+        self.backfill.running = False
+
+        response = self.client.get("/api/admin/backfill/items", headers={"X-Admin-Key": "key"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["processed"], body["matched"]) == (20000, 15000)
+        assert body["items_per_second"] is None
+        assert body["completed_at"] is None
@@ -0,0 +1,327 @@
+"""Tests for the learned raw name -> ingredient match memory."""
+
+import uuid
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from src.api.deps import get_catalog_cache, get_db, get_match_memory
+from src.main import app
+from src.services.catalog_cache import Catalog
+from src.services.match_memory import (
+    MatchMemory,
+    MemoryEntry,
+    load_remembered,
+    memory_key,
+)
+from tests.conftest import cached_ingredient
+
+HOUSEHOLD = uuid.uuid4()
+
+
+def make_catalog(version=1, ingredients=None):
+    ingredients = ingredients or [
+        cached_ingredient("Melk", ["lettmelk"]),
+        cached_ingredient("Pasta"),
+    ]
+    return Catalog(
+        version=version,
+        categories={},
+        ingredients=ingredients,
+        ingredients_by_id={i.id: i for i in ingredients},
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryKey:
+    def test_normalizes_case_and_spacing(self):
+        assert memory_key("  Tine  lettmelk 1l ") == "TINE LETTMELK 1L"
+
+
+class TestMatchMemory:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.memory = MatchMemory(capacity=3, ttl=60, flush_interval=30, clock=self.clock)
+        self.catalog = make_catalog()
+        self.melk = self.catalog.ingredients[0]
+        self.db = MagicMock()
+        self.db.execute = AsyncMock()
+        self.stored = {}
+        self.row_ids = {}
+
+    async def load(self, _db, keys, _household_id):
+        return {key: self.stored[key] for key in keys if key in self.stored}
+
+    async def store(self, _db, matches, _catalog_version):
+        self.row_ids.update({key: uuid.uuid4() for key in matches})
+        return {key: self.row_ids[key] for key in matches}
+
+    def patched(self):
+        return (
+            patch("src.services.match_memory.load_remembered", AsyncMock(side_effect=self.load)),
+            patch("src.services.match_memory.store_learned", AsyncMock(side_effect=self.store)),
+        )
+
+    @pytest.mark.asyncio
+    async def test_learns_then_serves_from_lru(self):
+        load, store = self.patched()
+        with load as loaded, store as stored:
+            first = await self.memory.match_many(
+                self.db, ["TINE LETTMELK 1L", "tine lettmelk 1l", "DOPAPIR"], self.catalog
+            )
+            second = await self.memory.match_many(
+                self.db, ["TINE LETTMELK 1L", "DOPAPIR"], self.catalog
+            )
+
+        assert first["TINE LETTMELK 1L"].ingredient_id == self.melk.id
+        assert first["tine lettmelk 1l"] == first["TINE LETTMELK 1L"]
+        assert first["DOPAPIR"] is None
+        assert second == {k: first[k] for k in second}
+        loaded.assert_awaited_once()
+        [(_, matches, version)] = [c.args for c in stored.await_args_list]
+        assert list(matches) == ["TINE LETTMELK 1L"]
+        assert version == 1
+        stats = self.memory.stats()
+        assert stats["learned"] == 1
+        assert stats["unmatched"] == 1
+        assert stats["cache_hits"] == 2
+        assert stats["pending_hits"] == 1  # Negative entries have no row to count
+
+    @pytest.mark.asyncio
+    async def test_stored_match_skips_matcher(self):
+        row_id = uuid.uuid4()
+        self.stored["Q MELK"] = MemoryEntry(
+            row_id=row_id,
+            ingredient_id=self.melk.id,
+            confidence=Decimal("1.0"),
+            method="user",
+            catalog_version=None,
+        )
+        self.memory.matcher.match = AsyncMock()
+
+        load, store = self.patched()
+        with load, store:
+            result = await self.memory.match_many(self.db, ["Q MELK"], self.catalog, HOUSEHOLD)
+
+        assert result["Q MELK"].method == "user"
+        assert result["Q MELK"].ingredient_name == "Melk"
+        self.memory.matcher.match.assert_not_awaited()
+        assert self.memory.stats()["db_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_relearns_after_catalog_change(self):
+        load, store = self.patched()
+        with load, store as stored:
+            await self.memory.match_many(self.db, ["PASTA"], self.catalog)
+            self.stored["PASTA"] = MemoryEntry(
+                self.row_ids["PASTA"], self.catalog.ingredients[1].id, Decimal("1.0"), "exact", 1
+            )
+            newer = make_catalog(version=2, ingredients=self.catalog.ingredients)
+            await self.memory.match_many(self.db, ["PASTA"], newer)
+
+        assert stored.await_count == 2
+        assert stored.await_args.args[2] == 2
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_and_evict(self):
+        load, store = self.patched()
+        with load as loaded, store:
+            await self.memory.match_many(self.db, ["A", "B", "C", "D"], self.catalog)
+            assert self.memory.stats()["cached"] == 3  # Capacity
+
+            await self.memory.match_many(self.db, ["D"], self.catalog)
+            assert loaded.await_count == 1
+
+            self.clock.now += 61
+            await self.memory.match_many(self.db, ["D"], self.catalog)
+
+        assert loaded.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_flushes_hits_in_one_statement(self):
+        load, store = self.patched()
+        with load, store:
+            await self.memory.match_many(self.db, ["MELK", "PASTA"], self.catalog)
+            for _ in range(2):
+                await self.memory.match_many(self.db, ["MELK", "PASTA"], self.catalog)
+            self.db.execute.assert_not_awaited()
+
+            self.clock.now += 30
+            await self.memory.match_many(self.db, ["MELK"], self.catalog)
+
+        stmt, params = self.db.execute.await_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "SET hit_count=(ingredient_match_memory.hit_count + %(hits)s::BIGINT)" in sql
+        assert sorted(p["hits"] for p in params) == [2, 3]
+        assert self.memory.stats()["pending_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_global_correction_drops_cached_entries(self):
+        load, store = self.patched()
+        with load, store:
+            await self.memory.match_many(self.db, ["Q MELK"], self.catalog)
+            await self.memory.match_many(self.db, ["Q MELK"], self.catalog, HOUSEHOLD)
+
+        with patch("src.services.match_memory.store_correction") as correction:
+            key = await self.memory.remember_global(self.db, "q melk", self.melk.id)
+
+        assert key == "Q MELK"
+        correction.assert_awaited_once_with(self.db, "Q MELK", self.melk.id, None)
+        assert self.memory.stats()["cached"] == 0
+
+
+class TestLoadRemembered:
+    @pytest.mark.asyncio
+    async def test_household_correction_wins(self):
+        melk, lettmelk = uuid.uuid4(), uuid.uuid4()
+        rows = [
+            MagicMock(raw_key="Q MELK", household_id=HOUSEHOLD, ingredient_id=lettmelk),
+            MagicMock(raw_key="Q MELK", household_id=None, ingredient_id=melk),
+        ]
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": rows}))
+
+        found = await load_remembered(db, ["Q MELK"], HOUSEHOLD)
+
+        assert found["Q MELK"].ingredient_id == lettmelk
+        sql = str(db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "household_id IS NULL OR ingredient_match_memory.household_id" in sql
+
+
+class TestMatchMemoryEndpoints:
+    def setup_method(self):
+        self.catalog = make_catalog()
+        self.cache = MagicMock()
+        self.cache.get = AsyncMock(return_value=self.catalog)
+        self.memory = MagicMock()
+        self.memory.remember = AsyncMock()
+        self.memory.remember_global = AsyncMock(return_value="Q MELK")
+        self.db = MagicMock()
+        self.db.flush = AsyncMock()
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_catalog_cache] = lambda: self.cache
+        app.dependency_overrides[get_match_memory] = lambda: self.memory
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_correction_updates_item_and_memory(self):
+        item = MagicMock(
+            id=uuid.uuid4(),
+            receipt_id=uuid.uuid4(),
+            raw_name="Q MELK 1L",
+            canonical_name="Q Melk",
+        )
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(**{"one_or_none.return_value": (item, HOUSEHOLD)})
+        )
+        melk_id = self.catalog.ingredients[0].id
+
+        response = self.client.put(
+            f"/api/receipts/{item.receipt_id}/items/{item.id}/ingredient",
+            json={"ingredient_id": str(melk_id)},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["ingredient_id"] == str(melk_id)
+        assert item.ingredient_confidence == Decimal("1.0")
+        self.memory.remember.assert_awaited_once_with(self.db, "Q Melk", melk_id, HOUSEHOLD)
+
+    def test_correction_without_household_needs_one_from_request(self):
+        item = MagicMock(id=uuid.uuid4(), receipt_id=uuid.uuid4(), canonical_name="Q Melk")
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(**{"one_or_none.return_value": (item, None)})
+        )
+        melk_id = self.catalog.ingredients[0].id
+        url = f"/api/receipts/{item.receipt_id}/items/{item.id}/ingredient"
+
+        refused = self.client.put(url, json={"ingredient_id": str(melk_id)})
+        response = self.client.put(
+            url, params={"household_id": str(HOUSEHOLD)}, json={"ingredient_id": str(melk_id)}
+        )
+
+        assert refused.status_code == 400
+        assert response.status_code == 200
+        # Never a global correction
+        self.memory.remember.assert_awaited_once_with(self.db, "Q Melk", melk_id, HOUSEHOLD)
+        sql = str(self.db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "coalesce(receipts.household_id, items.household_id" in sql
+        assert "inventory_lots.source_id = receipts.id" in sql
+
+    def test_correction_for_another_household(self):
+        item = MagicMock(id=uuid.uuid4(), receipt_id=uuid.uuid4())
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(**{"one_or_none.return_value": (item, HOUSEHOLD)})
+        )
+
+        response = self.client.put(
+            f"/api/receipts/{item.receipt_id}/items/{item.id}/ingredient",
+            params={"household_id": str(uuid.uuid4())},
+            json={"ingredient_id": str(self.catalog.ingredients[0].id)},
+        )
+
+        assert response.status_code == 409
+        self.memory.remember.assert_not_awaited()
+
+    def test_correction_to_unknown_ingredient(self):
+        item = MagicMock(id=uuid.uuid4(), receipt_id=uuid.uuid4())
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(**{"one_or_none.return_value": (item, None)})
+        )
+
+        response = self.client.put(
+            f"/api/receipts/{item.receipt_id}/items/{item.id}/ingredient",
+            json={"ingredient_id": str(uuid.uuid4())},
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Ingredient not found"
+        self.memory.remember.assert_not_awaited()
+
+    def test_admin_global_correction(self):
+        melk_id = self.catalog.ingredients[0].id
+        with patch("src.api.deps.settings") as mock_settings:
+            mock_settings.admin_api_key = "key"
+            response = self.client.put(
+                "/api/admin/match-memory/corrections",
+                headers={"X-Admin-Key": "key"},
+                json={"raw_name": "q melk", "ingredient_id": str(melk_id)},
+            )
+            unauthorized = self.client.put(
+                "/api/admin/match-memory/corrections",
+                json={"raw_name": "q melk", "ingredient_id": str(melk_id)},
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {"raw_key": "Q MELK", "ingredient_id": str(melk_id)}
+        self.memory.remember_global.assert_awaited_once_with(self.db, "q melk", melk_id)
+        assert unauthorized.status_code == 422
+
+    def test_admin_stats(self):
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"one.return_value": (120, 4, 9000)}))
+        self.memory.stats.return_value = {
+            "cached": 50,
+            "cache_hits": 700,
+            "db_hits": 40,
+            "learned": 60,
+            "unmatched": 10,
+            "pending_hits": 12,
+        }
+        with patch("src.api.deps.settings") as mock_settings:
+            mock_settings.admin_api_key = "key"
+            response = self.client.get("/api/admin/match-memory", headers={"X-Admin-Key": "key"})
+
+        assert response.status_code == 200
+        assert response.json()["total_hits"] == 9000
+        assert response.json()["cache_hits"] == 700
@@ -115,7 +115,7 @@ class TestCalculateCostFifo:
             {
                 "id": uuid4(),
                 "quantity": Decimal("100"),
-                "unit_cost": Decimal("10.00"),
+                "unit_cost": Decimal("0.10"),
                 "purchase_date": datetime.now() - timedelta(days=1),
             },
         ]
@@ -125,7 +125,7 @@ class TestCalculateCostFifo:
             required_quantity=Decimal("50"),
         )
 
-        # 50g at 10kr/100g = 5kr
+        # 50g at 0.10kr/g = 5kr
         assert result["total_cost"] == Decimal("5.00")
         assert len(result["consumed"]) == 1
         assert result["consumed"][0]["quantity"] == Decimal("50")
@@ -138,18 +138,18 @@ class TestCalculateCostFifo:
             {
                 "id": lot_id_1,
                 "quantity": Decimal("100"),
-                "unit_cost": Decimal("10.00"),
+                "unit_cost": Decimal("0.10"),
                 "purchase_date": datetime.now() - timedelta(days=2),  # Older
             },
             {
                 "id": lot_id_2,
                 "quantity": Decimal("100"),
-                "unit_cost": Decimal("15.00"),
+                "unit_cost": Decimal("0.15"),
                 "purchase_date": datetime.now() - timedelta(days=1),  # Newer
             },
         ]
 
-        # Need 150g - take 100g @ 10kr + 50g @ 15kr
+        # Need 150g - take 100g @ 0.10kr/g + 50g @ 0.15kr/g
         result = self.service.calculate_cost_fifo(
             lots=lots,
             required_quantity=Decimal("150"),
@@ -171,7 +171,7 @@ class TestCalculateCostFifo:
             {
                 "id": uuid4(),
                 "quantity": Decimal("50"),
-                "unit_cost": Decimal("10.00"),
+                "unit_cost": Decimal("0.20"),
                 "purchase_date": datetime.now(),
             },
         ]
@@ -191,7 +191,7 @@ class TestCalculateCostFifo:
             {
                 "id": uuid4(),
                 "quantity": Decimal("100"),
-                "unit_cost": Decimal("25.00"),
+                "unit_cost": Decimal("0.25"),
                 "purchase_date": datetime.now(),
             },
         ]
@@ -224,13 +224,13 @@ class TestCalculateCostFifo:
             {
                 "id": new_lot_id,
                 "quantity": Decimal("100"),
-                "unit_cost": Decimal("20.00"),
+                "unit_cost": Decimal("0.20"),
                 "purchase_date": datetime.now() - timedelta(days=1),
             },
             {
                 "id": old_lot_id,
                 "quantity": Decimal("100"),
-                "unit_cost": Decimal("10.00"),
+                "unit_cost": Decimal("0.10"),
                 "purchase_date": datetime.now() - timedelta(days=5),  # Older
             },
         ]
@@ -0,0 +1,220 @@
+"""Tests for running OCR engines off the event loop."""
+
+import asyncio
+import pickle
+import sys
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from src.api.deps import get_db, get_ocr_service
+from src.main import app
+from src.services.ocr_executor import OCRExecutor, OCRTimeoutError
+from src.services.textract_ocr import TextractOCRService, process_client
+
+TEXTRACT_RESPONSE = {
+    "Blocks": [
+        {"BlockType": "PAGE"},
+        {"BlockType": "LINE", "Text": "REMA 1000", "Confidence": 99.5},
+        {"BlockType": "LINE", "Text": "MELK LETT 1L 21,90", "Confidence": 95.0},
+    ]
+}
+
+
+class ThrottlingError(Exception):
+    """Shaped like botocore's ClientError."""
+
+    response = {"Error": {"Code": "ThrottlingException"}}
+
+
+class StubTextractClient:
+    """Blocking stand-in for the boto3 Textract client that simulates latency."""
+
+    def __init__(self, latency=0.0, failures=()):
+        self.latency = latency
+        self.failures = list(failures)
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def detect_document_text(self, Document):  # noqa: N803, ARG002 - boto3 keyword
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(self.latency)
+            if self.failures:
+                raise self.failures.pop(0)
+            return TEXTRACT_RESPONSE
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "receipt.jpg"
+    path.write_bytes(b"\xff\xd8\xff\xe0receipt")
+    return path
+
+
+def make_service(client, **executor_kwargs):
+    executor_kwargs.setdefault("backoff", 0)
+    return TextractOCRService(client=client, executor=OCRExecutor(name="OCR", **executor_kwargs))
+
+
+class TestTextractOCRService:
+    @pytest.mark.asyncio
+    async def test_extracts_lines(self, image):
+        service = make_service(StubTextractClient())
+
+        result = await service.extract_text(image)
+
+        assert result["lines"] == ["REMA 1000", "MELK LETT 1L 21,90"]
+        assert result["blocks"][0] == {"text": "REMA 1000", "confidence": 0.995}
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, image):
+        """Blocking Textract calls must not stall other coroutines."""
+        service = make_service(StubTextractClient(latency=0.2))
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            for _ in range(20):
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        await asyncio.gather(ticker(), *(service.extract_text(image) for _ in range(4)))
+
+        assert max(gaps) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped(self, image):
+        client = StubTextractClient(latency=0.05)
+        service = make_service(client, max_concurrency=2)
+
+        await asyncio.gather(*(service.extract_text(image) for _ in range(6)))
+
+        assert client.calls == 6
+        assert client.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_times_out(self, image):
+        service = make_service(StubTextractClient(latency=0.3), timeout=0.05, max_retries=0)
+
+        with pytest.raises(OCRTimeoutError, match="OCR timed out"):
+            await service.extract_text(image)
+
+    @pytest.mark.asyncio
+    async def test_retries_throttling(self, image):
+        client = StubTextractClient(failures=[ThrottlingError(), ThrottlingError()])
+        service = make_service(client, max_retries=2)
+
+        result = await service.extract_text(image)
+
+        assert client.calls == 3
+        assert result["lines"][0] == "REMA 1000"
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, image):
+        client = StubTextractClient(failures=[ThrottlingError()] * 3)
+        service = make_service(client, max_retries=1)
+
+        with pytest.raises(ThrottlingError):
+            await service.extract_text(image)
+        assert client.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_other_errors(self, image):
+        client = StubTextractClient(failures=[ValueError("bad image")])
+        service = make_service(client, max_retries=2)
+
+        with pytest.raises(ValueError, match="bad image"):
+            await service.extract_text(image)
+        assert client.calls == 1
+
+    def test_pickles_without_client(self):
+        """Process pool workers get a copy of the service without the client."""
+        service = make_service(StubTextractClient())
+
+        copy = pickle.loads(pickle.dumps(service))  # noqa: S301 - round-trip of our own object
+
+        assert copy._client is None
+
+    def test_unpickled_copies_share_the_process_client(self, image):
+        """Each pooled call unpickles a new copy; the worker's client outlives it."""
+        client = StubTextractClient()
+        boto3 = MagicMock(**{"client.return_value": client})
+        process_client.cache_clear()
+        try:
+            with patch.dict(sys.modules, {"boto3": boto3}):
+                for _ in range(3):
+                    copy = pickle.loads(pickle.dumps(make_service(StubTextractClient())))  # noqa: S301
+                    copy._detect_text(image)
+        finally:
+            process_client.cache_clear()
+
+        boto3.client.assert_called_once_with("textract")
+        assert client.calls == 3
+
+
+def test_rejects_unknown_executor_kind():
+    with pytest.raises(ValueError, match="Unknown OCR executor"):
+        OCRExecutor(name="OCR", kind="fiber")
+
+
+@pytest.mark.asyncio
+async def test_other_endpoints_respond_during_ocr(tmp_path):
+    """Health checks are served while a slow Textract upload is in flight."""
+    service = make_service(StubTextractClient(latency=0.3))
+    db = MagicMock()
+    db.commit = AsyncMock()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_ocr_service] = lambda: service
+    finished = {}
+
+    async def timed(name, request):
+        await request
+        finished[name] = time.perf_counter()
+
+    try:
+        with (
+            patch("src.api.upload.settings") as mock_settings,
+            patch("src.api.upload.load_category_map", AsyncMock(return_value={})),
+            patch("src.api.upload.find_receipts_by_image", AsyncMock(return_value={})),
+            patch("src.api.upload.load_cached_ocr", AsyncMock(return_value={})),
+            patch("src.api.upload.cache_ocr_results", AsyncMock()),
+            patch(
+                "src.api.upload.insert_receipts",
+                AsyncMock(
+                    side_effect=lambda _db, rows, _c: [MagicMock(id=r["id"]) for r, _ in rows]
+                ),
+            ),
+        ):
+            mock_settings.upload_dir = str(tmp_path)
+            mock_settings.max_upload_bytes = 1024
+            mock_settings.batch_upload_concurrency = 4
+            mock_settings.batch_upload_max_files = 10
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                files = [("files", ("a.jpg", b"\xff\xd8\xff\xe0slow", "image/jpeg"))]
+                upload = client.post("/api/receipts/upload/batch", files=files)
+
+                async def health():
+                    await asyncio.sleep(0.05)
+                    response = await client.get("/health")
+                    assert response.status_code == 200
+
+                await asyncio.gather(timed("upload", upload), timed("health", health()))
+    finally:
+        app.dependency_overrides.clear()
+
+    assert finished["health"] < finished["upload"] - 0.1
@@ -0,0 +1,87 @@
+"""Tests for OCR line parsing."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from src.services.parser import classify_line, normalize_name, parse_lines
+
+
+class TestNormalizeName:
+    def test_expands_whole_word_abbreviations(self):
+        assert normalize_name(" mel lett ") == "MELK LETT"
+        assert normalize_name("KYL FILET SMR") == "KYLLING FILET SMØR"
+
+    def test_leaves_abbreviations_inside_words(self):
+        assert normalize_name("MELIS") == "MELIS"
+
+
+class TestClassifyLine:
+    def test_item_line(self):
+        result = classify_line("TINE LETTMELK 1L 18,90")
+
+        assert result.item.raw_name == "TINE LETTMELK 1L"
+        assert result.item.total_price == Decimal("18.90")
+        assert result.item.canonical_name == "TINE LETTMELK 1L"
+        assert result.merchant is None
+
+    def test_line_can_have_several_kinds(self):
+        result = classify_line("Rema 1000 15.01.2025 VISA 259,80")
+
+        assert result.merchant == "REMA 1000"
+        assert result.date == "15.01.2025"
+        assert result.is_payment is True
+        assert result.item.total_price == Decimal("259.80")
+
+    def test_total_line_is_not_an_item(self):
+        result = classify_line("TOTAL 259,80")
+
+        assert result.is_total is True
+        assert result.item is None
+
+    def test_earlier_listed_merchant_wins(self):
+        assert classify_line("SPAR hos KIWI").merchant == "KIWI"
+
+    def test_pant_with_quantity(self):
+        item = classify_line("PANT 4 X 2,00 8,00").item
+
+        assert item.is_pant is True
+        assert item.quantity == Decimal("4")
+        assert item.unit_price == Decimal("2.00")
+        assert item.canonical_name is None
+
+    def test_discount(self):
+        item = classify_line("RABATT LEVERPOSTEI -10,00").item
+
+        assert item.discount_amount == Decimal("10.00")
+        assert item.canonical_name is None
+
+
+class TestParseLines:
+    def test_parses_receipt(self):
+        lines = [
+            "KIWI",
+            "Storgata 1, Oslo",
+            "15.01.2025 kl 14:32 Kasse",
+            "MEL LETT 1L 21,90",
+            "PANT 1 X 2,50 2,50",
+            "RABATT -5,00",
+            "TOTAL 19,40",
+            "BETALT MED VISA",
+        ]
+
+        receipt = parse_lines(lines)
+
+        assert receipt.merchant_name == "KIWI"
+        assert receipt.store_location == "Storgata 1, Oslo"
+        assert receipt.purchase_date == datetime(2025, 1, 15)
+        assert receipt.payment_method == "BETALT MED VISA"
+        assert [i.raw_name for i in receipt.items] == ["MEL LETT 1L", "PANT 1 X 2,50", "RABATT"]
+        assert receipt.items[0].canonical_name == "MELK LETT 1L"
+        assert receipt.total_amount == Decimal("19.40")
+
+    def test_no_items(self):
+        receipt = parse_lines(["KIWI", "", "TOTAL 0,00"])
+
+        assert receipt.merchant_name == "KIWI"
+        assert receipt.items == []
+        assert receipt.total_amount == Decimal("0.00")
@@ -0,0 +1,86 @@
+"""Tests for compressed raw OCR storage."""
+
+import json
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_db
+from src.main import app
+from src.services.mock_ocr import MockOCRService
+from src.services.raw_ocr import ENCODING, compressed_ocr, decompress_ocr_json, load_ocr_json
+
+
+def ocr_result():
+    fixture = MockOCRService.FIXTURES[0]
+    lines = [f"{name} {price}" for name, price in fixture["items"]] * 20
+    return {
+        "lines": lines,
+        "blocks": [{"text": line, "confidence": 0.99} for line in lines],
+        "raw": {"merchant": "Kiwi Grünerløkka"},
+    }
+
+
+class TestCompressedOCR:
+    def test_round_trip(self):
+        result = ocr_result()
+
+        row = compressed_ocr(result)
+
+        assert row["encoding"] == ENCODING
+        assert json.loads(decompress_ocr_json(row["encoding"], row["data"])) == result
+        assert load_ocr_json(row["encoding"], row["data"]) == result
+
+    def test_compresses(self):
+        row = compressed_ocr(ocr_result())
+
+        assert len(row["data"]) * 5 < row["raw_size"]
+
+    def test_unknown_encoding(self):
+        with pytest.raises(ValueError, match="Unknown raw OCR encoding"):
+            decompress_ocr_json("brotli", b"")
+
+
+class TestGetReceiptOCR:
+    def setup_method(self):
+        self.db = MagicMock()
+        # Rows for the OCR cache lookup, then the legacy receipt_ocr lookup
+        self.rows = [None, None]
+        self.db.execute = AsyncMock(
+            side_effect=lambda _stmt: MagicMock(**{"one_or_none.return_value": self.rows.pop(0)})
+        )
+        app.dependency_overrides[get_db] = lambda: self.db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_returns_cached_json(self):
+        result = ocr_result()
+        row = compressed_ocr(result)
+        self.rows[0] = MagicMock(encoding=row["encoding"], data=row["data"])
+
+        response = self.client.get(f"/api/receipts/{uuid.uuid4()}/ocr")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == result
+        assert self.db.execute.await_count == 1
+
+    def test_falls_back_to_receipt_ocr(self):
+        result = ocr_result()
+        row = compressed_ocr(result)
+        self.rows[1] = MagicMock(encoding=row["encoding"], data=row["data"])
+
+        response = self.client.get(f"/api/receipts/{uuid.uuid4()}/ocr")
+
+        assert response.status_code == 200
+        assert response.json() == result
+
+    def test_missing(self):
+        response = self.client.get(f"/api/receipts/{uuid.uuid4()}/ocr")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Raw OCR not found"
@@ -0,0 +1,205 @@
+"""Tests for building and bulk-inserting receipt rows."""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.schemas.receipt import ReceiptResponse
+from src.services.image_store import StoredImage
+from src.services.parser import ParsedItem, ParsedReceipt
+from src.services.raw_ocr import ENCODING, compressed_ocr
+from src.services.receipt_ingestion import (
+    build_receipt_rows,
+    cache_ocr_results,
+    insert_receipts,
+    load_cached_ocr,
+)
+from tests.conftest import compiled
+
+CREATED = datetime(2025, 1, 15, 14, 35)
+
+
+def parsed_item(raw_name, price):
+    return ParsedItem(
+        raw_name=raw_name,
+        canonical_name=raw_name,
+        quantity=Decimal("1"),
+        unit=None,
+        unit_price=Decimal(price),
+        total_price=Decimal(price),
+        is_pant=False,
+        discount_amount=Decimal("0"),
+    )
+
+
+def parsed_receipt(*items):
+    return ParsedReceipt(
+        merchant_name="REMA 1000",
+        store_location="Oslo",
+        purchase_date=datetime(2025, 1, 15),
+        total_amount=sum((i.total_price for i in items), Decimal("0")),
+        currency="NOK",
+        payment_method="VISA",
+        items=list(items),
+    )
+
+
+def category(name):
+    cat = MagicMock()
+    cat.id = uuid.uuid4()
+    cat.name = name
+    cat.icon = None
+    cat.color = "#E3F2FD"
+    return cat
+
+
+def returning_rows(rows):
+    """Result whose rows look like INSERT ... RETURNING output."""
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+class FakeSession:
+    """Echoes inserted values back as RETURNING rows, recording each statement."""
+
+    def __init__(self, conflicting=()):
+        self.conflicting = set(conflicting)  # Image hashes a concurrent upload inserted
+        self.statements = []
+        self.execute = AsyncMock(side_effect=self._execute)
+
+    async def _execute(self, stmt, params=()):
+        self.statements.append((stmt.table.name, params))
+        if stmt.table.name == "receipts":
+            rows = [
+                MagicMock(id=p["id"], created_at=CREATED, updated_at=CREATED)
+                for p in params
+                if p["image_sha256"] not in self.conflicting
+            ]
+        else:
+            rows = [MagicMock(_mapping=dict(p)) for p in params]
+        return returning_rows(rows)
+
+
+@pytest.fixture
+def image():
+    return StoredImage(path=Path("uploads/ab/abc.jpg"), sha256="abc", size=10, image_type="jpeg")
+
+
+class TestBuildReceiptRows:
+    def test_categorizes_items(self, image):
+        meieri = category("Meieri")
+        parsed = parsed_receipt(parsed_item("MELK LETT 1L", "21.90"), parsed_item("XYZ", "5.00"))
+
+        receipt, items = build_receipt_rows(parsed, image, {"meieri": meieri})
+
+        assert receipt["image_sha256"] == "abc"
+        assert [i["receipt_id"] for i in items] == [receipt["id"], receipt["id"]]
+        assert {i["purchase_date"] for i in items} == {receipt["purchase_date"]}
+        assert [i["category_id"] for i in items] == [meieri.id, None]
+
+
+class TestInsertReceipts:
+    @pytest.mark.asyncio
+    async def test_builds_responses_without_reload(self, image):
+        meieri = category("Meieri")
+        categories = {"meieri": meieri}
+        first = build_receipt_rows(
+            parsed_receipt(parsed_item("MELK LETT 1L", "21.90")), image, categories
+        )
+        second = build_receipt_rows(
+            parsed_receipt(parsed_item("XYZ", "5.00"), parsed_item("OST", "89.90")),
+            image,
+            categories,
+        )
+        db = FakeSession()
+
+        responses = await insert_receipts(db, [first, second], categories)
+
+        # One INSERT each for all receipts, all items and the spend rollup; raw
+        # OCR stays in the OCR cache, and receipts without a household bump no
+        # data version
+        assert [(table, len(params)) for table, params in db.statements] == [
+            ("receipts", 2),
+            ("items", 3),
+            ("daily_spend", 0),
+        ]
+        assert [r.id for r in responses] == [first[0]["id"], second[0]["id"]]
+        assert responses[0].created_at == CREATED
+        assert responses[0].items[0].category.name == "Meieri"
+        assert [i.raw_name for i in responses[1].items] == ["XYZ", "OST"]
+        assert responses[1].items[0].category is None
+
+    @pytest.mark.asyncio
+    async def test_image_inserted_concurrently_resolves_to_existing_receipt(self, image):
+        other = StoredImage(
+            path=Path("uploads/de/def.jpg"), sha256="def", size=10, image_type="jpeg"
+        )
+        raced = build_receipt_rows(parsed_receipt(parsed_item("OST", "89.90")), image, {})
+        fresh = build_receipt_rows(parsed_receipt(parsed_item("XYZ", "5.00")), other, {})
+        existing = ReceiptResponse.model_validate(
+            {**raced[0], "id": uuid.uuid4(), "created_at": CREATED, "updated_at": CREATED}
+        )
+        db = FakeSession(conflicting={"abc"})
+
+        with (
+            patch(
+                "src.services.receipt_ingestion.find_receipts_by_image",
+                AsyncMock(return_value={"abc": existing.id}),
+            ) as find,
+            patch("src.services.receipt_ingestion.load_receipt", AsyncMock(return_value=existing)),
+        ):
+            responses = await insert_receipts(db, [raced, fresh], {})
+
+        assert [r.id for r in responses] == [existing.id, fresh[0]["id"]]
+        assert find.await_args.args[1] == ["abc"]
+        # Only the inserted receipt's items are written
+        assert [(table, len(params)) for table, params in db.statements[1:2]] == [("items", 1)]
+        assert db.statements[1][1][0]["receipt_id"] == fresh[0]["id"]
+
+    @pytest.mark.asyncio
+    async def test_receipt_without_items_skips_item_insert(self, image):
+        rows = build_receipt_rows(parsed_receipt(), image, {})
+        db = FakeSession()
+
+        [response] = await insert_receipts(db, [rows], {})
+
+        assert [table for table, _ in db.statements] == ["receipts", "daily_spend"]
+        assert response.items == []
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_insert(self):
+        db = FakeSession()
+
+        assert await insert_receipts(db, [], {}) == []
+        assert db.statements == []
+
+
+class TestOCRCache:
+    def setup_method(self):
+        self.ocr_service = MagicMock(engine="textract", engine_version="1")
+
+    @pytest.mark.asyncio
+    async def test_stores_results_compressed(self):
+        db = MagicMock(execute=AsyncMock())
+        result = {"lines": ["MELK LETT 1L 21.90"] * 50}
+
+        await cache_ocr_results(db, self.ocr_service, {"abc": result})
+
+        params = db.execute.await_args.args[0].compile(dialect=postgresql.dialect()).params
+        assert params["encoding_m0"] == ENCODING
+        assert params["raw_size_m0"] > len(params["data_m0"])
+        assert "ON CONFLICT" in compiled(db.execute.await_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_loads_decompressed_results(self):
+        result = {"lines": ["MELK LETT 1L 21.90"]}
+        row = MagicMock(image_sha256="abc", **compressed_ocr(result))
+        db = MagicMock(execute=AsyncMock(return_value=MagicMock(**{"all.return_value": [row]})))
+
+        assert await load_cached_ocr(db, self.ocr_service, ["abc"]) == {"abc": result}
@@ -0,0 +1,344 @@
+"""Tests for turning receipt items into inventory lots."""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_db
+from src.main import app
+from src.schemas.inventory import ReceiptInventoryResult
+from src.schemas.item import CategoryResponse
+from src.services.catalog_cache import Catalog
+from src.services.ingredient_matcher import IngredientMatcher
+from src.services.receipt_inventory import (
+    PendingItem,
+    PendingReceipt,
+    build_inventory_rows,
+    extract_size,
+    ingest_receipts,
+    item_quantity,
+)
+from src.services.unit_converter import UnitConverter
+from tests.conftest import cached_ingredient
+
+HOUSEHOLD = uuid.uuid4()
+
+
+def category(name):
+    return CategoryResponse(id=uuid.uuid4(), name=name, icon=None, color=None)
+
+
+def make_catalog():
+    meieri, frossen = category("Meieri"), category("Frossen")
+    ingredients = [
+        cached_ingredient("Melk", ["lettmelk"], category=meieri),
+        cached_ingredient("Pizza", category=frossen),
+        cached_ingredient("Pasta"),
+    ]
+    return Catalog(
+        version=1,
+        categories={"frossen": frossen, "meieri": meieri},
+        ingredients=ingredients,
+        ingredients_by_id={i.id: i for i in ingredients},
+    )
+
+
+def item(raw_name, price, receipt_id=None, **overrides):
+    values = {
+        "id": uuid.uuid4(),
+        "receipt_id": receipt_id or uuid.uuid4(),
+        "raw_name": raw_name,
+        "canonical_name": None,
+        "quantity": Decimal("1"),
+        "unit": None,
+        "total_price": Decimal(price),
+        "discount_amount": Decimal("0"),
+        "category_id": None,
+        "is_pant": False,
+        "skip_inventory": False,
+        "inventory_lot_id": None,
+    }
+    return PendingItem(**{**values, **overrides})
+
+
+def receipt(*items):
+    return PendingReceipt(
+        id=uuid.uuid4(),
+        household_id=HOUSEHOLD,
+        purchase_date=datetime(2025, 1, 15),
+        currency="NOK",
+        items=list(items),
+    )
+
+
+class TestExtractSize:
+    @pytest.mark.parametrize(
+        ("name", "expected"),
+        [
+            ("TINE LETTMELK 1L", (Decimal("1"), "l")),
+            ("PASTA 500G", (Decimal("500"), "g")),
+            ("JUICE 1,5 L", (Decimal("1.5"), "l")),
+            ("COLA 4X0.5L", (Decimal("2.0"), "l")),
+            ("EGG 12STK", (Decimal("12"), "stk")),
+            ("KJØTTDEIG 400G 2X", (Decimal("400"), "g")),
+        ],
+    )
+    def test_sizes(self, name, expected):
+        assert extract_size(name) == expected
+
+    @pytest.mark.parametrize("name", ["BANANER", "MELK 3.5%", "B12 VITAMIN", "0G"])
+    def test_no_size(self, name):
+        assert extract_size(name) is None
+
+
+class TestItemQuantity:
+    def setup_method(self):
+        self.converter = UnitConverter()
+
+    def test_size_times_packages(self):
+        line = item("TINE LETTMELK 1L", "21.90", quantity=Decimal("2"))
+
+        assert item_quantity(line, self.converter) == (Decimal("2000"), "ml")
+
+    def test_explicit_unit_wins(self):
+        line = item("EPLER 1KG", "35.00", quantity=Decimal("1.234"), unit="kg")
+
+        assert item_quantity(line, self.converter) == (Decimal("1234.000"), "g")
+
+    def test_unknown_unit_falls_back_to_name(self):
+        line = item("PASTA 500G", "19.90", unit="pose")
+
+        assert item_quantity(line, self.converter) == (Decimal("500"), "g")
+
+    def test_pieces_without_size(self):
+        line = item("AVOKADO", "15.00", quantity=Decimal("3"))
+
+        assert item_quantity(line, self.converter) == (Decimal("3"), "pcs")
+
+
+class TestBuildInventoryRows:
+    def setup_method(self):
+        self.catalog = make_catalog()
+        self.matcher = IngredientMatcher()
+
+    async def rows_for(self, *receipts):
+        matches = {
+            i.match_name: await self.matcher.match(i.match_name, self.catalog.ingredient_index)
+            for r in receipts
+            for i in r.items
+        }
+        return build_inventory_rows(receipts, matches, self.catalog, UnitConverter())
+
+    @pytest.mark.asyncio
+    async def test_creates_lot_event_and_item_link(self):
+        line = item("TINE LETTMELK 1L", "21.90", quantity=Decimal("2"))
+        purchase = receipt(line)
+
+        rows = await self.rows_for(purchase)
+
+        [lot] = rows.lots
+        assert lot["household_id"] == HOUSEHOLD
+        assert lot["ingredient_id"] == self.catalog.ingredients[0].id
+        assert (lot["quantity"], lot["unit"]) == (Decimal("2000"), "ml")
+        assert lot["location"] == "fridge"
+        assert lot["unit_cost"] == Decimal("0.010950")
+        assert lot["total_cost"] == Decimal("21.90")
+        assert lot["source_type"] == "receipt"
+        assert lot["source_id"] == purchase.id
+        assert rows.events == [
+            {
+                "id": rows.events[0]["id"],
+                "lot_id": lot["id"],
+                "event_type": "add",
+                "quantity_delta": Decimal("2000"),
+                "unit": "ml",
+                "reason": "receipt",
+            }
+        ]
+        assert rows.items == [
+            {
+                "id": line.id,
+                "ingredient_id": lot["ingredient_id"],
+                "ingredient_confidence": lot["confidence"],
+                "inventory_lot_id": lot["id"],
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bulk_item_keeps_sub_cent_unit_cost(self):
+        rows = await self.rows_for(receipt(item("PASTA 5KG", "10.00")))
+
+        [lot] = rows.lots
+        assert (lot["quantity"], lot["unit"]) == (Decimal("5000"), "g")
+        assert lot["unit_cost"] == Decimal("0.002000")
+        assert lot["quantity"] * lot["unit_cost"] == lot["total_cost"]
+
+    @pytest.mark.asyncio
+    async def test_location_from_ingredient_category(self):
+        rows = await self.rows_for(receipt(item("FRYST PIZZA", "49.90")))
+
+        assert rows.lots[0]["location"] == "freezer"
+
+    @pytest.mark.asyncio
+    async def test_skips_non_stock_lines(self):
+        rows = await self.rows_for(
+            receipt(
+                item("PANT", "3.00", is_pant=True),
+                item("RABATT PASTA", "5.00", discount_amount=Decimal("5.00")),
+                item("PASTA 500G", "19.90", skip_inventory=True),
+                item("PASTA 1KG", "29.90", inventory_lot_id=uuid.uuid4()),
+                item("DOPAPIR", "59.90"),
+            )
+        )
+
+        assert rows.lots == rows.events == rows.items == []
+
+
+class TestIngestReceipts:
+    @pytest.mark.asyncio
+    async def test_writes_batch_in_bulk(self):
+        purchase = receipt(item("PASTA 500G", "19.90"), item("DOPAPIR", "59.90"))
+        db = MagicMock()
+        db.execute = AsyncMock()
+        catalog = make_catalog()
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value=catalog)
+        memory = MagicMock()
+        memory.match_many = AsyncMock(
+            return_value={
+                "PASTA 500G": await IngredientMatcher().match("PASTA 500G", catalog.ingredients),
+                "DOPAPIR": None,
+            }
+        )
+
+        with (
+            patch(
+                "src.services.receipt_inventory.load_pending_receipts",
+                AsyncMock(return_value=[purchase]),
+            ),
+            patch("src.services.receipt_inventory.catalog_cache", cache),
+            patch("src.services.receipt_inventory.match_memory", memory),
+        ):
+            result = await ingest_receipts(db, HOUSEHOLD)
+
+        assert result == ReceiptInventoryResult(
+            receipts=1, items=2, lots_created=1, unmatched_items=1
+        )
+        tables = [call.args[0].table.name for call in db.execute.await_args_list]
+        assert tables == [
+            "inventory_lots",
+            "inventory_events",
+            "items",
+            "receipts",
+            "data_versions",
+        ]
+        _db, names, _catalog, household_id = memory.match_many.await_args.args
+        assert list(names) == ["PASTA 500G", "DOPAPIR"]
+        assert household_id == HOUSEHOLD
+
+    @pytest.mark.asyncio
+    async def test_receipt_without_stock_bumps_no_version(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+        cache = MagicMock()
+        cache.get = AsyncMock(return_value=make_catalog())
+        memory = MagicMock()
+        memory.match_many = AsyncMock(return_value={})
+
+        with (
+            patch(
+                "src.services.receipt_inventory.load_pending_receipts",
+                AsyncMock(return_value=[receipt(item("DOPAPIR", "59.90"))]),
+            ),
+            patch("src.services.receipt_inventory.catalog_cache", cache),
+            patch("src.services.receipt_inventory.match_memory", memory),
+        ):
+            result = await ingest_receipts(db, HOUSEHOLD)
+
+        assert result.lots_created == 0
+        tables = [call.args[0].table.name for call in db.execute.await_args_list]
+        assert tables == ["receipts"]
+
+    @pytest.mark.asyncio
+    async def test_empty_backlog(self):
+        with patch(
+            "src.services.receipt_inventory.load_pending_receipts", AsyncMock(return_value=[])
+        ):
+            result = await ingest_receipts(MagicMock(), HOUSEHOLD)
+
+        assert result.receipts == 0
+
+
+class TestReceiptInventoryEndpoints:
+    def setup_method(self):
+        self.db = MagicMock()
+        self.db.flush = AsyncMock()
+        self.receipt = MagicMock(id=uuid.uuid4(), household_id=None, inventory_status="pending")
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(**{"scalar_one_or_none.return_value": self.receipt})
+        )
+        app.dependency_overrides[get_db] = lambda: self.db
+        self.client = TestClient(app)
+        self.result = ReceiptInventoryResult(receipts=1, items=3, lots_created=2, unmatched_items=1)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_assigns_household_and_ingests(self):
+        with patch(
+            "src.api.inventory.ingest_receipts", AsyncMock(return_value=self.result)
+        ) as ingest:
+            response = self.client.post(
+                f"/api/receipts/{self.receipt.id}/inventory",
+                params={"household_id": str(HOUSEHOLD)},
+            )
+
+        assert response.status_code == 200
+        assert response.json()["lots_created"] == 2
+        assert self.receipt.household_id == HOUSEHOLD
+        [items_update] = [
+            c.args[0]
+            for c in self.db.execute.await_args_list
+            if getattr(c.args[0], "table", None) is not None and c.args[0].table.name == "items"
+        ]
+        assert items_update.compile().params == {
+            "receipt_id_1": self.receipt.id,
+            "household_id": HOUSEHOLD,
+        }
+        ingest.assert_awaited_once_with(self.db, HOUSEHOLD, receipt_ids=[self.receipt.id])
+        [bump] = [
+            c.args[0]
+            for c in self.db.execute.await_args_list
+            if getattr(c.args[0], "table", None) is not None
+            and c.args[0].table.name == "data_versions"
+        ]
+        assert list(bump.compile().params.values())[0] == str(HOUSEHOLD)
+
+    def test_requires_household(self):
+        response = self.client.post(f"/api/receipts/{self.receipt.id}/inventory")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Receipt has no household"
+
+    def test_rejects_processed_receipt(self):
+        self.receipt.inventory_status = "reviewed"
+
+        response = self.client.post(f"/api/receipts/{self.receipt.id}/inventory")
+
+        assert response.status_code == 409
+
+    def test_backlog(self):
+        with patch(
+            "src.api.inventory.ingest_receipts", AsyncMock(return_value=self.result)
+        ) as ingest:
+            response = self.client.post(
+                "/api/inventory/from-receipts",
+                params={"household_id": str(HOUSEHOLD), "limit": 10},
+            )
+
+        assert response.status_code == 200
+        ingest.assert_awaited_once_with(self.db, HOUSEHOLD, limit=10)
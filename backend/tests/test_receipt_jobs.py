@@ -0,0 +1,184 @@
+"""Tests for the background receipt job queue."""
+
+import asyncio
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_db, get_receipt_job_queue
+from src.main import app
+from src.services.image_store import StoredImage
+from src.services.mock_ocr import MockOCRService
+from src.services.receipt_jobs import QueueFullError, ReceiptJob, ReceiptJobQueue
+
+JPEG_BYTES = b"\xff\xd8\xff\xe0fake-jpeg"
+
+
+def stored_image(tmp_path, name):
+    return StoredImage(path=tmp_path / name, sha256=name, size=0, image_type="jpeg")
+
+
+def override_get_db():
+    return MagicMock()
+
+
+class TestReceiptJobQueue:
+    """Tests for ReceiptJobQueue."""
+
+    @pytest.mark.asyncio
+    async def test_job_completes_with_receipt_id(self, tmp_path):
+        """Completed jobs expose the created receipt ID."""
+        receipt_id = uuid.uuid4()
+
+        async def processor(image, ocr_service):
+            return receipt_id
+
+        queue = ReceiptJobQueue(processor=processor, workers=1)
+        job = queue.submit(stored_image(tmp_path, "a.jpg"), MockOCRService())
+        assert job.status == "queued"
+
+        await queue.join()
+        await queue.stop()
+
+        assert job.status == "completed"
+        assert job.receipt_id == receipt_id
+        assert job.finished_at is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(self, tmp_path):
+        """Processor exceptions mark the job as failed."""
+
+        async def processor(image, ocr_service):
+            raise RuntimeError("OCR backend down")
+
+        queue = ReceiptJobQueue(processor=processor, workers=1)
+        job = queue.submit(stored_image(tmp_path, "a.jpg"), MockOCRService())
+
+        await queue.join()
+        await queue.stop()
+
+        assert job.status == "failed"
+        assert job.error == "OCR backend down"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_by_workers(self, tmp_path):
+        """No more than `workers` jobs run at the same time."""
+        running = 0
+        peak = 0
+
+        async def processor(image, ocr_service):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return uuid.uuid4()
+
+        queue = ReceiptJobQueue(processor=processor, workers=2)
+        for i in range(6):
+            queue.submit(stored_image(tmp_path, f"{i}.jpg"), MockOCRService())
+
+        await queue.join()
+        await queue.stop()
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_submit_raises_when_queue_full(self, tmp_path):
+        """Submitting beyond max_pending raises QueueFullError."""
+        release = asyncio.Event()
+
+        async def processor(image, ocr_service):
+            await release.wait()
+            return uuid.uuid4()
+
+        queue = ReceiptJobQueue(processor=processor, workers=1, max_pending=1)
+        queue.submit(stored_image(tmp_path, "a.jpg"), MockOCRService())
+        await asyncio.sleep(0)  # Let the worker take the first job
+        queue.submit(stored_image(tmp_path, "b.jpg"), MockOCRService())
+
+        with pytest.raises(QueueFullError):
+            queue.submit(stored_image(tmp_path, "c.jpg"), MockOCRService())
+
+        release.set()
+        await queue.join()
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_are_evicted(self, tmp_path):
+        """Only the newest max_finished finished jobs are retained."""
+
+        async def processor(image, ocr_service):
+            return uuid.uuid4()
+
+        queue = ReceiptJobQueue(processor=processor, workers=1, max_finished=2)
+        jobs = [
+            queue.submit(stored_image(tmp_path, f"{i}.jpg"), MockOCRService()) for i in range(4)
+        ]
+
+        await queue.join()
+        await queue.stop()
+
+        assert queue.get(jobs[0].id) is None
+        assert queue.get(jobs[1].id) is None
+        assert queue.get(jobs[3].id) is jobs[3]
+
+
+class TestBackgroundUploadEndpoint:
+    """Tests for POST /api/receipts/upload?background=true and job status."""
+
+    def setup_method(self):
+        self.queue = MagicMock()
+        app.dependency_overrides[get_receipt_job_queue] = lambda: self.queue
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_background_upload_returns_202_with_job(self, tmp_path):
+        """Background uploads store the image and return the queued job."""
+        job = ReceiptJob(
+            id=uuid.uuid4(), image=stored_image(tmp_path, "a.jpg"), ocr_service=MagicMock()
+        )
+        self.queue.submit.return_value = job
+
+        with patch("src.api.upload.settings") as mock_settings:
+            mock_settings.upload_dir = str(tmp_path)
+            mock_settings.max_upload_bytes = 1024
+            response = self.client.post(
+                "/api/receipts/upload?background=true",
+                files={"file": ("receipt.jpg", JPEG_BYTES, "image/jpeg")},
+            )
+
+        assert response.status_code == 202
+        assert response.json()["id"] == str(job.id)
+        assert response.json()["status"] == "queued"
+        stored = self.queue.submit.call_args.args[0]
+        assert stored.path.read_bytes() == JPEG_BYTES
+
+    def test_background_upload_returns_503_when_queue_full(self, tmp_path):
+        """A full queue rejects the upload and removes the stored image."""
+        self.queue.submit.side_effect = QueueFullError("Receipt processing queue is full")
+
+        with patch("src.api.upload.settings") as mock_settings:
+            mock_settings.upload_dir = str(tmp_path)
+            mock_settings.max_upload_bytes = 1024
+            response = self.client.post(
+                "/api/receipts/upload?background=true",
+                files={"file": ("receipt.jpg", JPEG_BYTES, "image/jpeg")},
+            )
+
+        assert response.status_code == 503
+        assert not [p for p in tmp_path.rglob("*") if p.is_file()]
+
+    def test_get_job_returns_404_for_unknown_job(self):
+        """Unknown job IDs return 404."""
+        self.queue.get.return_value = None
+
+        response = self.client.get(f"/api/receipts/jobs/{uuid.uuid4()}")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Job not found"
@@ -1,43 +1,106 @@
 """Tests for restock predictor service."""
 
+import uuid
 from datetime import datetime
 from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
 
 from src.services.restock_predictor import RestockPredictor
 
 
-class TestCalculateAverageDailyUsage:
-    def test_calculate_usage_from_events(self):
-        """Calculate average daily usage from consumption events."""
-        predictor = RestockPredictor()
+class TestDailyUsage:
+    def usage(self, groups, ages, consumed, group_count=1, **kwargs):
+        predictor = RestockPredictor(**kwargs)
+        return predictor.daily_usage(
+            np.array(groups, dtype=np.intp),
+            np.array(ages, dtype=np.float64),
+            np.array(consumed, dtype=np.float64),
+            group_count,
+        )
 
-        events = [
-            {"quantity_delta": Decimal("-100"), "created_at": datetime(2026, 1, 1)},
-            {"quantity_delta": Decimal("-50"), "created_at": datetime(2026, 1, 8)},
-            {"quantity_delta": Decimal("-150"), "created_at": datetime(2026, 1, 15)},
-        ]
+    def test_steady_usage_is_recovered(self):
+        """Daily use of the same amount averages to that amount."""
+        ages = np.arange(0.5, 30)
+        result = self.usage([0] * len(ages), ages, [50.0] * len(ages))
 
-        # 300g consumed over 14 days = ~21.43g/day
-        result = predictor.calculate_average_daily_usage(events)
+        assert result[0] == pytest.approx(50, rel=0.03)
 
-        assert result > Decimal("21")
-        assert result < Decimal("22")
+    def test_recent_usage_weighs_more(self):
+        """The same consumption counts more when it is recent."""
+        recent = self.usage([0, 0], [1, 20], [300, 10])
+        old = self.usage([0, 0], [1, 20], [10, 300])
 
-    def test_calculate_usage_no_events(self):
-        """Return zero for no consumption events."""
-        predictor = RestockPredictor()
-        result = predictor.calculate_average_daily_usage([])
-        assert result == Decimal("0")
+        assert recent[0] > 2 * old[0]
 
-    def test_calculate_usage_single_event(self):
-        """Handle single event gracefully."""
-        predictor = RestockPredictor()
-        events = [
-            {"quantity_delta": Decimal("-100"), "created_at": datetime(2026, 1, 1)},
+    def test_groups_without_events_are_zero(self):
+        """Return zero usage for groups with no consumption events."""
+        result = self.usage([1, 1, 1], [1, 8, 15], [100, 50, 150], group_count=3)
+
+        assert result[0] == result[2] == 0
+        assert result[1] > 0
+
+    def test_single_event_spreads_over_a_week(self):
+        """A single recent event is not read as that much every day."""
+        result = self.usage([0], [0.5], [70], half_life_days=1000)
+
+        assert result[0] == pytest.approx(10, rel=0.01)
+
+    def test_events_outside_lookback_are_ignored(self):
+        """Only events within the lookback window count."""
+        result = self.usage([0, 0], [3, 40], [70, 10_000], lookback_days=30)
+        without_old = self.usage([0], [3], [70], lookback_days=30)
+
+        assert result[0] == without_old[0]
+
+
+class TestPredict:
+    async def test_predicts_every_household_in_one_batch(self):
+        """Batch predictions group usage by household and ingredient."""
+        now = datetime(2026, 1, 20)
+        home, cabin = uuid.uuid4(), uuid.uuid4()
+        milk, flour = uuid.uuid4(), uuid.uuid4()
+        stock = [
+            MagicMock(household_id=home, ingredient_id=milk, total_quantity=Decimal("2.000")),
+            MagicMock(household_id=home, ingredient_id=flour, total_quantity=Decimal("1.000")),
+            MagicMock(household_id=cabin, ingredient_id=milk, total_quantity=Decimal("5.000")),
         ]
-        # Single event, assume 7 days default period
-        result = predictor.calculate_average_daily_usage(events)
-        assert result > Decimal("0")
+        for row in stock:
+            row.name, row.unit = "Ingredient", "l"
+        events = [
+            MagicMock(household_id=home, ingredient_id=milk, consumed=1.0, created_at=day)
+            for day in (datetime(2026, 1, d) for d in range(6, 20))
+        ] + [MagicMock(household_id=uuid.uuid4(), ingredient_id=milk, consumed=9.0, created_at=now)]
+        db = MagicMock()
+        db.execute = AsyncMock(
+            side_effect=[
+                MagicMock(**{"all.return_value": stock}),
+                MagicMock(**{"all.return_value": events}),
+            ]
+        )
+
+        result = await RestockPredictor().predict(db, None, now)
+
+        assert set(result) == {home, cabin}
+        first, second = result[home]
+        assert first.ingredient_id == milk
+        assert first.average_daily_usage == pytest.approx(Decimal("1"), abs=Decimal("0.1"))
+        assert first.days_until_empty == 2
+        assert second.days_until_empty is None
+        assert result[cabin][0].days_until_empty is None
+        assert db.execute.await_count == 2
+
+    async def test_no_stock_skips_event_query(self):
+        """Households without stock need no event scan."""
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": []}))
+
+        result = await RestockPredictor().predict(db, [uuid.uuid4()], datetime(2026, 1, 20))
+
+        assert result == {}
+        db.execute.assert_awaited_once()
 
 
 class TestPredictRunout:
@@ -0,0 +1,150 @@
+"""Tests for precomputed restock prediction snapshots."""
+
+import asyncio
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.api.deps import get_db
+from src.main import app
+from src.schemas.analytics import RestockPrediction
+from src.services.restock_snapshots import RestockSnapshotRefresher, store_snapshots
+from tests.conftest import compiled
+
+HOUSEHOLD = uuid.uuid4()
+NOW = datetime(2026, 1, 20, 3, 0)
+
+
+def prediction():
+    return RestockPrediction(
+        ingredient_id=uuid.uuid4(),
+        ingredient_name="Melk",
+        current_quantity=Decimal("2.000"),
+        unit="l",
+        average_daily_usage=Decimal("0.500"),
+        days_until_empty=4,
+        predicted_runout_date=datetime(2026, 1, 24, 3, 0),
+        recommended_restock_date=datetime(2026, 1, 21, 3, 0),
+    )
+
+
+class TestRestockEndpoint:
+    def setup_method(self):
+        self.db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_serves_snapshot_with_single_select(self):
+        snapshot = MagicMock(predictions=[prediction().model_dump(mode="json")], generated_at=NOW)
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(**{"scalar_one_or_none.return_value": snapshot})
+        )
+
+        response = self.client.get(
+            "/api/analytics/restock-predictions", params={"household_id": str(HOUSEHOLD)}
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["generated_at"] == "2026-01-20T03:00:00"
+        assert body["predictions"][0]["days_until_empty"] == 4
+        [call] = self.db.execute.await_args_list
+        sql = compiled(call.args[0])
+        assert "FROM restock_snapshots" in sql
+        assert "WHERE restock_snapshots.household_id = " in sql
+
+    def test_missing_snapshot_is_computed_and_stored(self):
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(
+                **{"scalar_one_or_none.side_effect": [None, HOUSEHOLD], "all.return_value": []}
+            )
+        )
+
+        response = self.client.get(
+            "/api/analytics/restock-predictions", params={"household_id": str(HOUSEHOLD)}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["predictions"] == []
+        upsert = compiled(self.db.execute.await_args_list[-1].args[0])
+        assert upsert.startswith("INSERT INTO restock_snapshots")
+        assert "ON CONFLICT (household_id) DO UPDATE" in upsert
+
+    def test_unknown_household_is_not_found(self):
+        self.db.execute = AsyncMock(
+            return_value=MagicMock(**{"scalar_one_or_none.return_value": None})
+        )
+
+        response = self.client.get(
+            "/api/analytics/restock-predictions", params={"household_id": str(HOUSEHOLD)}
+        )
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Household not found"
+        assert self.db.execute.await_count == 2  # Snapshot and household lookups, no upsert
+
+
+class TestStoreSnapshots:
+    async def test_all_households_get_a_snapshot(self):
+        empty = uuid.uuid4()
+        predictor = MagicMock()
+        predictor.predict = AsyncMock(return_value={HOUSEHOLD: [prediction()]})
+        db = MagicMock()
+        db.execute = AsyncMock(
+            return_value=MagicMock(**{"scalars.return_value.all.return_value": [HOUSEHOLD, empty]})
+        )
+
+        snapshots = await store_snapshots(db, predictor, None, NOW)
+
+        assert len(snapshots[HOUSEHOLD].predictions) == 1
+        assert snapshots[empty].predictions == []
+        assert snapshots[empty].generated_at == NOW
+        predictor.predict.assert_awaited_once_with(db, None, NOW)
+        upsert = db.execute.await_args_list[-1].args[0]
+        assert len(upsert.compile().params) == 6  # Both rows in one statement
+
+
+class TestRefresher:
+    async def test_full_refresh_then_requested_households(self):
+        refreshed = []
+        done = asyncio.Event()
+
+        async def refresh(household_ids):
+            refreshed.append(household_ids)
+            done.set()
+            return 0
+
+        refresher = RestockSnapshotRefresher(predictor=MagicMock(), interval_seconds=3600)
+        refresher.refresh = refresh
+
+        refresher.start()
+        await asyncio.wait_for(done.wait(), 1)
+        done.clear()
+        refresher.request(HOUSEHOLD)
+        refresher.request(HOUSEHOLD)
+        await asyncio.wait_for(done.wait(), 1)
+        await refresher.stop()
+
+        assert refreshed == [None, [HOUSEHOLD]]
+        assert not refresher.running
+
+    def test_request_after_commit(self):
+        refresher = RestockSnapshotRefresher(predictor=MagicMock())
+        refresher.request = MagicMock()
+        session = Session()
+        db = MagicMock(sync_session=session)
+
+        refresher.request_after_commit(db, HOUSEHOLD)
+        session.rollback()
+        refresher.request.assert_not_called()
+        session.commit()
+        session.commit()
+
+        refresher.request.assert_called_once_with(HOUSEHOLD)
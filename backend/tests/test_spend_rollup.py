@@ -0,0 +1,320 @@
+"""Tests for the daily spend rollup and the analytics reading it."""
+
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from src.api.analytics import period_start, periods_back, spend_trend_query
+from src.api.deps import get_analytics_cache, get_db
+from src.main import app
+from src.services.spend_rollup import (
+    _upsert,
+    prune_rollup,
+    retract_receipts,
+    spend_facts,
+    spend_source,
+)
+from tests.conftest import compiled
+
+HOUSEHOLD = uuid.uuid4()
+
+
+def facts_sql(start, end, household_id=None):
+    return compiled(select(spend_facts(start, end, household_id)))
+
+
+class TestSpendFacts:
+    def test_whole_days_read_rollup_only(self):
+        sql = facts_sql(datetime(2026, 1, 1), datetime(2026, 1, 31, 23, 59, 59, 999999))
+
+        assert "FROM daily_spend" in sql
+        assert "receipts" not in sql
+        params = select(spend_facts(datetime(2026, 1, 1), None)).compile().params
+        assert date(2026, 1, 1) in params.values()
+
+    def test_no_range_reads_rollup_only(self):
+        assert "receipts" not in facts_sql(None, None, HOUSEHOLD)
+
+    def test_partial_edge_days_read_receipts(self):
+        start, end = datetime(2026, 1, 1, 12), datetime(2026, 1, 31, 8)
+
+        stmt = select(spend_facts(start, end))
+        sql, params = compiled(stmt), stmt.compile().params
+
+        assert "FROM daily_spend" in sql
+        assert sql.count("FROM receipts") == 2
+        assert sql.count("JOIN receipts") == 2
+        days = {v for v in params.values() if type(v) is date}
+        assert days == {date(2026, 1, 2), date(2026, 1, 30)}  # Whole days only
+        assert datetime(2026, 1, 2) in params.values()  # Start day ends at midnight
+        assert datetime(2026, 1, 31) in params.values()  # End day starts at midnight
+
+    def test_end_at_midnight_reads_receipts_of_that_instant(self):
+        # The frontend sends dates at midnight, where receipts without a time are stored
+        stmt = select(spend_facts(datetime(2026, 1, 1), datetime(2026, 1, 31)))
+        params = stmt.compile().params
+
+        assert date(2026, 1, 30) in params.values()
+        assert "FROM receipts" in compiled(stmt)
+
+    def test_within_one_day_reads_receipts_only(self):
+        sql = facts_sql(datetime(2026, 1, 1, 8), datetime(2026, 1, 1, 20), HOUSEHOLD)
+
+        assert "daily_spend" not in sql
+        assert "receipts.household_id = " in sql
+
+
+class TestUpsert:
+    def test_adds_measures_and_widens_purchase_times(self):
+        sql = compiled(_upsert(spend_source(), 1))
+
+        assert "ON CONFLICT (household_id, day, merchant, category_id) DO UPDATE" in sql
+        assert "receipt_count = (daily_spend.receipt_count + excluded.receipt_count)" in sql
+        assert "least(daily_spend.first_purchase_at, excluded.first_purchase_at)" in sql
+        assert "ORDER BY source.household_id, source.day" in sql
+
+    def test_subtracts_without_touching_purchase_times(self):
+        sql = compiled(_upsert(spend_source(), -1))
+
+        assert "item_total = (daily_spend.item_total + excluded.item_total)" in sql
+        assert "first_purchase_at =" not in sql
+        assert "source.receipt_total * %(" in sql
+
+
+class TestRetractAndPrune:
+    @pytest.mark.asyncio
+    async def test_retract_returns_affected_keys(self):
+        key = (HOUSEHOLD, date(2026, 1, 15), "REMA 1000")
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": [key]}))
+
+        keys = await retract_receipts(db, [uuid.uuid4()])
+
+        assert keys == [key]
+        upsert = db.execute.await_args_list[1].args[0]
+        assert upsert.table.name == "daily_spend"
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_retract_or_prune(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        assert await retract_receipts(db, []) == []
+        await prune_rollup(db, [])
+
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_prune_drops_empty_rows_and_recomputes_times(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        await prune_rollup(db, [(None, date(2026, 1, 15), "KIWI")])
+
+        delete_stmt, update_stmt = (c.args[0] for c in db.execute.await_args_list)
+        delete_sql = compiled(delete_stmt)
+        assert "daily_spend.household_id IS NOT DISTINCT FROM" in delete_sql
+        assert "daily_spend.receipt_count <= " in delete_sql
+        assert "min(receipts.purchase_date)" in compiled(update_stmt)
+
+
+class TestReceiptDelete:
+    def test_delete_retracts_then_prunes(self):
+        receipt = MagicMock(id=uuid.uuid4())
+        db = MagicMock()
+        db.execute = AsyncMock(
+            return_value=MagicMock(**{"scalar_one_or_none.return_value": receipt})
+        )
+        db.delete = AsyncMock()
+        db.flush = AsyncMock()
+        keys = [(HOUSEHOLD, date(2026, 1, 15), "KIWI")]
+        app.dependency_overrides[get_db] = lambda: db
+        try:
+            with (
+                patch("src.api.receipts.retract_receipts", AsyncMock(return_value=keys)) as retract,
+                patch("src.api.receipts.prune_rollup", AsyncMock()) as prune,
+            ):
+                response = TestClient(app).delete(f"/api/receipts/{receipt.id}")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        retract.assert_awaited_once_with(db, [receipt.id])
+        db.delete.assert_awaited_once_with(receipt)
+        prune.assert_awaited_once_with(db, keys)
+
+
+class TestSpendTrendQuery:
+    def test_period_boundaries(self):
+        moment = datetime(2026, 1, 7, 12)  # A Wednesday
+
+        assert period_start(moment, "daily") == datetime(2026, 1, 7)
+        assert period_start(moment, "weekly") == datetime(2026, 1, 5)
+        assert period_start(moment, "monthly") == datetime(2026, 1, 1)
+        assert periods_back(datetime(2026, 2, 1), "monthly", 12) == datetime(2025, 2, 1)
+        assert periods_back(datetime(2026, 1, 5), "weekly", 52) == datetime(2025, 1, 6)
+
+    def test_gaps_filled_in_one_query(self):
+        stmt = spend_trend_query(HOUSEHOLD, datetime(2026, 1, 1), datetime(2026, 3, 31), "monthly")
+        sql, params = compiled(stmt), stmt.compile().params
+
+        assert "FROM generate_series(" in sql
+        assert "INTERVAL '1 month') AS periods(period)" in sql
+        assert sql.count("LEFT OUTER JOIN") == 2
+        assert "lag(" not in sql
+        assert datetime(2026, 3, 1) in params.values()  # Last period
+
+    def test_compare_last_year_extends_series_back(self):
+        stmt = spend_trend_query(
+            HOUSEHOLD, datetime(2026, 1, 7, 12), datetime(2026, 3, 31), "weekly", "last_year"
+        )
+        sql, params = compiled(stmt), stmt.compile().params
+
+        assert "lag(coalesce(receipt_periods.total_spent, " in sql
+        assert "OVER (ORDER BY periods.period) AS compare_total_spent" in sql
+        assert 52 in params.values()
+        assert datetime(2025, 1, 6) in params.values()  # Series starts a year back
+        assert "WHERE trend.period >= " in sql
+        assert datetime(2026, 1, 5) in params.values()  # Compared periods are dropped
+        days = {v for v in params.values() if type(v) is date}
+        assert date(2026, 1, 4) in days  # Earlier periods end before the first shown
+
+
+class TestAnalyticsFromRollup:
+    def setup_method(self):
+        self.db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_analytics_cache] = lambda: None
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def executed_sql(self):
+        return [compiled(c.args[0]) for c in self.db.execute.await_args_list]
+
+    def test_summary(self):
+        row = MagicMock(
+            total_receipts=4,
+            total_spent=Decimal("1000.00"),
+            total_items=30,
+            period_start=datetime(2026, 1, 2, 10),
+            period_end=datetime(2026, 1, 29, 18),
+        )
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"one.return_value": row}))
+
+        response = self.client.get(
+            "/api/analytics/summary",
+            params={"start_date": "2026-01-01T00:00:00", "end_date": "2026-01-31T00:00:00"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["total_receipts"], body["total_items"]) == (4, 30)
+        assert Decimal(body["avg_receipt_amount"]) == Decimal("250.00")
+        [sql] = self.executed_sql()
+        assert "sum(spend.receipt_count)" in sql
+        assert "FROM daily_spend" in sql
+
+    def test_by_store_groups_normalized_merchant(self):
+        row = MagicMock(
+            store_name="REMA 1000",
+            total_spent=Decimal("300.00"),
+            receipt_count=2,
+            last_visit=datetime(2026, 1, 20, 16),
+        )
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": [row]}))
+
+        response = self.client.get("/api/analytics/by-store")
+
+        assert response.status_code == 200
+        assert response.json()["stores"][0]["store_name"] == "REMA 1000"
+        [sql] = self.executed_sql()
+        assert "GROUP BY spend.merchant" in sql
+        assert "receipts" not in sql
+
+    def test_summary_of_one_household(self):
+        row = MagicMock(
+            total_receipts=0,
+            total_spent=0,
+            total_items=0,
+            period_start=None,
+            period_end=None,
+        )
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"one.return_value": row}))
+
+        response = self.client.get(
+            "/api/analytics/summary", params={"household_id": str(HOUSEHOLD)}
+        )
+
+        assert response.status_code == 200
+        [sql] = self.executed_sql()
+        assert "WHERE daily_spend.household_id = " in sql
+
+    def test_top_items_filter_items_without_join(self):
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": []}))
+
+        response = self.client.get(
+            "/api/analytics/top-items",
+            params={"household_id": str(HOUSEHOLD), "start_date": "2026-01-01T00:00:00"},
+        )
+
+        assert response.status_code == 200
+        [sql] = self.executed_sql()
+        assert "items.household_id = " in sql
+        assert "items.purchase_date >= " in sql
+        assert "receipts" not in sql
+
+    def test_spend_trend_truncates_rollup_days(self):
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": []}))
+
+        response = self.client.get(
+            "/api/analytics/spend-trend",
+            params={
+                "household_id": str(HOUSEHOLD),
+                "start_date": datetime(2026, 1, 1).isoformat(),
+                "end_date": datetime.combine(date(2026, 3, 31), time.max).isoformat(),
+                "granularity": "monthly",
+            },
+        )
+
+        assert response.status_code == 200
+        [sql] = self.executed_sql()
+        assert "CAST(spend.day AS TIMESTAMP WITHOUT TIME ZONE)) AS period" in sql
+        assert "daily_spend.household_id = " in sql
+        assert "FROM meal_plans" in sql
+
+    def test_spend_trend_with_comparison(self):
+        row = MagicMock(
+            period=datetime(2026, 1, 5),
+            total_spent=Decimal("450.00"),
+            receipt_count=3,
+            meal_cost=0,
+            meal_count=0,
+            compare_total_spent=Decimal("400.00"),
+            compare_meal_cost=Decimal("120.00"),
+        )
+        self.db.execute = AsyncMock(return_value=MagicMock(**{"all.return_value": [row]}))
+
+        response = self.client.get(
+            "/api/analytics/spend-trend",
+            params={
+                "household_id": str(HOUSEHOLD),
+                "start_date": "2026-01-05T00:00:00",
+                "end_date": "2026-01-11T00:00:00",
+                "compare": "previous",
+            },
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["compare"] == "previous"
+        [point] = body["trends"]
+        assert point["period"] == "2026-W02"
+        assert Decimal(point["compare_total_spent"]) == Decimal("400.00")
+        assert Decimal(point["meal_cost"]) == 0
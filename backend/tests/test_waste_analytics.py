@@ -0,0 +1,149 @@
+"""Tests for the SQL-aggregated, keyset-paginated waste analytics."""
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.api.analytics import decode_cursor, encode_cursor, waste_totals_query
+from src.api.deps import get_analytics_cache, get_db
+from src.main import app
+from tests.conftest import compiled
+
+HOUSEHOLD = uuid.uuid4()
+
+
+def result(rows=(), one=None):
+    return MagicMock(**{"all.return_value": list(rows), "one.return_value": one})
+
+
+def grouped(grouping, discard_count, value, **names):
+    row = {"ingredient": None, "category": None, "reason": None, "week": None, **names}
+    return MagicMock(
+        grouping=grouping, discard_count=discard_count, estimated_value=Decimal(value), **row
+    )
+
+
+def discard(created_at, quantity="-2.000", unit_cost="15.00"):
+    return MagicMock(
+        id=uuid.uuid4(),
+        created_at=created_at,
+        quantity_delta=Decimal(quantity),
+        unit="pcs",
+        reason=None,
+        unit_cost=Decimal(unit_cost),
+        ingredient_name="Egg",
+    )
+
+
+class TestCursor:
+    def test_round_trip(self):
+        row_id = uuid.uuid4()
+        created_at = datetime(2026, 1, 12, 18, 30, 5, 120)
+
+        assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", "bm8tc2VwYXJhdG9y"])
+    def test_malformed_cursor_is_bad_request(self, cursor):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor)
+
+        assert exc.value.status_code == 400
+
+
+class TestWasteTotalsQuery:
+    def test_all_breakdowns_in_one_grouping_sets_pass(self):
+        sql = compiled(waste_totals_query(HOUSEHOLD, datetime(2026, 1, 1), None))
+
+        assert "GROUP BY GROUPING SETS((ingredients.id, ingredients.name), categories.name" in sql
+        assert sql.rstrip().endswith(", ())")  # Overall totals
+        assert "grouping(ingredients.id, categories.name, coalesce(" in sql
+        assert "abs(inventory_events.quantity_delta) * inventory_lots.unit_cost" in sql
+        assert "inventory_events.created_at >= " in sql
+        assert "inventory_events.created_at <=" not in sql
+
+
+class TestWasteEndpoints:
+    def setup_method(self):
+        self.db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_analytics_cache] = lambda: None
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def executed_sql(self):
+        return [compiled(c.args[0]) for c in self.db.execute.await_args_list]
+
+    def test_aggregates_and_first_pages(self):
+        totals = [
+            grouped(0b1111, 3, "75.00"),
+            grouped(0b0111, 1, "15.00", ingredient="Melk"),
+            grouped(0b0111, 2, "60.00", ingredient="Egg"),
+            grouped(0b1011, 3, "75.00", category=None),
+            grouped(0b1101, 3, "75.00", reason="expired"),
+            grouped(0b1110, 2, "60.00", week=datetime(2026, 1, 12)),
+            grouped(0b1110, 1, "15.00", week=datetime(2026, 1, 5)),
+        ]
+        discards = [discard(datetime(2026, 1, 14)), discard(datetime(2026, 1, 13))]
+        self.db.execute = AsyncMock(
+            side_effect=[
+                result(totals),
+                result(one=MagicMock(count=0, servings=0)),
+                result(discards),
+                result(),
+            ]
+        )
+
+        response = self.client.get(
+            "/api/analytics/waste", params={"household_id": str(HOUSEHOLD), "limit": 1}
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["inventory_discard_count"] == 3
+        assert Decimal(body["total_inventory_waste_value"]) == Decimal("75.00")
+        assert [b["name"] for b in body["by_ingredient"]] == ["Egg", "Melk"]
+        assert body["by_category"][0]["name"] is None
+        assert [b["name"] for b in body["by_week"]] == ["2026-W02", "2026-W03"]
+        [entry] = body["inventory_discards"]
+        assert Decimal(entry["estimated_value"]) == Decimal("30.00")
+        assert decode_cursor(body["inventory_next_cursor"]) == (
+            discards[0].created_at,
+            discards[0].id,
+        )
+        assert body["leftover_next_cursor"] is None
+        page_sql = self.executed_sql()[2]
+        assert "ORDER BY inventory_events.created_at DESC, inventory_events.id DESC" in page_sql
+        assert "LIMIT " in page_sql
+
+    def test_next_page_continues_after_cursor(self):
+        self.db.execute = AsyncMock(return_value=result([discard(datetime(2026, 1, 10))]))
+        cursor = encode_cursor(datetime(2026, 1, 14), uuid.uuid4())
+
+        response = self.client.get(
+            "/api/analytics/waste/inventory-discards",
+            params={"household_id": str(HOUSEHOLD), "cursor": cursor},
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+        assert response.json()["next_cursor"] is None
+        [sql] = self.executed_sql()
+        assert "(inventory_events.created_at, inventory_events.id) < (" in sql
+
+    def test_leftover_page_rejects_bad_cursor(self):
+        self.db.execute = AsyncMock()
+
+        response = self.client.get(
+            "/api/analytics/waste/leftover-discards",
+            params={"household_id": str(HOUSEHOLD), "cursor": "garbage"},
+        )
+
+        assert response.status_code == 400
+        self.db.execute.assert_not_awaited()
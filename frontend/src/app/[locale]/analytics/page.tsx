@@ -76,26 +76,22 @@ export default function AnalyticsPage() {
       const endStr = endDate.toISOString().split("T")[0];
 
       try {
-        const [cost, waste, trend, restock, category, summary, topItems, stores] =
-          await Promise.all([
-            api.getCostPerMeal(DEMO_HOUSEHOLD_ID, startStr, endStr).catch(() => null),
-            api.getWasteAnalytics(DEMO_HOUSEHOLD_ID, startStr, endStr).catch(() => null),
-            api.getSpendTrend(DEMO_HOUSEHOLD_ID, startStr, endStr, "weekly").catch(() => null),
-            api.getRestockPredictions(DEMO_HOUSEHOLD_ID).catch(() => null),
-            api.getByCategory(startStr, endStr).catch(() => null),
-            api.getSummary(startStr, endStr).catch(() => null),
-            api.getTopItems(startStr, endStr, topItemsSortBy).catch(() => null),
-            api.getByStore(startStr, endStr).catch(() => null),
-          ]);
-
-        setCostData(cost);
-        setWasteData(waste);
-        setTrendData(trend);
-        setRestockData(restock);
-        setCategoryData(category);
-        setSummaryData(summary);
-        setTopItemsData(topItems);
-        setStoreData(stores);
+        // One call computes every widget, concurrently on the server
+        const dashboard = await api
+          .getDashboard(DEMO_HOUSEHOLD_ID, startStr, endStr, "weekly", topItemsSortBy)
+          .catch(() => null);
+        if (dashboard && Object.keys(dashboard.errors).length > 0) {
+          console.error("Some analytics widgets failed:", dashboard.errors);
+        }
+
+        setCostData(dashboard?.cost_per_meal ?? null);
+        setWasteData(dashboard?.waste ?? null);
+        setTrendData(dashboard?.spend_trend ?? null);
+        setRestockData(dashboard?.restock ?? null);
+        setCategoryData(dashboard?.by_category ?? null);
+        setSummaryData(dashboard?.summary ?? null);
+        setTopItemsData(dashboard?.top_items ?? null);
+        setStoreData(dashboard?.by_store ?? null);
       } catch (error) {
         console.error("Failed to fetch analytics:", error);
       } finally {
@@ -44,7 +44,7 @@ export function WasteCard({ data, loading = false, className }: WasteCardProps)
       subtitle={
         hasAnyWaste
           ? t("waste.itemsWasted", {
-              inventory: data.inventory_discards.length,
+              inventory: data.inventory_discard_count,
               leftovers: data.total_leftover_servings_wasted,
             })
           : t("waste.keepItUp")
@@ -71,7 +71,7 @@ export function WasteCard({ data, loading = false, className }: WasteCardProps)
               {t("waste.inventoryTab")}
               {hasInventoryWaste && (
                 <span className="ml-1.5 rounded-full bg-amber-light/30 px-1.5 py-0.5 text-xs text-amber-dark dark:bg-amber-dark/20 dark:text-amber-warm">
-                  {data.inventory_discards.length}
+                  {data.inventory_discard_count}
                 </span>
               )}
             </button>
@@ -88,7 +88,7 @@ export function WasteCard({ data, loading = false, className }: WasteCardProps)
               {t("waste.leftoversTab")}
               {hasLeftoverWaste && (
                 <span className="ml-1.5 rounded-full bg-amber-light/30 px-1.5 py-0.5 text-xs text-amber-dark dark:bg-amber-dark/20 dark:text-amber-warm">
-                  {data.leftover_discards.length}
+                  {data.leftover_discard_count}
                 </span>
               )}
             </button>
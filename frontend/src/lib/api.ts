@@ -269,26 +269,49 @@ export interface LeftoverWasteEntry {
   discarded_at: string | null;
 }
 
+export interface WasteBreakdown {
+  name: string | null;
+  discard_count: number;
+  estimated_value: number;
+}
+
 export interface WasteResponse {
+  // First page of each, newest first; continue with the next cursor
   inventory_discards: WasteEntry[];
   leftover_discards: LeftoverWasteEntry[];
+  inventory_next_cursor: string | null;
+  leftover_next_cursor: string | null;
+  inventory_discard_count: number;
+  leftover_discard_count: number;
   total_inventory_waste_value: number;
   total_leftover_servings_wasted: number;
+  by_ingredient: WasteBreakdown[];
+  by_category: WasteBreakdown[];
+  by_reason: WasteBreakdown[];
+  by_week: WasteBreakdown[];
   period_start: string | null;
   period_end: string | null;
 }
 
+export interface WastePage<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
 export interface SpendTrendPoint {
   period: string;
   total_spent: number;
   receipt_count: number;
   meal_count: number;
   meal_cost: number;
+  compare_total_spent: number | null;
+  compare_meal_cost: number | null;
 }
 
 export interface SpendTrendResponse {
   trends: SpendTrendPoint[];
   granularity: "daily" | "weekly" | "monthly";
+  compare: "previous" | "last_year" | null;
   period_start: string;
   period_end: string;
 }
@@ -343,6 +366,22 @@ export interface ByStoreResponse {
   period_end: string | null;
 }
 
+// Dashboard: every analytics widget of a household in one response.
+// A widget that failed is null and named in errors.
+export interface DashboardResponse {
+  summary: Summary | null;
+  by_category: ByCategory | null;
+  top_items: TopItemsResponse | null;
+  by_store: ByStoreResponse | null;
+  spend_trend: SpendTrendResponse | null;
+  cost_per_meal: CostPerMealResponse | null;
+  waste: WasteResponse | null;
+  restock: RestockPredictionsResponse | null;
+  // Receipts of the period with no household yet, left out of the receipt widgets
+  unassigned_receipts: number | null;
+  errors: Record<string, string>;
+}
+
 class ApiClient {
   private baseUrl: string;
 
@@ -396,18 +435,28 @@ class ApiClient {
   }
 
   // Analytics
-  async getSummary(startDate?: string, endDate?: string): Promise<Summary> {
+  async getSummary(
+    startDate?: string,
+    endDate?: string,
+    householdId?: string
+  ): Promise<Summary> {
     const params = new URLSearchParams();
     if (startDate) params.append("start_date", startDate);
     if (endDate) params.append("end_date", endDate);
+    if (householdId) params.append("household_id", householdId);
     const query = params.toString() ? `?${params.toString()}` : "";
     return this.fetch(`/api/analytics/summary${query}`);
   }
 
-  async getByCategory(startDate?: string, endDate?: string): Promise<ByCategory> {
+  async getByCategory(
+    startDate?: string,
+    endDate?: string,
+    householdId?: string
+  ): Promise<ByCategory> {
     const params = new URLSearchParams();
     if (startDate) params.append("start_date", startDate);
     if (endDate) params.append("end_date", endDate);
+    if (householdId) params.append("household_id", householdId);
     const query = params.toString() ? `?${params.toString()}` : "";
     return this.fetch(`/api/analytics/by-category${query}`);
   }
@@ -416,20 +465,27 @@ class ApiClient {
     startDate?: string,
     endDate?: string,
     sortBy: "spend" | "count" = "spend",
-    limit = 10
+    limit = 10,
+    householdId?: string
   ): Promise<TopItemsResponse> {
     const params = new URLSearchParams();
     if (startDate) params.append("start_date", startDate);
     if (endDate) params.append("end_date", endDate);
+    if (householdId) params.append("household_id", householdId);
     params.append("sort_by", sortBy);
     params.append("limit", limit.toString());
     return this.fetch(`/api/analytics/top-items?${params.toString()}`);
   }
 
-  async getByStore(startDate?: string, endDate?: string): Promise<ByStoreResponse> {
+  async getByStore(
+    startDate?: string,
+    endDate?: string,
+    householdId?: string
+  ): Promise<ByStoreResponse> {
     const params = new URLSearchParams();
     if (startDate) params.append("start_date", startDate);
     if (endDate) params.append("end_date", endDate);
+    if (householdId) params.append("household_id", householdId);
     const query = params.toString() ? `?${params.toString()}` : "";
     return this.fetch(`/api/analytics/by-store${query}`);
   }
@@ -638,17 +694,47 @@ class ApiClient {
     return this.fetch(`/api/analytics/waste?${params.toString()}`);
   }
 
+  async getInventoryDiscards(
+    householdId: string,
+    cursor: string,
+    startDate?: string,
+    endDate?: string
+  ): Promise<WastePage<WasteEntry>> {
+    const params = new URLSearchParams();
+    params.append("household_id", householdId);
+    params.append("cursor", cursor);
+    if (startDate) params.append("start_date", startDate);
+    if (endDate) params.append("end_date", endDate);
+    return this.fetch(`/api/analytics/waste/inventory-discards?${params.toString()}`);
+  }
+
+  async getLeftoverDiscards(
+    householdId: string,
+    cursor: string,
+    startDate?: string,
+    endDate?: string
+  ): Promise<WastePage<LeftoverWasteEntry>> {
+    const params = new URLSearchParams();
+    params.append("household_id", householdId);
+    params.append("cursor", cursor);
+    if (startDate) params.append("start_date", startDate);
+    if (endDate) params.append("end_date", endDate);
+    return this.fetch(`/api/analytics/waste/leftover-discards?${params.toString()}`);
+  }
+
   async getSpendTrend(
     householdId: string,
     startDate: string,
     endDate: string,
-    granularity: "daily" | "weekly" | "monthly" = "weekly"
+    granularity: "daily" | "weekly" | "monthly" = "weekly",
+    compare?: "previous" | "last_year"
   ): Promise<SpendTrendResponse> {
     const params = new URLSearchParams();
     params.append("household_id", householdId);
     params.append("start_date", startDate);
     params.append("end_date", endDate);
     params.append("granularity", granularity);
+    if (compare) params.append("compare", compare);
     return this.fetch(`/api/analytics/spend-trend?${params.toString()}`);
   }
 
@@ -657,6 +743,24 @@ class ApiClient {
     params.append("household_id", householdId);
     return this.fetch(`/api/analytics/restock-predictions?${params.toString()}`);
   }
+
+  async getDashboard(
+    householdId: string,
+    startDate: string,
+    endDate: string,
+    granularity: "daily" | "weekly" | "monthly" = "weekly",
+    topItemsSortBy: "spend" | "count" = "spend",
+    topItemsLimit = 10
+  ): Promise<DashboardResponse> {
+    const params = new URLSearchParams();
+    params.append("household_id", householdId);
+    params.append("start_date", startDate);
+    params.append("end_date", endDate);
+    params.append("granularity", granularity);
+    params.append("top_items_sort_by", topItemsSortBy);
+    params.append("top_items_limit", topItemsLimit.toString());
+    return this.fetch(`/api/analytics/dashboard?${params.toString()}`);
+  }
 }
 
 export const api = new ApiClient(API_URL);